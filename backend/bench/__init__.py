@@ -0,0 +1 @@
+# สคริปต์วัดประสิทธิภาพ — รันจากโฟลเดอร์ backend เช่น python -m bench.ticket_codes
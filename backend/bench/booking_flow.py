@@ -0,0 +1,480 @@
+# โหลดเทสต์ flow การจองทั้งเส้นผ่าน GraphQL: ดูคอนเสิร์ต → getSeatsByConcertZone → ห้องรอ → createBooking → confirmPaymentAndGenerateTickets
+#   python -m bench.booking_flow --db sqlite:///bench.db --seed --concurrency 50 --duration 30
+#   python -m bench.booking_flow --seed --concerts 4 --zones 6 --seats 1000 --users 2000 --json report.json
+#   python -m bench.booking_flow --url http://127.0.0.1:8000/graphql --baseline report.json
+# ไม่ระบุ --db จะใช้ฐานข้อมูลใน [Database] — ข้อมูลทดสอบคือคอนเสิร์ตที่ band_name = 'bench' และผู้ใช้ bench-N@harmoniq.test
+import argparse
+import asyncio
+import contextvars
+import json
+import logging
+import math
+import random
+import sys
+import time
+from collections import Counter
+from sqlalchemy import create_engine, event, func, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from graphql_app import database
+from graphql_app.model import Base, Booking, BookingSeat, BookingStatus, Concert, Seat, Ticket, User, Zone
+from typing import Dict, List, Optional, Set, Tuple
+
+BAND = "bench"
+PASSWORD = "bench-password"
+STEPS = ("browse", "seats", "queue", "book", "pay")
+
+BROWSE = """
+query Browse($first: Int) {
+  getConcerts(first: $first) {
+    edges { node { concertId concertName bandName zones { zoneId zoneName price } } }
+  }
+}"""
+
+SEATS = """
+query Seats($concertId: Int!, $zoneName: String!) {
+  getSeatsByConcertZone(concertId: $concertId, zoneName: $zoneName) { seatId seatNumber seatStatus }
+}"""
+
+JOIN = """
+mutation Join($concertId: Int!, $userId: Int!) {
+  joinWaitingRoom(concertId: $concertId, userId: $userId) { queueToken admitted admissionToken retryAfterSeconds }
+}"""
+
+STATUS = """
+query Status($queueToken: String!) {
+  waitingRoomStatus(queueToken: $queueToken) { admitted admissionToken retryAfterSeconds }
+}"""
+
+BOOK = """
+mutation Book($userId: Int!, $concertId: Int!, $zoneId: Int!, $seatIds: [Int!]!, $seatCount: Int!, $admissionToken: String) {
+  createBooking(userId: $userId, concertId: $concertId, zoneId: $zoneId, seatCount: $seatCount, seatIds: $seatIds, admissionToken: $admissionToken) {
+    bookingId seatCount totalPrice status
+  }
+}"""
+
+PAY = """
+mutation Pay($bookingId: Int!) {
+  confirmPaymentAndGenerateTickets(bookingId: $bookingId) { ticketId ticketCode seatNumber }
+}"""
+
+LOGIN = """
+mutation Login($username: String!, $password: String!) {
+  loginUser(username: $username, password: $password) { success message token user { id } }
+}"""
+
+# step ที่กำลังรันของ task นี้ — ใช้นับ SQL ต่อ step
+_current_step: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("bench_step", default=None)
+
+
+def use_database(url: str) -> None:
+    """ผูก SessionLocal / AsyncSessionLocal กับ url (sync driver) — async driver เลือกจาก dialect"""
+    async_url = (url.replace("mysql+mysqlconnector://", "mysql+aiomysql://")
+                    .replace("mysql+pymysql://", "mysql+aiomysql://")
+                    .replace("sqlite://", "sqlite+aiosqlite://"))
+    options = {}
+    if url.startswith("sqlite"):
+        # sqlite มีผู้เขียนได้ทีละคน — ให้ทุก task ต่อคิวที่ connection เดียวแทนการรอ lock จน timeout
+        options = {"connect_args": {"timeout": 30}}
+    database.SessionLocal.configure(bind=create_engine(url, **options))
+    database.AsyncSessionLocal.configure(bind=create_async_engine(async_url, **options))
+
+
+def _engines():
+    return database.SessionLocal.kw["bind"], database.AsyncSessionLocal.kw["bind"].sync_engine
+
+
+def seed(concerts: int, zones: int, seats: int, users: int) -> None:
+    """เพิ่มคอนเสิร์ต/โซน/ที่นั่ง/ผู้ใช้สำหรับทดสอบ (สร้างตารางที่ยังไม่มีให้ด้วย)"""
+    from password_hasher import password_hasher
+
+    engine, _ = _engines()
+    Base.metadata.create_all(engine)
+    started = time.perf_counter()
+    with database.SessionLocal() as db:
+        existing = set(db.execute(select(User.username).where(User.username.like("bench-%@harmoniq.test"))).scalars())
+        # ทุกคนใช้รหัสผ่านเดียวกัน — hash ครั้งเดียว
+        hashed = password_hasher.hash(PASSWORD)
+        new_users = [
+            {"display_name": f"bench {i}", "username": f"bench-{i}@harmoniq.test", "password": hashed}
+            for i in range(1, users + 1) if f"bench-{i}@harmoniq.test" not in existing
+        ]
+        if new_users:
+            db.execute(insert(User), new_users)
+
+        for c in range(1, concerts + 1):
+            concert = Concert(concert_name=f"Bench Concert {c}", band_name=BAND, concert_type="bench")
+            db.add(concert)
+            db.flush()
+            for z in range(1, zones + 1):
+                zone = Zone(concert_id=concert.concert_id, zone_name=f"Z{z}", price=1000 + 500 * z)
+                db.add(zone)
+                db.flush()
+                db.execute(insert(Seat), [
+                    {"concert_id": concert.concert_id, "zone_id": zone.zone_id, "seat_number": f"Z{z}-{n}"}
+                    for n in range(1, seats + 1)
+                ])
+        db.commit()
+    print(f"seeded      {concerts} concerts × {zones} zones × {seats} seats, {len(new_users)} new users "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+def bench_users() -> List[Tuple[int, str]]:
+    with database.SessionLocal() as db:
+        return db.execute(
+            select(User.id, User.username).where(User.username.like("bench-%@harmoniq.test")).order_by(User.id)
+        ).all()
+
+
+def bench_concert_ids() -> List[int]:
+    with database.SessionLocal() as db:
+        return list(db.execute(select(Concert.concert_id).where(Concert.band_name == BAND)).scalars())
+
+
+def oversold(concert_ids: List[int]) -> Dict[str, int]:
+    """ที่นั่งที่มีตั๋วมากกว่าหนึ่งใบ หรืออยู่ใน booking ที่ confirmed มากกว่าหนึ่งรายการ"""
+    with database.SessionLocal() as db:
+        seats = select(Seat.seat_id).where(Seat.concert_id.in_(concert_ids))
+        double_tickets = set(db.execute(
+            select(Ticket.seat_id).where(Ticket.seat_id.in_(seats))
+            .group_by(Ticket.seat_id).having(func.count(Ticket.ticket_id) > 1)
+        ).scalars())
+        double_bookings = set(db.execute(
+            select(BookingSeat.seat_id)
+            .join(Booking, Booking.booking_id == BookingSeat.booking_id)
+            .where(BookingSeat.seat_id.in_(seats), Booking.booking_status == BookingStatus.confirmed)
+            .group_by(BookingSeat.seat_id).having(func.count(BookingSeat.booking_id) > 1)
+        ).scalars())
+        tickets = db.execute(select(func.count(Ticket.ticket_id)).where(Ticket.seat_id.in_(seats))).scalar()
+    return {"oversold_seats": len(double_tickets | double_bookings), "tickets": tickets}
+
+
+class SchemaClient:
+    """เรียก schema ใน process นี้โดยตรง — ไม่ผ่าน HTTP/middleware แต่นับ SQL ต่อ step ได้"""
+
+    def __init__(self, user_id: int):
+        from graphql_app.context import Context
+        from graphql_app.schema import schema
+        self.user_id = user_id
+        self._context = Context
+        self._schema = schema
+
+    async def login(self, username: str) -> None:
+        pass
+
+    async def execute(self, query: str, variables: dict) -> Tuple[Optional[dict], List[str]]:
+        result = await self._schema.execute(query, variable_values=variables, context_value=self._context(user_id=self.user_id))
+        return result.data, [e.message for e in result.errors or []]
+
+    async def close(self) -> None:
+        pass
+
+
+class HttpClient:
+    """POST ไปที่ server ที่รันอยู่ — ผ่าน rate limit, cache และ session token เหมือนผู้ใช้จริง"""
+
+    def __init__(self, url: str, user_id: int):
+        try:
+            import httpx
+        except ImportError:
+            raise RuntimeError("--url ต้องติดตั้ง package httpx ก่อน (pip install httpx)")
+        self.url = url
+        self.user_id = user_id
+        self._http = httpx.AsyncClient(timeout=60)
+        self._headers = {}
+
+    async def login(self, username: str) -> None:
+        data, errors = await self.execute(LOGIN, {"username": username, "password": PASSWORD})
+        login = (data or {}).get("loginUser") or {}
+        if not login.get("success"):
+            raise RuntimeError(f"login {username} ไม่สำเร็จ: {login.get('message') or errors}")
+        self._headers = {"Authorization": f"Bearer {login['token']}"}
+
+    async def execute(self, query: str, variables: dict) -> Tuple[Optional[dict], List[str]]:
+        response = await self._http.post(self.url, json={"query": query, "variables": variables}, headers=self._headers)
+        if response.status_code == 429:
+            return None, ["RATE_LIMITED"]
+        body = response.json()
+        return body.get("data"), [e.get("message", "") for e in body.get("errors") or []]
+
+    async def close(self) -> None:
+        await self._http.aclose()
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {step: [] for step in STEPS}
+        self.scenarios: List[float] = []
+        self.queries: Counter = Counter()
+        self.outcomes: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.seats_booked = 0
+
+    def count_query(self, *args) -> None:
+        step = _current_step.get()
+        if step is not None:
+            self.queries[step] += 1
+
+
+def percentile(values: List[float], p: float) -> float:
+    """nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))]
+
+
+class VirtualUser:
+    def __init__(self, client, user_id: int, stats: Stats, rng: random.Random, args, sold_out: Set[Tuple[int, str]]):
+        self.client = client
+        self.user_id = user_id
+        self.stats = stats
+        self.rng = rng
+        self.args = args
+        self.sold_out = sold_out
+
+    async def step(self, name: str, query: str, variables: dict) -> Tuple[Optional[dict], List[str]]:
+        token = _current_step.set(name)
+        started = time.perf_counter()
+        try:
+            return await self.client.execute(query, variables)
+        finally:
+            self.stats.latencies[name].append(time.perf_counter() - started)
+            _current_step.reset(token)
+
+    def fail(self, step: str, errors: List[str]) -> None:
+        if any("RATE_LIMITED" in e for e in errors):
+            self.stats.outcomes["rate_limited"] += 1
+        else:
+            self.stats.outcomes[f"{step}_error"] += 1
+            self.stats.errors[f"{step}: {errors[0][:120]}"] += 1
+
+    async def run_once(self, concert_ids: Set[int]) -> bool:
+        """หนึ่งรอบของผู้ใช้หนึ่งคน — คืน False เมื่อทุกโซนขายหมดแล้ว"""
+        data, errors = await self.step("browse", BROWSE, {"first": 50})
+        if errors:
+            self.fail("browse", errors)
+            return True
+        zones = [
+            (node["concertId"], zone["zoneId"], zone["zoneName"])
+            for node in (edge["node"] for edge in data["getConcerts"]["edges"]) if node["concertId"] in concert_ids
+            for zone in node["zones"] if (node["concertId"], zone["zoneName"]) not in self.sold_out
+        ]
+        if not zones:
+            return False
+        concert_id, zone_id, zone_name = self.rng.choice(zones)
+
+        data, errors = await self.step("seats", SEATS, {"concertId": concert_id, "zoneName": zone_name})
+        if errors:
+            self.fail("seats", errors)
+            return True
+        free = [s["seatId"] for s in data["getSeatsByConcertZone"] if s["seatStatus"].lower().endswith("available")]
+        if not free:
+            self.sold_out.add((concert_id, zone_name))
+            self.stats.outcomes["sold_out"] += 1
+            return True
+        count = min(len(free), self.rng.randint(*self.args.seats_per_booking))
+        # คนส่วนใหญ่เลือกที่นั่งติดกันแถวหน้า — ทำให้ชนกันบ่อยเหมือนตอนเปิดขายจริง
+        start = min(int(self.rng.expovariate(1 / max(1, len(free) / 10))), len(free) - count)
+        seat_ids = free[start:start + count]
+
+        admission_token = None
+        if self.args.waiting_room:
+            admission_token = await self.queue(concert_id)
+            if admission_token is None:
+                return True
+
+        data, errors = await self.step("book", BOOK, {
+            "userId": self.user_id, "concertId": concert_id, "zoneId": zone_id,
+            "seatIds": seat_ids, "seatCount": len(seat_ids), "admissionToken": admission_token
+        })
+        if errors:
+            if any("ถูกจองแล้ว" in e for e in errors):
+                self.stats.outcomes["conflict"] += 1
+            else:
+                self.fail("book", errors)
+            return True
+        self.stats.outcomes["booked"] += 1
+
+        if self.rng.random() >= self.args.pay_ratio:
+            self.stats.outcomes["abandoned"] += 1
+            return True
+        data, errors = await self.step("pay", PAY, {"bookingId": data["createBooking"]["bookingId"]})
+        if errors:
+            self.fail("pay", errors)
+            return True
+        self.stats.outcomes["paid"] += 1
+        self.stats.seats_booked += len(data["confirmPaymentAndGenerateTickets"])
+        return True
+
+    async def queue(self, concert_id: int) -> Optional[str]:
+        """เข้าห้องรอแล้วถามสถานะตาม retryAfterSeconds จนได้ admissionToken — เวลารอทั้งหมดนับเป็น step queue"""
+        token = _current_step.set("queue")
+        started = time.perf_counter()
+        try:
+            data, errors = await self.client.execute(JOIN, {"concertId": concert_id, "userId": self.user_id})
+            if errors:
+                self.fail("queue", errors)
+                return None
+            admission = data["joinWaitingRoom"]
+            queue_token = admission["queueToken"]
+            while not admission["admitted"]:
+                await asyncio.sleep(admission["retryAfterSeconds"])
+                data, errors = await self.client.execute(STATUS, {"queueToken": queue_token})
+                if errors:
+                    self.fail("queue", errors)
+                    return None
+                admission = data["waitingRoomStatus"]
+            return admission["admissionToken"]
+        finally:
+            self.stats.latencies["queue"].append(time.perf_counter() - started)
+            _current_step.reset(token)
+
+
+async def run(args) -> dict:
+    concert_ids = set(bench_concert_ids())
+    users = bench_users()
+    if not concert_ids or not users:
+        raise SystemExit("ยังไม่มีข้อมูลทดสอบ — รันพร้อม --seed ก่อน")
+    if args.url is None and not args.waiting_room:
+        from waiting_room import waiting_room
+        waiting_room.enabled = False
+
+    stats = Stats()
+    if args.url is None:
+        import lifecycle
+        errors = lifecycle.config_errors()
+        if errors:
+            raise SystemExit("\n".join(f"❌ {error}" for error in errors))
+        # จองช่วง ticket_code ไว้ก่อน — ไม่ให้ confirmPayment แรกต้องเปิด transaction ที่สองกลาง transaction ของตัวเอง
+        from ticket_code import ticket_codes, aallocate_block
+        ticket_codes.add_block(await aallocate_block())
+        # ที่นั่งชนกันเป็นเรื่องปกติของโหลดเทสต์ — ไม่ต้องพิมพ์ traceback ทุกครั้ง
+        logging.getLogger("strawberry.execution").setLevel(logging.CRITICAL)
+        for engine in _engines():
+            event.listen(engine, "before_cursor_execute", stats.count_query)
+
+    rng = random.Random(args.random_seed)
+    sold_out: Set[Tuple[int, str]] = set()
+    picked = rng.sample(users, min(args.concurrency, len(users)))
+    clients = [HttpClient(args.url, uid) if args.url else SchemaClient(uid) for uid, _ in picked]
+    await asyncio.gather(*(client.login(username) for client, (_, username) in zip(clients, picked)))
+    vusers = [VirtualUser(client, uid, stats, random.Random(rng.random()), args, sold_out)
+              for client, (uid, _) in zip(clients, picked)]
+
+    deadline = time.perf_counter() + args.duration
+    remaining = [args.iterations]
+
+    async def loop(vuser: VirtualUser):
+        while time.perf_counter() < deadline and (args.iterations is None or remaining[0] > 0):
+            if args.iterations is not None:
+                remaining[0] -= 1
+            started = time.perf_counter()
+            if not await vuser.run_once(concert_ids):
+                return
+            stats.scenarios.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(loop(v) for v in vusers))
+    elapsed = time.perf_counter() - started
+    for client in clients:
+        await client.close()
+
+    report = {
+        "mode": "http" if args.url else "in-process",
+        "concurrency": len(vusers),
+        "elapsed_seconds": round(elapsed, 3),
+        "scenarios": len(stats.scenarios),
+        "scenarios_per_second": round(len(stats.scenarios) / elapsed, 2),
+        "requests_per_second": round(sum(len(v) for v in stats.latencies.values()) / elapsed, 2),
+        "tickets_per_second": round(stats.seats_booked / elapsed, 2),
+        "steps": {
+            step: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+                "max_ms": round(max(values, default=0) * 1000, 2),
+                "queries_per_call": round(stats.queries[step] / len(values), 2) if values and args.url is None else None,
+            }
+            for step, values in stats.latencies.items()
+        },
+        "scenario_p95_ms": round(percentile(stats.scenarios, 95) * 1000, 2),
+        "outcomes": dict(stats.outcomes),
+        "errors": dict(stats.errors.most_common(5)),
+    }
+    report.update(oversold(sorted(concert_ids)))
+    return report
+
+
+def print_report(report: dict) -> None:
+    print(f"mode        {report['mode']}, {report['concurrency']} virtual users, {report['elapsed_seconds']}s")
+    print(f"throughput  {report['scenarios_per_second']} scenarios/s, {report['requests_per_second']} requests/s, "
+          f"{report['tickets_per_second']} tickets/s")
+    print(f"{'step':8} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'SQL/call':>9}")
+    for step, s in report["steps"].items():
+        if s["count"]:
+            queries = "-" if s["queries_per_call"] is None else f"{s['queries_per_call']:.1f}"
+            print(f"{step:8} {s['count']:>7} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['max_ms']:>9.1f} {queries:>9}")
+    print(f"outcomes    {', '.join(f'{k}={v}' for k, v in sorted(report['outcomes'].items()))}")
+    for message, count in report["errors"].items():
+        print(f"  {count:>5} × {message}")
+    print(f"{'✅' if report['oversold_seats'] == 0 else '❌'} oversold seats: {report['oversold_seats']} "
+          f"({report['tickets']} tickets issued)")
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """step ที่ p95 ช้ากว่า baseline เกิน tolerance (เช่น 0.2 = 20%)"""
+    regressions = []
+    for step, s in report["steps"].items():
+        before = baseline.get("steps", {}).get(step, {}).get("p95_ms")
+        if before and s["count"] and s["p95_ms"] > before * (1 + tolerance):
+            regressions.append(f"{step} p95 {before:.1f} → {s['p95_ms']:.1f} ms")
+    return regressions
+
+
+def _range(value: str) -> Tuple[int, int]:
+    low, _, high = value.partition("-")
+    return int(low), int(high or low)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the booking flow and report latency, throughput, SQL counts and oversells")
+    parser.add_argument("--db", help="SQLAlchemy URL (sync driver), e.g. sqlite:///bench.db — default: [Database] in config.ini")
+    parser.add_argument("--url", help="GraphQL endpoint of a running server; default runs the schema in this process")
+    parser.add_argument("--seed", action="store_true", help="insert bench concerts, zones, seats and users first")
+    parser.add_argument("--concerts", type=int, default=2)
+    parser.add_argument("--zones", type=int, default=4, help="zones per concert")
+    parser.add_argument("--seats", type=int, default=250, help="seats per zone")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50, help="virtual users running at once")
+    parser.add_argument("--duration", type=float, default=30, help="seconds (stops earlier when sold out)")
+    parser.add_argument("--iterations", type=int, default=None, help="stop after this many scenarios in total")
+    parser.add_argument("--seats-per-booking", type=_range, default=(1, 4), help="e.g. 2 or 1-4")
+    parser.add_argument("--pay-ratio", type=float, default=0.9, help="share of bookings that pay; the rest let the hold expire")
+    parser.add_argument("--no-waiting-room", dest="waiting_room", action="store_false",
+                        help="skip joinWaitingRoom (in-process runs also turn the admission check off)")
+    parser.add_argument("--random-seed", type=int, default=1)
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="report from an earlier run; exit 1 if a step's p95 regressed")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 regression against --baseline")
+    args = parser.parse_args()
+
+    if args.db:
+        use_database(args.db)
+    if args.seed:
+        seed(args.concerts, args.zones, args.seats, args.users)
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    failed = report["oversold_seats"] > 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"❌ regression: {line}")
+        failed = failed or bool(regressions)
+    sys.exit(1 if failed else 0)
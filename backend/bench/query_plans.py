@@ -0,0 +1,86 @@
+# ตรวจ query plan ของ query ที่ถูกเรียกบ่อย — exit code 1 ถ้ามี query ไหนต้อง scan ทั้งตาราง
+#   python -m bench.query_plans
+#   python -m pytest test_query_plans.py   (ชุดเดียวกันในรูป test)
+# รันกับฐานข้อมูลที่มีข้อมูลขนาดใกล้ของจริง: ตารางเล็กๆ MySQL อาจเลือก full scan เพราะถูกกว่าใช้ index
+import argparse
+import re
+import sys
+from datetime import datetime
+from sqlalchemy import event
+from graphql_app.database import SessionLocal
+from graphql_app.model import Booking, Ticket
+from graphql_app.pagination import keyset
+from seat_index import _zone_id_query, _zone_seats_query
+from hold_gateway import _claimable_stmt, _held_by_stmt, _expired_holds_stmt, _expired_bookings_stmt
+from booking_gateway import _bookings_by_user_stmt, _booking_seats_stmt
+from seat_gateway import _seats_by_bookings_stmt
+from ticket_gateway import _tickets_by_user_stmt
+from gate_gateway import _gate_tickets_stmt
+from typing import Dict, List, Tuple
+
+
+def hot_queries() -> Dict[str, object]:
+    now = datetime.now()
+    return {
+        "zone id by name": _zone_id_query(1, "A"),
+        "zone seat map": _zone_seats_query(1, 1),
+        "claimable seats": _claimable_stmt(1, 1, [1, 2, 3], now),
+        "seats held by booking": _held_by_stmt(1),
+        "expired holds": _expired_holds_stmt(now),
+        "expired bookings": _expired_bookings_stmt(now),
+        "bookings by user": keyset(_bookings_by_user_stmt(1), Booking.booking_id, 20, None, descending=True),
+        "booking seats": _booking_seats_stmt(1),
+        "seats by bookings": _seats_by_bookings_stmt([1, 2]),
+        "tickets by user": keyset(_tickets_by_user_stmt(1), Ticket.ticket_id, 20, None, descending=True),
+        "gate tickets": _gate_tickets_stmt(1),
+    }
+
+
+def explain(db, stmt) -> Tuple[List[str], List[str]]:
+    """คืน (บรรทัดของ plan, ตารางที่ถูก scan ทั้งตาราง)"""
+    conn = db.connection()
+    dialect = conn.dialect.name
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+
+    def add_explain(conn, cursor, statement, parameters, context, executemany):
+        return prefix + statement, parameters
+
+    event.listen(conn, "before_cursor_execute", add_explain, retval=True)
+    try:
+        result = conn.execute(stmt)
+        # ชื่อคอลัมน์จาก driver — ถ้าจำนวนคอลัมน์ของ plan เท่ากับของ SELECT, SQLAlchemy จะตั้งชื่อตาม SELECT
+        names = [d[0] for d in result.cursor.description]
+        rows = [dict(zip(names, row)) for row in result]
+    finally:
+        event.remove(conn, "before_cursor_execute", add_explain)
+
+    if dialect == "sqlite":
+        lines = [row["detail"] for row in rows]
+        full_scans = [m.group(1) for m in (re.match(r"SCAN (\w+)$", line) for line in lines) if m]
+    else:
+        lines = [f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']}" for row in rows]
+        full_scans = [row["table"] for row in rows if row["type"] == "ALL"]
+    return lines, full_scans
+
+
+def run(verbose: bool) -> int:
+    failures = 0
+    with SessionLocal() as db:
+        for name, stmt in hot_queries().items():
+            lines, full_scans = explain(db, stmt)
+            db.rollback()
+            ok = not full_scans
+            failures += not ok
+            print(f"{'✅' if ok else '❌'} {name}" + ("" if ok else f" — full scan on {', '.join(full_scans)}"))
+            if verbose or not ok:
+                for line in lines:
+                    print(f"      {line}")
+    print(f"{failures} of {len(hot_queries())} hot queries fall back to full scans")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail if a hot query falls back to a full table scan")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every plan, not only failures")
+    args = parser.parse_args()
+    sys.exit(run(args.verbose))
@@ -0,0 +1,40 @@
+import argparse
+import secrets
+import time
+from ticket_code import TicketCodeGenerator, ALPHABET, BLOCK_SIZE, SECRET, is_valid_code
+
+
+def run(count: int, batch: int) -> None:
+    # ไม่ได้ตั้ง [TicketCode] secret ก็วัดได้ — ใช้ key สุ่มเฉพาะรอบนี้
+    generator = TicketCodeGenerator(SECRET if SECRET is not None else secrets.randbits(64))
+    blocks = count // BLOCK_SIZE + 1
+    for block_id in range(1, blocks + 1):
+        generator.add_block(block_id)
+
+    started = time.perf_counter()
+    codes = []
+    while len(codes) < count:
+        codes += generator.generate(min(batch, count - len(codes)))
+    elapsed = time.perf_counter() - started
+
+    print(f"generated   {count:,} codes in {elapsed:.3f}s ({count / elapsed:,.0f} codes/s, batch={batch})")
+    print(f"unique      {len(set(codes)) == len(codes)}")
+
+    started = time.perf_counter()
+    valid = sum(1 for code in codes if is_valid_code(code))
+    elapsed = time.perf_counter() - started
+    print(f"verified    {valid:,}/{count:,} ({count / elapsed:,.0f} checks/s)")
+
+    sample = codes[:10000]
+    mistyped = [code[:i] + c + code[i + 1:] for code in sample[:1000] for i in range(10) for c in ALPHABET if c != code[i]]
+    swapped = [code[:i] + code[i + 1] + code[i] + code[i + 2:] for code in sample for i in range(9) if code[i] != code[i + 1]]
+    print(f"mistyped    {sum(map(is_valid_code, mistyped))}/{len(mistyped):,} accepted")
+    print(f"swapped     {sum(map(is_valid_code, swapped))}/{len(swapped):,} accepted")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the ticket code generator (no database needed)")
+    parser.add_argument("--count", type=int, default=2_000_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    args = parser.parse_args()
+    run(args.count, args.batch)
@@ -1,182 +1,223 @@
-import random
-import string
-from sqlalchemy.orm import Session
-from graphql_app.database import SessionLocal
-from graphql_app.model import Booking, Ticket, Concert, Zone, Seat, BookingSeat
+from datetime import datetime
+from sqlalchemy import insert, select
+from graphql_app.database import AsyncSessionLocal
+from graphql_app.model import Booking, Ticket, Concert, Zone, Seat, BookingSeat, BookingStatus
 from typing import Optional, List
 from sqlalchemy.sql import func
+from hold_gateway import AsyncHoldGateway
+from ticket_code import ticket_codes
+from outbox import booking_event, arecord_events, BOOKING_CREATED, BOOKING_CONFIRMED, BOOKING_CANCELLED, TICKET_ISSUED
+from graphql_app.pagination import keyset, MAX_PAGE_SIZE
 
-class BookingGateway:
+def _bookings_by_user_stmt(user_id: int):
+    return (
+        select(
+            Booking.booking_id,
+            Booking.user_id,
+            Booking.booking_status,
+            Booking.concert_id,
+            Booking.zone_id,
+            Concert.concert_name,
+            Zone.zone_name,
+            func.group_concat(Seat.seat_number).label("seat_numbers"),
+            func.count(BookingSeat.seat_id).label("seat_count"),
+            func.sum(Zone.price).label("total_price")
+        )
+        .join(Concert, Booking.concert_id == Concert.concert_id)
+        .join(Zone, Booking.zone_id == Zone.zone_id)
+        .join(BookingSeat, Booking.booking_id == BookingSeat.booking_id)
+        .join(Seat, BookingSeat.seat_id == Seat.seat_id)
+        .where(Booking.user_id == user_id)
+        .group_by(Booking.booking_id)
+    )
+
+
+def _booking_summary(b) -> dict:
+    return {
+        "booking_id": b.booking_id,
+        "user_id": b.user_id,
+        "concert_id": b.concert_id,
+        "zone_id": b.zone_id,
+        "concert_name": b.concert_name,
+        "zone_name": b.zone_name,
+        "seat_numbers": b.seat_numbers.split(",") if b.seat_numbers else [],
+        "seat_count": b.seat_count,
+        "total_price": float(b.total_price),
+        "booking_status": b.booking_status
+    }
+
+
+def _booking_seats_stmt(booking_id: int):
+    """ชื่อคอนเสิร์ต/โซน/ราคา และที่นั่งทุกที่ของ booking ใน query เดียว (หนึ่งแถวต่อที่นั่ง)"""
+    return (
+        select(Concert.concert_name, Zone.zone_name, Zone.price, Seat.seat_id, Seat.seat_number)
+        .select_from(Booking)
+        .join(Concert, Booking.concert_id == Concert.concert_id)
+        .join(Zone, Booking.zone_id == Zone.zone_id)
+        .outerjoin(BookingSeat, Booking.booking_id == BookingSeat.booking_id)
+        .outerjoin(Seat, BookingSeat.seat_id == Seat.seat_id)
+        .where(Booking.booking_id == booking_id)
+        .order_by(Seat.seat_id)
+    )
+
+
+def _new_seats_stmt(seat_ids: List[int]):
+    return (
+        select(Seat.seat_number, Concert.concert_name, Zone.zone_name, Zone.price)
+        .join(Zone, Seat.zone_id == Zone.zone_id)
+        .join(Concert, Seat.concert_id == Concert.concert_id)
+        .where(Seat.seat_id.in_(seat_ids))
+        .order_by(Seat.seat_id)
+    )
+
+
+def _ticket_rows(booking: Booking, seats: list, codes: List[str]) -> List[dict]:
+    """แถวของตั๋วทุกใบพร้อม ticket_code ที่สร้างไว้ล่วงหน้า — insert ได้ในคำสั่งเดียว"""
+    return [
+        {
+            "booking_id": booking.booking_id,
+            "user_id": booking.user_id,
+            "seat_id": s.seat_id,
+            "ticket_code": code,
+            "concert_name": s.concert_name,
+            "zone_name": s.zone_name,
+            "seat_number": s.seat_number
+        }
+        for s, code in zip(seats, codes)
+    ]
+
+
+def _issued_tickets_stmt(tickets: List[dict]):
+    # MySQL ไม่มี RETURNING — ดึง ticket_id กลับด้วย ticket_code ที่ unique ใน query เดียว
+    return select(Ticket.ticket_code, Ticket.ticket_id).where(Ticket.ticket_code.in_([t["ticket_code"] for t in tickets]))
+
+
+def _validate_seat_ids(seat_ids: List[int]) -> None:
+    if not seat_ids:
+        raise ValueError("ต้องเลือกที่นั่งอย่างน้อย 1 ที่")
+    if len(set(seat_ids)) != len(seat_ids):
+        raise ValueError("seat_ids ต้องไม่ซ้ำกัน")
+
+
+def _booking_event(event_type: str, booking: Booking, **data) -> dict:
+    return booking_event(event_type, booking.booking_id, user_id=booking.user_id,
+                         concert_id=booking.concert_id, zone_id=booking.zone_id, **data)
+
+
+def _confirmed_events(booking: Booking, tickets: List[dict]) -> List[dict]:
+    """booking_confirmed หนึ่งรายการ ตามด้วย ticket_issued ต่อตั๋วหนึ่งใบ"""
+    events = [_booking_event(BOOKING_CONFIRMED, booking, seat_ids=[t["seat_id"] for t in tickets])]
+    events += [
+        booking_event(TICKET_ISSUED, booking.booking_id, **{k: t[k] for k in (
+            "ticket_id", "ticket_code", "user_id", "seat_id", "concert_name", "zone_name", "seat_number")})
+        for t in tickets
+    ]
+    return events
+
+
+class AsyncBookingGateway:
     @classmethod
-    def get_bookings(cls) -> List[Booking]:
-       
-        with SessionLocal() as db:
-            return db.query(Booking).all()
+    async def get_bookings_by_user(cls, user_id: int, limit: int = MAX_PAGE_SIZE, after: Optional[int] = None) -> List[dict]:
+        """booking ของผู้ใช้ ใหม่สุดก่อน ต่อจาก booking_id after ไม่เกิน limit + 1 รายการ"""
+        async with AsyncSessionLocal() as db:
+            bookings = (await db.execute(
+                keyset(_bookings_by_user_stmt(user_id), Booking.booking_id, limit, after, descending=True)
+            )).all()
+        return [_booking_summary(b) for b in bookings]
 
     @classmethod
-    def get_booking_by_id(cls, booking_id: int) -> Optional[Booking]:
-        
-        with SessionLocal() as db:
-            return db.query(Booking).filter(Booking.booking_id == booking_id).first()
+    async def count_bookings_by_user(cls, user_id: int) -> int:
+
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(select(func.count(Booking.booking_id)).where(Booking.user_id == user_id))).scalar()
 
     @classmethod
-    def update_booking_status(cls, booking_id: int, new_status: str) -> Optional[dict]:
-     
-        with SessionLocal() as db:
-            booking = db.query(Booking).filter(Booking.booking_id == booking_id).first()
-            if booking:
-                booking.booking_status = new_status
-                db.commit()
-
-                concert = db.query(Concert).filter(Concert.concert_id == booking.concert_id).first()
-                zone = db.query(Zone).filter(Zone.zone_id == booking.zone_id).first()
-                seats = db.query(Seat).filter(Seat.zone_id == booking.zone_id).all()
-            
-                return {
-                    "booking_id": booking.booking_id,
-                    "user_id": booking.user_id,
-                    "concert_name": concert.concert_name if concert else None,
-                    "zone_name": zone.zone_name if zone else None,
-                    "seat_numbers": [s.seat_number for s in seats], 
-                    "booking_status": booking.booking_status
-                }
-            return None
+    async def get_booking_owner(cls, booking_id: int) -> Optional[int]:
+        """user_id เจ้าของ booking หรือ None ถ้าไม่มี booking นี้"""
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(select(Booking.user_id).where(Booking.booking_id == booking_id))).scalar()
 
     @classmethod
-    def get_bookings_by_user(cls, user_id: int) -> List[dict]:
-       
-        with SessionLocal() as db:
-            bookings = (
-            db.query(
-                Booking.booking_id,
-                Booking.user_id,
-                Booking.booking_status,
-                Booking.concert_id, 
-                Concert.concert_name,
-                Zone.zone_name,
-                func.group_concat(Seat.seat_number).label("seat_numbers"), 
-                func.count(BookingSeat.seat_id).label("seat_count"),
-                func.sum(Zone.price).label("total_price")
+    async def create_booking(cls, user_id: int, concert_id: int, zone_id: int, seat_ids: List[int]) -> Optional[dict]:
+        """สร้าง booking (pending) และถือที่นั่งทั้งหมดไว้ใน transaction เดียว"""
+        _validate_seat_ids(seat_ids)
+
+        async with AsyncSessionLocal() as db:
+            now = datetime.now()
+            new_booking = Booking(
+                user_id=user_id,
+                concert_id=concert_id,
+                zone_id=zone_id,
+                booking_status=BookingStatus.pending,
+                created_at=now
             )
-            .join(Concert, Booking.concert_id == Concert.concert_id)
-            .join(Zone, Booking.zone_id == Zone.zone_id)
-            .join(BookingSeat, Booking.booking_id == BookingSeat.booking_id)  
-            .join(Seat, BookingSeat.seat_id == Seat.seat_id)  
-            .filter(Booking.user_id == user_id)
-            .group_by(Booking.booking_id)
-            .all()
-        )
-        return [
-            {
-                "booking_id": b.booking_id,
-                "user_id": b.user_id,
-                "concert_id": b.concert_id,
-                "concert_name": b.concert_name,
-                "zone_name": b.zone_name,
-                "seat_numbers": b.seat_numbers.split(",") if b.seat_numbers else [],  
-                "seat_count": b.seat_count,
-                "total_price": float(b.total_price),
-                "booking_status": b.booking_status
+            db.add(new_booking)
+            await db.flush()
+
+            new_booking.expires_at = await AsyncHoldGateway.claim_seats(db, new_booking.booking_id, concert_id, zone_id, seat_ids, now)
+
+            await db.execute(insert(BookingSeat), [
+                {"booking_id": new_booking.booking_id, "seat_id": seat_id} for seat_id in seat_ids
+            ])
+
+            seats = (await db.execute(_new_seats_stmt(seat_ids))).all()
+            await arecord_events(db, [_booking_event(BOOKING_CREATED, new_booking, seat_ids=seat_ids, expires_at=new_booking.expires_at)])
+            await db.commit()
+
+            return {
+                "booking_id": new_booking.booking_id,
+                "user_id": new_booking.user_id,
+                "concert_id": new_booking.concert_id,
+                "zone_id": new_booking.zone_id,
+                "concert_name": seats[0].concert_name,
+                "zone_name": seats[0].zone_name,
+                "seat_numbers": [s.seat_number for s in seats],
+                "seat_count": len(seat_ids),
+                "total_price": float(sum(s.price for s in seats)),
+                "booking_status": new_booking.booking_status,
+                "expires_at": new_booking.expires_at
             }
-            for b in bookings
-        ]
 
-    
-    
     @classmethod
-    def confirm_payment(cls, booking_id: int) -> Optional[List[Ticket]]:
-        """เมื่อชำระเงินแล้ว → เปลี่ยนสถานะการจอง และออกตั๋ว"""
-        with SessionLocal() as db:
-            booking = db.query(Booking).filter(Booking.booking_id == booking_id).first()
-        if booking and booking.booking_status == "pending":  
-           
-            booking.booking_status = "confirmed"
-            db.commit()
-
-         
-            booked_seats = db.query(BookingSeat).filter(BookingSeat.booking_id == booking_id).all()
-
-            tickets = []
-            for seat in booked_seats:
-                seat_info = db.query(Seat).filter(Seat.seat_id == seat.seat_id).first()
-
-                seat_info.seat_status = "booked"
-                db.commit()
-
-                ticket_code = "".join(random.choices(string.ascii_uppercase + string.digits, k=10))
-                qr_code = "".join(random.choices(string.ascii_letters + string.digits, k=20))
-
-                new_ticket = Ticket(
-                    booking_id=booking_id,
-                    user_id=booking.user_id,
-                    seat_id=seat.seat_id,  
-                    ticket_code=ticket_code
-                )
-                db.add(new_ticket)
-                db.commit()
-                db.refresh(new_ticket)
-
-                tickets.append(new_ticket)
+    async def update_booking_status(cls, booking_id: int, new_status: str) -> Optional[dict]:
+        """ผู้ใช้ยกเลิกการจองที่ยังไม่ชำระเงินได้เท่านั้น (ปล่อยที่นั่งและลบ booking) — confirmed ได้จาก confirm_payment ทางเดียว"""
+        if new_status not in BookingStatus.__members__:
+            raise ValueError(f"สถานะ {new_status} ไม่ถูกต้อง")
+        if new_status != "cancelled":
+            raise ValueError("เปลี่ยนสถานะการจองได้เฉพาะเป็น cancelled — ยืนยันการจองด้วยการชำระเงิน")
 
-            return tickets
-        return None
-    
-    @classmethod
-    def create_booking(cls, user_id: int, concert_id: int, zone_id: int, seat_ids: List[int]) -> Optional[dict]:
-       
-        if not seat_ids:
-            raise ValueError("ต้องเลือกที่นั่งอย่างน้อย 1 ที่")
- 
-        with SessionLocal() as db:
-            booked_seats = (
-            db.query(Seat)
-            .filter(Seat.seat_id.in_(seat_ids), Seat.seat_status == "booked")
-            .all()
-        )
- 
-        if booked_seats:
-            raise ValueError(f"ที่นั่ง {', '.join([seat.seat_number for seat in booked_seats])} ถูกจองแล้ว กรุณาเลือกที่นั่งอื่น")
- 
-        new_booking = Booking(
-            user_id=user_id,
-            concert_id=concert_id,
-            zone_id=zone_id,
-            booking_status="pending"
-        )
-        db.add(new_booking)
-        db.commit()
-        db.refresh(new_booking)
- 
-        for seat_id in seat_ids:
-            new_booking_seat = BookingSeat(
-                booking_id=new_booking.booking_id,
-                seat_id=seat_id
-            )
-            db.add(new_booking_seat)
- 
-        db.commit()
- 
-        return {
-            "booking_id": new_booking.booking_id,
-            "user_id": new_booking.user_id,
-            "concert_id": new_booking.concert_id,
-            "concert_name": db.query(Concert.concert_name).filter(Concert.concert_id == concert_id).scalar(),
-            "zone_name": db.query(Zone.zone_name).filter(Zone.zone_id == zone_id).scalar(),
-            "seat_numbers": seat_ids,
-            "seat_count": len(seat_ids),
-            "total_price": db.query(func.sum(Zone.price)).filter(Zone.zone_id == zone_id).scalar() * len(seat_ids),
-            "booking_status": new_booking.booking_status
-        }
+        async with AsyncSessionLocal() as db:
+            booking = await db.get(Booking, booking_id, with_for_update=True)
+            if not booking:
+                return None
+            if booking.booking_status == BookingStatus.confirmed:
+                raise ValueError("การจองที่ชำระเงินแล้วยกเลิกไม่ได้")
+
+            # cancelled อยู่แล้ว = reaper ปล่อยที่นั่งไปแล้ว เหลือแค่ลบ booking
+            if booking.booking_status == BookingStatus.pending:
+                await AsyncHoldGateway.release_booking(db, booking_id)
+                await arecord_events(db, [_booking_event(BOOKING_CANCELLED, booking, reason="cancelled")])
+            await db.delete(booking)
+            await db.commit()
+            return None
 
-            
     @classmethod
-    def delete_booking(cls, booking_id: int) -> bool:
-        """ลบการจองเมื่อถูกยกเลิก"""
-        with SessionLocal() as db:
-            booking = db.query(Booking).filter(Booking.booking_id == booking_id).first()
-            if not booking:
-                return False
+    async def confirm_payment(cls, booking_id: int) -> List[dict]:
+        """เมื่อชำระเงินแล้ว → ยืนยันที่นั่งที่ถือไว้ เปลี่ยนสถานะการจอง และออกตั๋วทั้งหมดใน transaction เดียว"""
+        async with AsyncSessionLocal() as db:
+            booking = await db.get(Booking, booking_id, with_for_update=True)
+            if not booking or booking.booking_status != BookingStatus.pending:
+                return []
 
-            db.delete(booking)
-            db.commit()
-            return True  
\ No newline at end of file
+            seats = [s for s in (await db.execute(_booking_seats_stmt(booking_id))).all() if s.seat_id is not None]
+            await AsyncHoldGateway.confirm_seats(db, booking_id, [s.seat_id for s in seats])
+            booking.booking_status = BookingStatus.confirmed
+
+            tickets = _ticket_rows(booking, seats, await ticket_codes.agenerate(len(seats)))
+            if tickets:
+                await db.execute(insert(Ticket), tickets)
+                ticket_ids = dict((await db.execute(_issued_tickets_stmt(tickets))).all())
+                tickets = [dict(t, ticket_id=ticket_ids[t["ticket_code"]]) for t in tickets]
+            await arecord_events(db, _confirmed_events(booking, tickets))
+            await db.commit()
+            return tickets
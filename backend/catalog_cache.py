@@ -0,0 +1,300 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from graphql_app.database import replica_reads
+from graphql_app.model import Concert, Zone
+from config.config import Config
+from metrics import registry, gauge
+from redis_client import redis_client
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
+
+cache_config = Config("config/config.ini").load_cache_config()
+
+BACKEND = cache_config.get('backend', 'memory').strip().lower()
+TTL_SECONDS = float(cache_config.get('ttl_seconds', 300))
+MAX_ENTRIES = int(cache_config.get('max_entries', 10000))
+REDIS_URL = cache_config.get('redis_url', 'redis://localhost:6379/0')
+KEY_PREFIX = cache_config.get('key_prefix', 'harmoniq:')
+
+MISS = object()
+
+
+class LRUCacheBackend:
+    """cache ใน process — เกิน max_entries จะทิ้งรายการที่ไม่ได้ใช้นานที่สุด และทุกรายการหมดอายุเมื่อครบ ttl"""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl_seconds: float = TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # เริ่มจากเวลาตอนเปิด process — restart แล้ว version ไม่ซ้ำกับของเดิม
+        self._version = int(time.time() * 1000)
+
+    async def get_many(self, keys: List[str]) -> List[Any]:
+        return [self._get(key) for key in keys]
+
+    async def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def version(self) -> int:
+        return self._version
+
+    def invalidate(self, keys: List[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+            self._version += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._version += 1
+
+    def _get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISS
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return MISS
+            self._entries.move_to_end(key)
+            return entry[1]
+
+
+class RedisCacheBackend:
+    """cache ที่ใช้ร่วมกันหลาย process — เก็บค่าเป็น JSON"""
+
+    def __init__(self, client, sync_client, ttl_seconds: float = TTL_SECONDS, prefix: str = KEY_PREFIX):
+        # client (redis.asyncio) ใช้ใน request — sync_client ใช้ล้าง cache หลัง commit ที่ไม่ได้อยู่บน event loop (script, thread)
+        self.client = client
+        self.sync_client = sync_client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.version_key = prefix + "catalog-version"
+        self._tasks: set = set()
+
+    async def get_many(self, keys: List[str]) -> List[Any]:
+        raws = await self.client.mget([self.prefix + key for key in keys])
+        return [MISS if raw is None else json.loads(raw) for raw in raws]
+
+    async def set(self, key: str, value: Any) -> None:
+        await self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(self.ttl_seconds)))
+
+    async def version(self) -> int:
+        return int(await self.client.get(self.version_key) or 0)
+
+    def invalidate(self, keys: List[str]) -> None:
+        self._run(self._ainvalidate, self._invalidate, [self.prefix + key for key in keys])
+
+    def clear(self) -> None:
+        self._run(self._aclear, self._clear)
+
+    def _run(self, async_fn, sync_fn, *args) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            sync_fn(*args)
+            return
+        # บน event loop — ส่งด้วย client แบบ async โดยไม่รอผล (generation ใน ReadThroughCache กันค่าเก่าใน process นี้ไว้แล้ว)
+        task = loop.create_task(async_fn(*args))
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ Error invalidating catalog cache: {str(task.exception())}")
+
+    def _invalidate(self, keys: List[str]) -> None:
+        pipe = self.sync_client.pipeline()
+        if keys:
+            pipe.delete(*keys)
+        pipe.incr(self.version_key)
+        pipe.execute()
+
+    async def _ainvalidate(self, keys: List[str]) -> None:
+        pipe = self.client.pipeline()
+        if keys:
+            pipe.delete(*keys)
+        pipe.incr(self.version_key)
+        await pipe.execute()
+
+    # เลข version ต้องไม่ถูกลบ — ถ้านับใหม่จาก 0 ETag เก่าจะกลับมาตรงอีก
+    def _clear(self) -> None:
+        keys = [key for key in self.sync_client.scan_iter(match=self.prefix + "*") if key != self.version_key.encode()]
+        self._invalidate(keys)
+
+    async def _aclear(self) -> None:
+        keys = [key async for key in self.client.scan_iter(match=self.prefix + "*") if key != self.version_key.encode()]
+        await self._ainvalidate(keys)
+
+
+class ReadThroughCache:
+    """read-through cache หน้า gateway ของคอนเสิร์ต/โซน — ค่าที่คืนใช้ร่วมกันทุกผู้เรียก ห้ามแก้ไข"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._stats: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def aget(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        value = (await self.backend.get_many([key]))[0]
+        self._count(key, value is not MISS)
+        if value is not MISS:
+            return value
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            generation = self._generation
+            # เติม cache จาก primary — ค่าที่ replica ยังตามไม่ทันจะค้างอยู่ใน cache ได้นานถึง ttl_seconds
+            with replica_reads(False):
+                value = await load()
+            await self._store(key, value, generation)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            # ไม่มีใครรอ future นี้ก็ไม่ต้องเตือน "exception was never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def aget_many(self, keys: List[str],
+                        load_missing: Callable[[List[str]], Awaitable[Dict[str, Any]]]) -> List[Any]:
+        """load_missing รับ key ที่ไม่อยู่ใน cache และต้องคืนค่าของทุก key นั้น"""
+        values = await self.backend.get_many(keys)
+        missing = [key for key, value in zip(keys, values) if value is MISS]
+        for key, value in zip(keys, values):
+            self._count(key, value is not MISS)
+        if not missing:
+            return values
+
+        generation = self._generation
+        with replica_reads(False):
+            loaded = await load_missing(missing)
+        for key in missing:
+            await self._store(key, loaded[key], generation)
+        return [loaded[key] if value is MISS else value for key, value in zip(keys, values)]
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            self._generation += 1
+        self.backend.invalidate(list(keys))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+        self.backend.clear()
+
+    async def data_version(self) -> int:
+        """เลขที่เพิ่มทุกครั้งที่ข้อมูลคอนเสิร์ต/โซนเปลี่ยน (ใช้ร่วมกันทุก process เมื่อใช้ redis)"""
+        return await self.backend.version()
+
+    def stats(self) -> Dict[str, dict]:
+        """{"concert": {"hits": ..., "misses": ..., "hit_ratio": ...}, ...}"""
+        with self._lock:
+            return {
+                namespace: {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_ratio": hits / (hits + misses) if hits + misses else 0.0
+                }
+                for namespace, (hits, misses) in self._stats.items()
+            }
+
+    def _count(self, key: str, hit: bool) -> None:
+        with self._lock:
+            self._stats[key.split(":", 1)[0]][0 if hit else 1] += 1
+
+    async def _store(self, key: str, value: Any, generation: int) -> None:
+        # โหลดคร่อมการ invalidate — คืนค่าให้ผู้เรียกแต่ไม่เก็บ ไม่ให้ค่าที่อ่านก่อนการเขียนทับค่าใหม่
+        if generation == self._generation:
+            await self.backend.set(key, value)
+
+
+def _backend_from_config():
+    if BACKEND == "redis":
+        return RedisCacheBackend(redis_client(REDIS_URL, "Cache backend", use_asyncio=True),
+                                 redis_client(REDIS_URL, "Cache backend"))
+    return LRUCacheBackend()
+
+
+catalog_cache = ReadThroughCache(_backend_from_config())
+
+
+def _cache_gauges():
+    stats = catalog_cache.stats()
+    lines = []
+    for name, field, help in (("harmoniq_catalog_cache_hits", "hits", "Catalog cache hits by key namespace"),
+                              ("harmoniq_catalog_cache_misses", "misses", "Catalog cache misses by key namespace"),
+                              ("harmoniq_catalog_cache_hit_ratio", "hit_ratio", "Catalog cache hit ratio by key namespace")):
+        lines += gauge(name, help, [((("namespace", namespace),), values[field]) for namespace, values in stats.items()])
+    return lines
+
+
+registry.add_collector(_cache_gauges)
+
+
+def concert_keys(concert_id: int) -> List[str]:
+    return [f"concert:{concert_id}", "concerts:all"]
+
+
+def zone_keys(zone_id: int, concert_id: int) -> List[str]:
+    return [f"zone:{zone_id}", f"zones:{concert_id}"]
+
+
+def invalidate_concert(concert_id: int) -> None:
+    """เรียกหลังแก้คอนเสิร์ตด้วย UPDATE/DELETE ตรงๆ (ORM flush ถูกจับให้อัตโนมัติแล้ว)"""
+    catalog_cache.invalidate(concert_keys(concert_id))
+
+
+def invalidate_zone(zone_id: int, concert_id: int) -> None:
+    catalog_cache.invalidate(zone_keys(zone_id, concert_id))
+
+
+# การเขียน Concert/Zone ผ่าน ORM ถูกจดไว้กับ session แล้วค่อยล้าง cache หลัง commit สำเร็จ
+def _record_concert_write(mapper, connection, target: Concert):
+    keys = inspect(target).session.info.setdefault("cache_invalidations", set())
+    keys.update(concert_keys(target.concert_id))
+
+
+def _record_zone_write(mapper, connection, target: Zone):
+    keys = inspect(target).session.info.setdefault("cache_invalidations", set())
+    keys.update(zone_keys(target.zone_id, target.concert_id))
+    # ย้ายโซนไปคอนเสิร์ตอื่น — รายการโซนของคอนเสิร์ตเดิมก็ต้องล้างด้วย
+    for old_concert_id in inspect(target).attrs.concert_id.history.deleted:
+        keys.add(f"zones:{old_concert_id}")
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(Concert, _event, _record_concert_write)
+    event.listen(Zone, _event, _record_zone_write)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_cache_invalidations(db: Session):
+    keys = db.info.pop("cache_invalidations", None)
+    if keys:
+        catalog_cache.invalidate(keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_cache_invalidations(db: Session):
+    db.info.pop("cache_invalidations", None)
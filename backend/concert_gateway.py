@@ -1,24 +1,65 @@
-from sqlalchemy.orm import Session
-from graphql_app.database import SessionLocal
+from sqlalchemy import select
+from graphql_app.database import AsyncSessionLocal
 from graphql_app.model import Concert
-from typing import Optional, List
+from catalog_cache import catalog_cache
+from bisect import bisect_right
+from typing import Optional, List, Dict
+
+class AsyncConcertGateway:
+    """อ่านผ่าน catalog_cache — ถึงฐานข้อมูลเฉพาะตอน cache miss"""
+
+    @classmethod
+    async def get_concerts(cls) -> List[dict]:
+        return await catalog_cache.aget("concerts:all", cls._load_concerts)
+
+    @classmethod
+    async def get_concerts_page(cls, limit: int, after: Optional[int] = None) -> List[dict]:
+        """คอนเสิร์ตถัดจาก concert_id after ไม่เกิน limit + 1 รายการ — ตัดจากรายการใน cache"""
+        concerts = await cls.get_concerts()
+        start = 0 if after is None else bisect_right([c["concert_id"] for c in concerts], after)
+        return concerts[start:start + limit + 1]
+
+    @classmethod
+    async def count_concerts(cls) -> int:
+        return len(await cls.get_concerts())
 
-class ConcertGateway:
     @classmethod
-    def get_concerts(cls) -> List[Concert]:
-        with SessionLocal() as db:
-            return db.query(Concert).all()
+    async def _load_concerts(cls) -> List[dict]:
+        async with AsyncSessionLocal() as db:
+            concerts = (await db.execute(select(Concert).order_by(Concert.concert_id))).scalars().all()
+            return [_concert_dict(c) for c in concerts]
 
+    @classmethod
+    async def get_concert_by_id(cls, concert_id: int) -> Optional[dict]:
+        return await catalog_cache.aget(f"concert:{concert_id}", lambda: cls._load_concert(concert_id))
 
     @classmethod
-    def get_concert_by_id(cls, concert_id: int) -> Optional[dict]:
-        with SessionLocal() as db:
-            concert = db.query(Concert).filter(Concert.concert_id == concert_id).first()
+    async def _load_concert(cls, concert_id: int) -> Optional[dict]:
+        async with AsyncSessionLocal() as db:
+            concert = await db.get(Concert, concert_id)
             if concert:
-                return {
-                    "concert_id": concert.concert_id,
-                    "concert_name": concert.concert_name,
-                    "band_name": concert.band_name,
-                    "concert_type": concert.concert_type
-                }
+                return _concert_dict(concert)
         return None
+
+    @classmethod
+    async def get_concerts_by_ids(cls, concert_ids: List[int]) -> List[dict]:
+        """ใช้โดย DataLoader — id ที่ไม่อยู่ใน cache ถูกดึงด้วย IN (...) ครั้งเดียว"""
+        concerts = await catalog_cache.aget_many([f"concert:{i}" for i in concert_ids], cls._load_missing)
+        return [c for c in concerts if c]
+
+    @classmethod
+    async def _load_missing(cls, keys: List[str]) -> Dict[str, Optional[dict]]:
+        concert_ids = [int(key.split(":")[1]) for key in keys]
+        async with AsyncSessionLocal() as db:
+            concerts = (await db.execute(select(Concert).where(Concert.concert_id.in_(concert_ids)))).scalars().all()
+        found = {f"concert:{c.concert_id}": _concert_dict(c) for c in concerts}
+        return {key: found.get(key) for key in keys}
+
+
+def _concert_dict(c: Concert) -> dict:
+    return {
+        "concert_id": c.concert_id,
+        "concert_name": c.concert_name,
+        "band_name": c.band_name,
+        "concert_type": c.concert_type
+    }
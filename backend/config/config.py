@@ -1,13 +1,38 @@
 import configparser
+import os
+
+
+def is_true(value) -> bool:
+    """ค่า bool จาก config.ini — 1/true/yes/on (ไม่สนตัวพิมพ์)"""
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
 
 class Config:
+    # config.ini ถูกอ่านครั้งเดียวต่อ path แล้วใช้ร่วมกันทุก instance
+    _parsers: dict[str, configparser.ConfigParser] = {}
+
     def __init__(self, conf_path: str):
         self.conf_path = conf_path
 
-    def load_db_config(self) -> dict[str, str]:
-        try:
+    def _read(self) -> configparser.ConfigParser:
+        conf = self._parsers.get(self.conf_path)
+        if conf is None:
             conf = configparser.ConfigParser()
             conf.read(self.conf_path)
+            self._parsers[self.conf_path] = conf
+        return conf
+
+    def reload(self) -> None:
+        self._parsers.pop(self.conf_path, None)
+
+    @staticmethod
+    def _secret(conf: configparser.ConfigParser, section: str, env_name: str) -> str:
+        # key จริงมาจาก environment ของ deployment — config.ini ใน repo เว้นว่างไว้
+        return os.environ.get(env_name) or conf.get(section, 'secret', fallback='')
+
+    def load_db_config(self) -> dict[str, str]:
+        try:
+            conf = self._read()
 
             return {
                 'host': conf.get('Database', 'host', fallback='localhost'),
@@ -20,15 +45,288 @@ class Config:
             print(f"❌ Error loading DB config: {str(e)}")
             return {}
 
+    def load_read_replica_config(self) -> dict[str, str]:
+        try:
+            conf = self._read()
+
+            return {
+                'hosts': conf.get('ReadReplica', 'hosts', fallback=''),
+                'user': conf.get('ReadReplica', 'user', fallback=''),
+                'password': conf.get('ReadReplica', 'password', fallback=''),
+                'database': conf.get('ReadReplica', 'database', fallback=''),
+                'sticky_seconds': conf.get('ReadReplica', 'sticky_seconds', fallback='5'),
+                'retry_seconds': conf.get('ReadReplica', 'retry_seconds', fallback='10'),
+                'sticky_store': conf.get('ReadReplica', 'sticky_store', fallback='memory'),
+                'redis_url': conf.get('ReadReplica', 'redis_url', fallback='redis://localhost:6379/0'),
+            }
+        except Exception as e:
+            print(f"❌ Error loading ReadReplica config: {str(e)}")
+            return {}
+
     def load_server_config(self) -> dict[str, str]:
         try:
-            conf = configparser.ConfigParser()
-            conf.read(self.conf_path)
+            conf = self._read()
 
             return {
                 'host': conf.get('Server', 'host', fallback='127.0.0.1'),
                 'port': conf.get('Server', 'port', fallback='8000'),
+                'workers': conf.get('Server', 'workers', fallback='1'),
+                'reload': conf.get('Server', 'reload', fallback='false'),
+                'backlog': conf.get('Server', 'backlog', fallback='2048'),
+                'keep_alive_seconds': conf.get('Server', 'keep_alive_seconds', fallback='5'),
+                'limit_concurrency': conf.get('Server', 'limit_concurrency', fallback='0'),
+                'drain_seconds': conf.get('Server', 'drain_seconds', fallback='5'),
+                'graceful_timeout_seconds': conf.get('Server', 'graceful_timeout_seconds', fallback='30'),
+                'warm_connections': conf.get('Server', 'warm_connections', fallback='4'),
+                'warm_caches': conf.get('Server', 'warm_caches', fallback='true'),
+                'ready_timeout_seconds': conf.get('Server', 'ready_timeout_seconds', fallback='2'),
+                'proxy_headers': conf.get('Server', 'proxy_headers', fallback='false'),
+                'forwarded_allow_ips': conf.get('Server', 'forwarded_allow_ips', fallback='127.0.0.1'),
             }
         except Exception as e:
             print(f"❌ Error loading Server config: {str(e)}")
             return {}
+
+    def load_booking_config(self) -> dict[str, str]:
+        try:
+            conf = self._read()
+
+            return {
+                'hold_ttl_seconds': conf.get('Booking', 'hold_ttl_seconds', fallback='600'),
+                'reaper_interval_seconds': conf.get('Booking', 'reaper_interval_seconds', fallback='15'),
+            }
+        except Exception as e:
+            print(f"❌ Error loading Booking config: {str(e)}")
+            return {}
+
+    def load_seat_index_config(self) -> dict[str, str]:
+        try:
+            conf = self._read()
+
+            return {
+                'refresh_seconds': conf.get('SeatIndex', 'refresh_seconds', fallback='30'),
+            }
+        except Exception as e:
+            print(f"❌ Error loading SeatIndex config: {str(e)}")
+            return {}
+
+    def load_pool_config(self) -> dict[str, str]:
+        try:
+            conf = self._read()
+
+            return {
+                'pool_size': conf.get('Pool', 'pool_size', fallback='10'),
+                'max_overflow': conf.get('Pool', 'max_overflow', fallback='20'),
+                'pool_timeout': conf.get('Pool', 'pool_timeout', fallback='30'),
+                'pool_recycle': conf.get('Pool', 'pool_recycle', fallback='1800'),
+                'pool_pre_ping': conf.get('Pool', 'pool_pre_ping', fallback='true'),
+                'echo': conf.get('Pool', 'echo', fallback='false'),
+            }
+        except Exception as e:
+            print(f"❌ Error loading Pool config: {str(e)}")
+            return {}
+
+    def load_ticket_code_config(self) -> dict[str, str]:
+        try:
+            conf = self._read()
+
+            return {
+                'secret': self._secret(conf, 'TicketCode', 'HARMONIQ_TICKET_CODE_SECRET'),
+            }
+        except Exception as e:
+            print(f"❌ Error loading TicketCode config: {str(e)}")
+            return {}
+
+    def load_cache_config(self) -> dict[str, str]:
+        try:
+            conf = self._read()
+
+            return {
+                'backend': conf.get('Cache', 'backend', fallback='memory'),
+                'ttl_seconds': conf.get('Cache', 'ttl_seconds', fallback='300'),
+                'max_entries': conf.get('Cache', 'max_entries', fallback='10000'),
+                'redis_url': conf.get('Cache', 'redis_url', fallback='redis://localhost:6379/0'),
+                'key_prefix': conf.get('Cache', 'key_prefix', fallback='harmoniq:'),
+            }
+        except Exception as e:
+            print(f"❌ Error loading Cache config: {str(e)}")
+            return {}
+
+    def load_seat_events_config(self) -> dict[str, str]:
+        try:
+            conf = self._read()
+
+            return {
+                'broker': conf.get('SeatEvents', 'broker', fallback='memory'),
+                'redis_url': conf.get('SeatEvents', 'redis_url', fallback='redis://localhost:6379/0'),
+                'channel': conf.get('SeatEvents', 'channel', fallback='harmoniq:seat-events'),
+            }
+        except Exception as e:
+            print(f"❌ Error loading SeatEvents config: {str(e)}")
+            return {}
+
+    def load_waiting_room_config(self) -> dict[str, str]:
+        try:
+            conf = self._read()
+
+            config = {
+                'enabled': conf.get('WaitingRoom', 'enabled', fallback='true'),
+                'admit_per_second': conf.get('WaitingRoom', 'admit_per_second', fallback='20'),
+                'burst': conf.get('WaitingRoom', 'burst', fallback='20'),
+                'pass_ttl_seconds': conf.get('WaitingRoom', 'pass_ttl_seconds', fallback='600'),
+                'queue_ttl_seconds': conf.get('WaitingRoom', 'queue_ttl_seconds', fallback='7200'),
+                'secret': self._secret(conf, 'WaitingRoom', 'HARMONIQ_WAITING_ROOM_SECRET'),
+                'store': conf.get('WaitingRoom', 'store', fallback='memory'),
+                'redis_url': conf.get('WaitingRoom', 'redis_url', fallback='redis://localhost:6379/0'),
+            }
+            # อัตราเฉพาะคอนเสิร์ต เช่น admit_per_second.12 = 100
+            if conf.has_section('WaitingRoom'):
+                config.update({k: v for k, v in conf.items('WaitingRoom') if k.startswith('admit_per_second.')})
+            return config
+        except Exception as e:
+            print(f"❌ Error loading WaitingRoom config: {str(e)}")
+            return {}
+
+    def load_rate_limit_config(self) -> dict[str, str]:
+        try:
+            conf = self._read()
+
+            config = {
+                'enabled': conf.get('RateLimit', 'enabled', fallback='true'),
+                'default': conf.get('RateLimit', 'default', fallback='10,40'),
+                'store': conf.get('RateLimit', 'store', fallback='memory'),
+                'redis_url': conf.get('RateLimit', 'redis_url', fallback='redis://localhost:6379/0'),
+                'max_keys': conf.get('RateLimit', 'max_keys', fallback='100000'),
+                'trust_forwarded_for': conf.get('RateLimit', 'trust_forwarded_for', fallback='false'),
+            }
+            # limit เฉพาะ field เช่น limit.loginUser = 0.2,5
+            if conf.has_section('RateLimit'):
+                config.update({k: v for k, v in conf.items('RateLimit') if k.startswith('limit.')})
+            return config
+        except Exception as e:
+            print(f"❌ Error loading RateLimit config: {str(e)}")
+            return {}
+
+    def load_password_config(self) -> dict[str, str]:
+        try:
+            conf = self._read()
+
+            return {
+                'bcrypt_rounds': conf.get('Password', 'bcrypt_rounds', fallback='12'),
+                'workers': conf.get('Password', 'workers', fallback='0'),
+                'max_queue': conf.get('Password', 'max_queue', fallback='64'),
+            }
+        except Exception as e:
+            print(f"❌ Error loading Password config: {str(e)}")
+            return {}
+
+    def load_session_config(self) -> dict[str, str]:
+        try:
+            conf = self._read()
+
+            return {
+                'ttl_seconds': conf.get('Session', 'ttl_seconds', fallback='86400'),
+                'secret': self._secret(conf, 'Session', 'HARMONIQ_SESSION_SECRET'),
+                'store': conf.get('Session', 'store', fallback='memory'),
+                'redis_url': conf.get('Session', 'redis_url', fallback='redis://localhost:6379/0'),
+            }
+        except Exception as e:
+            print(f"❌ Error loading Session config: {str(e)}")
+            return {}
+
+    def load_graphql_config(self) -> dict[str, str]:
+        try:
+            conf = self._read()
+
+            return {
+                'document_cache_size': conf.get('GraphQL', 'document_cache_size', fallback='512'),
+                'persisted_queries': conf.get('GraphQL', 'persisted_queries', fallback='true'),
+                'persisted_query_max': conf.get('GraphQL', 'persisted_query_max', fallback='5000'),
+                'persisted_query_store': conf.get('GraphQL', 'persisted_query_store', fallback='memory'),
+                'redis_url': conf.get('GraphQL', 'redis_url', fallback='redis://localhost:6379/0'),
+            }
+        except Exception as e:
+            print(f"❌ Error loading GraphQL config: {str(e)}")
+            return {}
+
+    def load_response_cache_config(self) -> dict[str, str]:
+        try:
+            conf = self._read()
+
+            return {
+                'enabled': conf.get('ResponseCache', 'enabled', fallback='true'),
+                'max_age': conf.get('ResponseCache', 'max_age', fallback='30'),
+                'stale_while_revalidate': conf.get('ResponseCache', 'stale_while_revalidate', fallback='60'),
+                'max_entries': conf.get('ResponseCache', 'max_entries', fallback='1000'),
+            }
+        except Exception as e:
+            print(f"❌ Error loading ResponseCache config: {str(e)}")
+            return {}
+
+    def load_query_cost_config(self) -> dict[str, str]:
+        try:
+            conf = self._read()
+
+            config = {
+                'enabled': conf.get('QueryCost', 'enabled', fallback='true'),
+                'max_cost': conf.get('QueryCost', 'max_cost', fallback='300'),
+                'max_depth': conf.get('QueryCost', 'max_depth', fallback='10'),
+                'object_cost': conf.get('QueryCost', 'object_cost', fallback='1'),
+            }
+            # cost เฉพาะ field เช่น cost.getSeatsByConcertZone = 10
+            if conf.has_section('QueryCost'):
+                config.update({k: v for k, v in conf.items('QueryCost') if k.startswith('cost.')})
+            return config
+        except Exception as e:
+            print(f"❌ Error loading QueryCost config: {str(e)}")
+            return {}
+
+    def load_outbox_config(self) -> dict[str, str]:
+        try:
+            conf = self._read()
+
+            return {
+                'enabled': conf.get('Outbox', 'enabled', fallback='true'),
+                'sink': conf.get('Outbox', 'sink', fallback='jsonl'),
+                'path': conf.get('Outbox', 'path', fallback='outbox/booking-events.jsonl'),
+                'redis_url': conf.get('Outbox', 'redis_url', fallback='redis://localhost:6379/0'),
+                'stream': conf.get('Outbox', 'stream', fallback='harmoniq:booking-events'),
+                'stream_maxlen': conf.get('Outbox', 'stream_maxlen', fallback='1000000'),
+                'relay_name': conf.get('Outbox', 'relay_name', fallback='default'),
+                'batch_size': conf.get('Outbox', 'batch_size', fallback='500'),
+                'interval_seconds': conf.get('Outbox', 'interval_seconds', fallback='1'),
+            }
+        except Exception as e:
+            print(f"❌ Error loading Outbox config: {str(e)}")
+            return {}
+
+    def load_tracing_config(self) -> dict[str, str]:
+        try:
+            conf = self._read()
+
+            return {
+                'enabled': conf.get('Tracing', 'enabled', fallback='true'),
+                'resolvers': conf.get('Tracing', 'resolvers', fallback='true'),
+                'response_extensions': conf.get('Tracing', 'response_extensions', fallback='false'),
+                'max_operations': conf.get('Tracing', 'max_operations', fallback='200'),
+                'metrics_token': conf.get('Tracing', 'metrics_token', fallback=''),
+            }
+        except Exception as e:
+            print(f"❌ Error loading Tracing config: {str(e)}")
+            return {}
+
+    def load_query_log_config(self) -> dict[str, str]:
+        try:
+            conf = self._read()
+
+            return {
+                'enabled': conf.get('QueryLog', 'enabled', fallback='true'),
+                'slow_ms': conf.get('QueryLog', 'slow_ms', fallback='200'),
+                'repeat_threshold': conf.get('QueryLog', 'repeat_threshold', fallback='10'),
+                'sample_rate': conf.get('QueryLog', 'sample_rate', fallback='1.0'),
+                'log_parameters': conf.get('QueryLog', 'log_parameters', fallback='false'),
+                'max_statement_chars': conf.get('QueryLog', 'max_statement_chars', fallback='1000'),
+            }
+        except Exception as e:
+            print(f"❌ Error loading QueryLog config: {str(e)}")
+            return {}
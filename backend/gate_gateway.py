@@ -0,0 +1,77 @@
+from datetime import datetime
+from sqlalchemy import select, update
+from graphql_app.database import AsyncSessionLocal
+from graphql_app.model import Ticket, Booking
+from gate_index import GateValidationIndex
+from typing import Optional
+
+
+def _gate_tickets_stmt(concert_id: int, issued_through: Optional[int] = None):
+    stmt = (
+        select(Ticket.ticket_code, Ticket.ticket_id, Ticket.zone_name, Ticket.seat_number, Ticket.scanned_at)
+        .join(Booking, Booking.booking_id == Ticket.booking_id)
+        .where(Booking.concert_id == concert_id)
+    )
+    if issued_through is not None:
+        stmt = stmt.where(Ticket.ticket_id <= issued_through)
+    return stmt
+
+
+def _build_index(concert_id: int, rows, issued_through: Optional[int] = None) -> GateValidationIndex:
+    if issued_through is None:
+        issued_through = max((r.ticket_id for r in rows), default=0)
+    index = GateValidationIndex(
+        concert_id,
+        issued_through,
+        ((r.ticket_code, r.ticket_id, r.zone_name, r.seat_number) for r in rows)
+    )
+    scanned = {r.ticket_id for r in rows if r.scanned_at is not None}
+    for ordinal, ticket_id in enumerate(index.ticket_ids):
+        if ticket_id in scanned:
+            index.scanned[ordinal >> 3] |= 1 << (ordinal & 7)
+    return index
+
+
+class AsyncGateGateway:
+    """ฝั่งเซิร์ฟเวอร์ของการสแกนหน้าประตู — export index ให้เครื่องสแกน และรวม bitmap ที่สแกนแล้วจากทุกประตู"""
+
+    @classmethod
+    async def export_index(cls, concert_id: int) -> GateValidationIndex:
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(_gate_tickets_stmt(concert_id))).all()
+        return _build_index(concert_id, rows)
+
+    @classmethod
+    async def sync_scans(cls, concert_id: int, issued_through: int, ticket_count: int,
+                         scanned_bitmap: bytes) -> dict:
+        """บันทึก scanned_at ตาม bitmap (ลำดับเดียวกับ index ที่ export ไป) คืนจำนวนที่บันทึกใหม่และ bitmap รวมของทุกประตู"""
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(_gate_tickets_stmt(concert_id, issued_through))).all()
+            index = _build_index(concert_id, rows, issued_through)
+            if len(index) != ticket_count or len(scanned_bitmap) != len(index.scanned):
+                raise ValueError("ข้อมูลตั๋วของเครื่องสแกนไม่ตรงกับเซิร์ฟเวอร์ กรุณาดาวน์โหลด index ใหม่")
+
+            ticket_ids = [
+                index.ticket_ids[ordinal]
+                for ordinal in range(len(index))
+                if scanned_bitmap[ordinal >> 3] & (1 << (ordinal & 7)) and not index.is_scanned(ordinal)
+            ]
+            newly_scanned = 0
+            if ticket_ids:
+                result = await db.execute(
+                    update(Ticket)
+                    .where(Ticket.ticket_id.in_(ticket_ids), Ticket.scanned_at.is_(None))
+                    .values(scanned_at=datetime.now())
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+                newly_scanned = result.rowcount
+
+        index.merge_scanned(scanned_bitmap)
+        return {
+            "concert_id": concert_id,
+            "issued_through": issued_through,
+            "newly_scanned": newly_scanned,
+            "scanned_count": sum(bin(b).count("1") for b in index.scanned),
+            "scanned_bitmap": bytes(index.scanned)
+        }
@@ -0,0 +1,139 @@
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from hashlib import blake2b
+from typing import Iterable, List, Optional, Tuple
+
+MAGIC = b"HQGI"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHIIIH")
+
+VALID = "valid"
+ALREADY_SCANNED = "already_scanned"
+UNKNOWN = "unknown"
+
+
+def code_key(ticket_code: str) -> int:
+    """64-bit key ของ ticket_code — index เก็บแค่ key ไม่ต้องเก็บ code เต็ม"""
+    return int.from_bytes(blake2b(ticket_code.strip().upper().encode(), digest_size=8).digest(), "little")
+
+
+def _to_le(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class GateValidationIndex:
+    """index สำหรับตรวจตั๋วแบบ offline ของหนึ่งคอนเสิร์ต — ลำดับของตั๋วใน key ที่เรียงแล้วคือบิตใน bitmap ที่สแกนแล้ว"""
+
+    def __init__(self, concert_id: int, issued_through: int,
+                 rows: Iterable[Tuple[str, int, str, str]]):
+        """rows: (ticket_code, ticket_id, zone_name, seat_number)"""
+        entries = sorted((code_key(code), ticket_id, zone_name, seat_number)
+                         for code, ticket_id, zone_name, seat_number in rows)
+        self.concert_id = concert_id
+        self.issued_through = issued_through
+        self.zone_names: List[str] = sorted({e[2] for e in entries})
+        zone_ordinals = {name: i for i, name in enumerate(self.zone_names)}
+        self.keys = array('Q', (e[0] for e in entries))
+        self.ticket_ids = array('I', (e[1] for e in entries))
+        self.zones = array('H', (zone_ordinals[e[2]] for e in entries))
+        self.seat_numbers: List[str] = [e[3] for e in entries]
+        self.scanned = bytearray((len(entries) + 7) // 8)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def find(self, ticket_code: str) -> Optional[int]:
+        key = code_key(ticket_code)
+        i = bisect_left(self.keys, key)
+        return i if i < len(self.keys) and self.keys[i] == key else None
+
+    def is_scanned(self, ordinal: int) -> bool:
+        return bool(self.scanned[ordinal >> 3] & (1 << (ordinal & 7)))
+
+    def check(self, ticket_code: str) -> dict:
+        ordinal = self.find(ticket_code)
+        if ordinal is None:
+            return {"status": UNKNOWN, "ticket_id": None, "zone_name": None, "seat_number": None}
+        return {
+            "status": ALREADY_SCANNED if self.is_scanned(ordinal) else VALID,
+            "ticket_id": self.ticket_ids[ordinal],
+            "zone_name": self.zone_names[self.zones[ordinal]],
+            "seat_number": self.seat_numbers[ordinal]
+        }
+
+    def scan(self, ticket_code: str) -> dict:
+        """check แล้วทำเครื่องหมายว่าสแกนแล้ว — สแกนซ้ำจะได้ already_scanned"""
+        result = self.check(ticket_code)
+        if result["status"] == VALID:
+            ordinal = self.find(ticket_code)
+            self.scanned[ordinal >> 3] |= 1 << (ordinal & 7)
+        return result
+
+    def merge_scanned(self, bitmap: bytes) -> None:
+        """รวม bitmap จากเซิร์ฟเวอร์/ประตูอื่นเข้ามา"""
+        if len(bitmap) != len(self.scanned):
+            raise ValueError("scanned bitmap does not match this index")
+        self.scanned = bytearray(a | b for a, b in zip(self.scanned, bitmap))
+
+    def to_bytes(self) -> bytes:
+        zone_blob = b"".join(struct.pack("<B", len(n.encode())) + n.encode() for n in self.zone_names)
+        seat_blob = b"".join(struct.pack("<B", len(s.encode())) + s.encode() for s in self.seat_numbers)
+        body = (
+            _HEADER.pack(MAGIC, FORMAT_VERSION, self.concert_id, self.issued_through, len(self), len(self.zone_names))
+            + zone_blob
+            + _to_le(self.keys)
+            + _to_le(self.ticket_ids)
+            + _to_le(self.zones)
+            + seat_blob
+            + bytes(self.scanned)
+        )
+        return zlib.compress(body)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "GateValidationIndex":
+        body = zlib.decompress(data)
+        magic, version, concert_id, issued_through, count, zone_count = _HEADER.unpack_from(body)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("not a gate validation index")
+        offset = _HEADER.size
+
+        def read_strings(n: int) -> List[str]:
+            nonlocal offset
+            values = []
+            for _ in range(n):
+                length = body[offset]
+                values.append(body[offset + 1:offset + 1 + length].decode())
+                offset += 1 + length
+            return values
+
+        def read_array(typecode: str) -> array:
+            nonlocal offset
+            size = array(typecode).itemsize * count
+            values = _from_le(typecode, body[offset:offset + size])
+            offset += size
+            return values
+
+        index = cls.__new__(cls)
+        index.concert_id = concert_id
+        index.issued_through = issued_through
+        index.zone_names = read_strings(zone_count)
+        index.keys = read_array('Q')
+        index.ticket_ids = read_array('I')
+        index.zones = read_array('H')
+        index.seat_numbers = read_strings(count)
+        index.scanned = bytearray(body[offset:offset + (count + 7) // 8])
+        return index
@@ -17,6 +17,9 @@ class LoginResponse:
     success: bool
     message: str
     user: Optional[UserType]
+    # ส่งกลับมาใน header "Authorization: Bearer <token>" ทุกคำขอ
+    token: Optional[str] = None
+    expires_at: Optional[int] = None
 
 @strawberry.type
 class ConcertType:
@@ -25,6 +28,11 @@ class ConcertType:
     band_name: str
     concert_type: str
 
+    @strawberry.field
+    async def zones(self, info: strawberry.Info) -> List["ZoneType"]:
+        zones = await info.context.loaders.zones_by_concert.load(self.concert_id)
+        return [ZoneType(**z) for z in zones]
+
 @strawberry.type
 class ZoneType:
     zone_id: int
@@ -32,6 +40,11 @@ class ZoneType:
     zone_name: str
     price: float
 
+    @strawberry.field
+    async def concert(self, info: strawberry.Info) -> Optional[ConcertType]:
+        concert = await info.context.loaders.concert_by_id.load(self.concert_id)
+        return ConcertType(**concert) if concert else None
+
 @strawberry.type
 class SeatType:
     seat_id: int
@@ -51,6 +64,32 @@ class BookingType:
     seat_count: int 
     total_price: float 
     status: str  
+    zone_id: Optional[int] = None
+
+    @strawberry.field
+    async def concert(self, info: strawberry.Info) -> Optional[ConcertType]:
+        concert = await info.context.loaders.concert_by_id.load(self.concert_id)
+        return ConcertType(**concert) if concert else None
+
+    @strawberry.field
+    async def zone(self, info: strawberry.Info) -> Optional[ZoneType]:
+        if self.zone_id is None:
+            return None
+        zone = await info.context.loaders.zone_by_id.load(self.zone_id)
+        return ZoneType(**zone) if zone else None
+
+    @strawberry.field
+    async def seats(self, info: strawberry.Info) -> List[SeatType]:
+        seats = await info.context.loaders.seats_by_booking.load(self.booking_id)
+        return [
+            SeatType(
+                seat_id=s["seat_id"],
+                concert_id=s["concert_id"],
+                zone_name=s["zone_name"],
+                seat_number=s["seat_number"],
+                seat_status=s["seat_status"]
+            ) for s in seats
+        ]
 
 @strawberry.type
 class TicketType:
@@ -60,4 +99,34 @@ class TicketType:
     concert_name: str
     zone_name: str
     seat_number: str
-    ticket_code: str
\ No newline at end of file
+    ticket_code: str
+@strawberry.type
+class GateIndexType:
+    concert_id: int
+    issued_through: int
+    ticket_count: int
+    data: str  # GateValidationIndex.to_bytes() เข้ารหัส base64
+
+@strawberry.type
+class GateSyncResultType:
+    concert_id: int
+    issued_through: int
+    newly_scanned: int
+    scanned_count: int
+    scanned_bitmap: str  # base64
+
+@strawberry.type
+class SeatDeltaType:
+    concert_id: int
+    zone_id: int
+    snapshot: bool  # True = seats คือ seat map ทั้งโซน, False = เฉพาะที่นั่งที่เปลี่ยน
+    seats: List[SeatType]
+
+@strawberry.type
+class AdmissionType:
+    concert_id: int
+    queue_token: Optional[str]
+    position: int  # 0 เมื่อถึงคิวแล้ว
+    admitted: bool
+    admission_token: Optional[str]  # ส่งไปกับ createBooking
+    retry_after_seconds: float
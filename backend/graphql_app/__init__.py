@@ -1,2 +1 @@
-from . import schema
 __version__ = '0.0.1'
\ No newline at end of file
@@ -0,0 +1,44 @@
+import strawberry
+from typing import Optional
+from starlette.requests import HTTPConnection
+from strawberry.fastapi import BaseContext
+from session_tokens import session_tokens, bearer_token
+from user_gateway import AsyncUserGateway
+from .dataloaders import Loaders
+
+
+class Context(BaseContext):
+    def __init__(self, user_id: Optional[int] = None, session_token: Optional[str] = None):
+        super().__init__()
+        self.loaders = Loaders()
+        # ผู้ใช้ที่ยืนยันแล้วจาก session token — None ถ้ายังไม่ได้ login
+        self.user_id = user_id
+        self.session_token = session_token
+        # โหลดเมื่อ resolver แรกเรียก require_staff
+        self.is_staff: Optional[bool] = None
+
+
+async def get_context(connection: HTTPConnection) -> Context:
+    # HTTPConnection ใช้ได้ทั้ง HTTP request และ WebSocket
+    token = bearer_token(connection.headers.get("authorization"))
+    return Context(user_id=await session_tokens.verify(token), session_token=token)
+
+
+def require_user(info: strawberry.Info, user_id: int) -> None:
+    """โยน ValueError ถ้าผู้เรียกไม่ได้ login เป็น user_id — กันการส่ง user_id ของคนอื่นมา"""
+    current = info.context.user_id
+    if current is None:
+        raise ValueError("กรุณาเข้าสู่ระบบก่อน")
+    if current != user_id:
+        raise ValueError("ไม่มีสิทธิ์เข้าถึงข้อมูลของผู้ใช้อื่น")
+
+
+async def require_staff(info: strawberry.Info) -> None:
+    """โยน ValueError ถ้าผู้เรียกไม่ใช่เจ้าหน้าที่ (users.is_staff)"""
+    context = info.context
+    if context.user_id is None:
+        raise ValueError("กรุณาเข้าสู่ระบบก่อน")
+    if context.is_staff is None:
+        context.is_staff = await AsyncUserGateway.is_staff(context.user_id)
+    if not context.is_staff:
+        raise ValueError("เฉพาะเจ้าหน้าที่เท่านั้น")
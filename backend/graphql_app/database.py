@@ -1,14 +1,152 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-from config.config import Config
+import contextvars
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import Select
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from config.config import Config, is_true
+from typing import Callable, Dict, Iterator, List, Optional
 
 conf = Config("config/config.ini")
 db_config = conf.load_db_config()
+pool_config = conf.load_pool_config()
+replica_config = conf.load_read_replica_config()
 
-DATABASE_URL = f"mysql+mysqlconnector://{db_config['user']}:{db_config['password']}@{db_config['host']}/{db_config['database']}"
+DATABASE_URL = f"mysql+mysqlconnector://{db_config['user']}:{db_config['password']}@{db_config['host']}:{db_config['port']}/{db_config['database']}"
+ASYNC_DATABASE_URL = f"mysql+aiomysql://{db_config['user']}:{db_config['password']}@{db_config['host']}:{db_config['port']}/{db_config['database']}"
 
-engine = create_engine(DATABASE_URL, echo=True)
+
+def _pool_options() -> dict:
+    return {
+        'pool_size': int(pool_config.get('pool_size', 10)),
+        'max_overflow': int(pool_config.get('max_overflow', 20)),
+        'pool_timeout': float(pool_config.get('pool_timeout', 30)),
+        'pool_recycle': int(pool_config.get('pool_recycle', 1800)),
+        'pool_pre_ping': is_true(pool_config.get('pool_pre_ping', 'true')),
+        'echo': is_true(pool_config.get('echo', 'false')),
+    }
+
+
+# ถูกเรียกด้วยเวลาที่ใช้ขอ connection จาก pool (วินาที) ทุกครั้งที่ checkout — ดู graphql_app/tracing.py
+pool_wait_listeners: List[Callable[[float], None]] = []
+
+
+class _TimedCheckout:
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            waited = time.perf_counter() - started
+            for listener in pool_wait_listeners:
+                listener(waited)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool ที่รายงานเวลารอ connection (รวมเวลาเปิด connection ใหม่และ pre-ping)"""
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    """engine เดียวของทั้ง process — ทุก gateway ใช้ connection pool นี้ร่วมกัน"""
+    return create_engine(DATABASE_URL, poolclass=TimedQueuePool, **_pool_options())
+
+
+@lru_cache(maxsize=None)
+def get_async_engine() -> AsyncEngine:
+    """engine แบบ async (aiomysql) สำหรับ resolver ของ GraphQL — ใช้ค่า [Pool] ชุดเดียวกัน"""
+    return create_async_engine(ASYNC_DATABASE_URL, poolclass=TimedAsyncQueuePool, **_pool_options())
+
+
+def _replica_url(host: str) -> str:
+    host, _, port = host.strip().partition(":")
+    user = replica_config.get('user') or db_config['user']
+    password = replica_config.get('password') or db_config['password']
+    database = replica_config.get('database') or db_config['database']
+    return f"mysql+aiomysql://{user}:{password}@{host}:{port or db_config['port']}/{database}"
+
+
+REPLICA_URLS = [_replica_url(h) for h in replica_config.get('hosts', '').split(",") if h.strip()]
+REPLICA_RETRY_SECONDS = float(replica_config.get('retry_seconds', 10))
+
+# ได้ค่า True เฉพาะใน operation ที่อ่านจาก replica ได้ (query ของ GraphQL) — ค่าเริ่มต้นคือ primary
+_replica_reads: contextvars.ContextVar[bool] = contextvars.ContextVar("replica_reads", default=False)
+
+
+@contextmanager
+def replica_reads(allowed: bool = True) -> Iterator[None]:
+    """ให้ SELECT ภายใน block นี้ไปที่ replica ได้ (allowed=False บังคับกลับไป primary เช่นตอนเติม cache)"""
+    token = _replica_reads.set(allowed)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaSet:
+    """engine ของ read replica แจกแบบ round robin — replica ที่ต่อไม่ได้ถูกข้ามไป retry_seconds"""
+
+    def __init__(self, engines: List[AsyncEngine], retry_seconds: float = REPLICA_RETRY_SECONDS):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._down_until: Dict[int, float] = {}
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+        for index, replica in enumerate(engines):
+            event.listen(replica.sync_engine, "handle_error", self._failure_listener(index))
+
+    def _failure_listener(self, index: int):
+        def handle_error(context):
+            if context.is_disconnect or context.connection is None:
+                with self._lock:
+                    self._down_until[index] = time.monotonic() + self.retry_seconds
+        return handle_error
+
+    def choose(self) -> Optional[Engine]:
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            index = next(self._next) % len(self.engines)
+            if self._down_until.get(index, 0) <= now:
+                return self.engines[index].sync_engine
+        return None
+
+
+replicas = ReplicaSet([create_async_engine(url, poolclass=TimedAsyncQueuePool, **_pool_options()) for url in REPLICA_URLS])
+
+
+class RoutingSession(Session):
+    """ส่ง SELECT ธรรมดาไป replica ขณะเปิด replica_reads — การเขียนและ FOR UPDATE ไป primary และหลังเขียนแล้วอ่านจาก primary ต่อ"""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or not isinstance(clause, Select) or clause._for_update_arg is not None:
+            if self._flushing or clause is not None:
+                self.info["wrote"] = True
+        elif replicas.engines and _replica_reads.get() and not self.info.get("wrote"):
+            replica = self.info.get("replica")
+            if replica is None:
+                replica = self.info["replica"] = replicas.choose()
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+engine = get_engine()
 SessionLocal = sessionmaker(bind=engine, autoflush=False)
+
+async_engine = get_async_engine()
+# SessionLocal (thread เบื้องหลัง สคริปต์) ใช้ primary เสมอ — มีแค่ session แบบ async ของ resolver ที่ถูกส่งไป replica
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False,
+                                       sync_session_class=RoutingSession)
 Base = declarative_base()
 
 print("Database Connected Successfully!")
@@ -0,0 +1,49 @@
+from collections import defaultdict
+from strawberry.dataloader import DataLoader
+from concert_gateway import AsyncConcertGateway
+from zone_gateway import AsyncZoneGateway
+from seat_gateway import AsyncSeatGateway
+from typing import Dict, List, Optional
+
+
+def _by_key(rows: List[dict], key: str, keys: List[int]) -> List[Optional[dict]]:
+    found = {row[key]: row for row in rows}
+    return [found.get(k) for k in keys]
+
+
+def _group_by_key(rows: List[dict], key: str, keys: List[int]) -> List[List[dict]]:
+    groups: Dict[int, List[dict]] = defaultdict(list)
+    for row in rows:
+        groups[row[key]].append(row)
+    return [groups.get(k, []) for k in keys]
+
+
+async def load_concerts(concert_ids: List[int]) -> List[Optional[dict]]:
+    return _by_key(await AsyncConcertGateway.get_concerts_by_ids(concert_ids), "concert_id", concert_ids)
+
+
+async def load_zones(zone_ids: List[int]) -> List[Optional[dict]]:
+    return _by_key(await AsyncZoneGateway.get_zones_by_ids(zone_ids), "zone_id", zone_ids)
+
+
+async def load_zones_by_concert(concert_ids: List[int]) -> List[List[dict]]:
+    return _group_by_key(await AsyncZoneGateway.get_zones_by_concerts(concert_ids), "concert_id", concert_ids)
+
+
+async def load_seats(seat_ids: List[int]) -> List[Optional[dict]]:
+    return _by_key(await AsyncSeatGateway.get_seats_by_ids(seat_ids), "seat_id", seat_ids)
+
+
+async def load_seats_by_booking(booking_ids: List[int]) -> List[List[dict]]:
+    return _group_by_key(await AsyncSeatGateway.get_seats_by_bookings(booking_ids), "booking_id", booking_ids)
+
+
+class Loaders:
+    """DataLoader ชุดใหม่ต่อ request — load ใน operation เดียวกันรวมเป็น IN (...) เดียวต่อ loader"""
+
+    def __init__(self):
+        self.concert_by_id = DataLoader(load_fn=load_concerts)
+        self.zone_by_id = DataLoader(load_fn=load_zones)
+        self.zones_by_concert = DataLoader(load_fn=load_zones_by_concert)
+        self.seat_by_id = DataLoader(load_fn=load_seats)
+        self.seats_by_booking = DataLoader(load_fn=load_seats_by_booking)
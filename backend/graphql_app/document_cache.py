@@ -0,0 +1,180 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from urllib.parse import parse_qs
+from graphql import GraphQLError, parse
+from graphql.language import OperationDefinitionNode, FieldNode
+from strawberry.extensions import ParserCache, SchemaExtension, ValidationCache
+from config.config import Config, is_true
+from redis_client import redis_client
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+graphql_config = Config("config/config.ini").load_graphql_config()
+
+DOCUMENT_CACHE_SIZE = int(graphql_config.get('document_cache_size', 512))
+PERSISTED_QUERIES = is_true(graphql_config.get('persisted_queries', 'true'))
+PERSISTED_QUERY_MAX = int(graphql_config.get('persisted_query_max', 5000))
+PERSISTED_QUERY_STORE = graphql_config.get('persisted_query_store', 'memory').strip().lower()
+REDIS_URL = graphql_config.get('redis_url', 'redis://localhost:6379/0')
+
+
+class _LRU:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, Any]" = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class PersistedQueryStore:
+    """sha256 → query text ของ persisted query — LRU ใน process และแชร์ผ่าน redis เมื่อมี client"""
+
+    def __init__(self, maxsize: int = PERSISTED_QUERY_MAX, client=None, prefix: str = "harmoniq:apq:",
+                 ttl_seconds: int = 7 * 86400):
+        self._local = _LRU(maxsize)
+        self.client = client
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+
+    def peek(self, sha256: str) -> Optional[str]:
+        """ดูเฉพาะใน process นี้ — ไม่เรียก redis (ใช้ใน middleware ที่ต้องเร็ว)"""
+        return self._local.get(sha256)
+
+    async def get(self, sha256: str) -> Optional[str]:
+        query = self._local.get(sha256)
+        if query is None and self.client is not None:
+            value = await self.client.get(f"{self.prefix}{sha256}")
+            if value is not None:
+                query = value.decode() if isinstance(value, bytes) else value
+                self._local.set(sha256, query)
+        return query
+
+    async def set(self, sha256: str, query: str) -> None:
+        self._local.set(sha256, query)
+        if self.client is not None:
+            await self.client.set(f"{self.prefix}{sha256}", query, ex=self.ttl_seconds)
+
+
+def _store_from_config() -> PersistedQueryStore:
+    if PERSISTED_QUERY_STORE == "redis":
+        return PersistedQueryStore(client=redis_client(REDIS_URL, "GraphQL persisted_query_store", use_asyncio=True))
+    return PersistedQueryStore()
+
+
+persisted_queries = _store_from_config()
+
+
+def persisted_hash(extensions: Optional[dict]) -> Optional[str]:
+    persisted = (extensions or {}).get("persistedQuery")
+    if isinstance(persisted, dict) and persisted.get("version") == 1:
+        sha256 = persisted.get("sha256Hash")
+        return sha256 if isinstance(sha256, str) else None
+    return None
+
+
+class PersistedQueries(SchemaExtension):
+    """automatic persisted queries (Apollo APQ) — hash ที่ไม่รู้จักตอบ PersistedQueryNotFound ให้ client ส่ง query text มาลงทะเบียน"""
+
+    async def on_operation(self) -> AsyncIterator[None]:
+        context = self.execution_context
+        sha256 = persisted_hash(context.operation_extensions)
+        if sha256 is not None:
+            if context.query:
+                if hashlib.sha256(context.query.encode()).hexdigest() != sha256:
+                    raise GraphQLError("provided sha does not match query",
+                                       extensions={"code": "PERSISTED_QUERY_HASH_MISMATCH"})
+                await persisted_queries.set(sha256, context.query)
+            else:
+                context.query = await persisted_queries.get(sha256)
+                if context.query is None:
+                    raise GraphQLError("PersistedQueryNotFound", extensions={"code": "PERSISTED_QUERY_NOT_FOUND"})
+        yield
+
+
+def payload_query(payload: dict) -> Optional[str]:
+    """ข้อความ query ของ payload — ถ้าส่งมาแค่ hash ใช้ที่ลงทะเบียนไว้ใน process นี้"""
+    query = payload.get("query")
+    if isinstance(query, str) and query:
+        return query
+    extensions = payload.get("extensions")
+    sha256 = persisted_hash(extensions if isinstance(extensions, dict) else None)
+    return persisted_queries.peek(sha256) if sha256 else None
+
+
+def request_payloads(method: str, query_string: bytes, body: bytes) -> List[dict]:
+    """GraphQL payload ของ HTTP request (GET query string หรือ JSON body) สำหรับ middleware ที่อยู่ก่อน router"""
+    if method == "GET":
+        params = parse_qs(query_string.decode("latin-1"))
+        payload = {key: params[key][0] for key in ("query", "operationName", "variables", "extensions") if key in params}
+        for key in ("variables", "extensions"):
+            if key in payload:
+                try:
+                    payload[key] = json.loads(payload[key])
+                except ValueError:
+                    payload[key] = None
+        return [payload]
+    try:
+        payloads = json.loads(body) if body else []
+    except ValueError:
+        return []
+    if isinstance(payloads, dict):
+        payloads = [payloads]
+    elif not isinstance(payloads, list):
+        return []
+    return [payload for payload in payloads if isinstance(payload, dict)]
+
+
+@lru_cache(maxsize=1024)
+def _root_fields(query: str) -> Dict[Optional[str], Tuple[str, ...]]:
+    """operation name → ชื่อ field ระดับบนสุดของ operation นั้น (cache ตามข้อความ query)"""
+    try:
+        document = parse(query)
+    except GraphQLError:
+        return {}
+    operations = {}
+    for definition in document.definitions:
+        if isinstance(definition, OperationDefinitionNode):
+            name = definition.name.value if definition.name else None
+            operations[name] = tuple(
+                selection.name.value for selection in definition.selection_set.selections
+                if isinstance(selection, FieldNode)
+            )
+    return operations
+
+
+def operation_fields(query: Optional[str], operation_name: Optional[str]) -> Tuple[str, ...]:
+    if not isinstance(query, str):
+        return ()
+    operations = _root_fields(query)
+    if operation_name in operations:
+        return operations[operation_name]
+    return next(iter(operations.values())) if len(operations) == 1 else ()
+
+
+
+def document_extensions() -> list:
+    """cache ผล parse และ validate ตาม query text ด้วย extension ของ strawberry (นำหน้าด้วย APQ เมื่อเปิดไว้)"""
+    caches = [lambda: ParserCache(maxsize=DOCUMENT_CACHE_SIZE), lambda: ValidationCache(maxsize=DOCUMENT_CACHE_SIZE)]
+    return [PersistedQueries] + caches if PERSISTED_QUERIES else caches
@@ -1,4 +1,4 @@
-from sqlalchemy import JSON, Column, DECIMAL, Integer, String, DateTime, Date, Time, Boolean, ForeignKey, Enum, UniqueConstraint, CheckConstraint, Text
+from sqlalchemy import JSON, Column, DECIMAL, Integer, BigInteger, String, DateTime, Date, Time, Boolean, ForeignKey, Enum, UniqueConstraint, CheckConstraint, Text, Index
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql import func
 import enum
@@ -15,6 +15,8 @@ class User(Base):
     password_updated_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
     reset_token = Column(String(100), nullable=True, default=None)
     created_at = Column(DateTime, nullable=False, default=func.now())
+    # เจ้าหน้าที่ — แก้สถานะที่นั่งด้วยมือ และใช้เครื่องสแกนตั๋วหน้าประตู
+    is_staff = Column(Boolean, nullable=False, default=False, server_default="0")
 
     profile_picture_url = Column(
         String(500), 
@@ -27,6 +29,7 @@ class User(Base):
 
 class SeatStatus(enum.Enum):
     available = "available"
+    held = "held"
     booked = "booked"
 
 class BookingStatus(enum.Enum):
@@ -54,6 +57,11 @@ class Zone(Base):
     zone_name = Column(String(50), nullable=False)
     price = Column(DECIMAL, nullable=False)
 
+    # index ทั้งหมดในไฟล์นี้ต้องตรงกับ migrations/ (ฐานข้อมูลเดิมได้ index ผ่าน python migrate.py upgrade)
+    __table_args__ = (
+        Index("ix_zones_concert_name", "concert_id", "zone_name"),
+    )
+
 class Seat(Base):
     __tablename__ = "seats"
     seat_id = Column(Integer, primary_key=True, index=True)
@@ -61,6 +69,16 @@ class Seat(Base):
     zone_id = Column(Integer, ForeignKey("zones.zone_id"), nullable=False)
     seat_number = Column(String(10), nullable=False)
     seat_status = Column(Enum(SeatStatus), default=SeatStatus.available)
+    held_by_booking_id = Column(Integer, ForeignKey("bookings.booking_id", ondelete="SET NULL"), nullable=True)
+    held_until = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # seat map ของโซน และการนับที่นั่งว่างต่อโซน
+        Index("ix_seats_zone_status", "zone_id", "seat_status"),
+        # HoldReaper: seat_status = 'held' AND held_until < now
+        Index("ix_seats_hold_expiry", "seat_status", "held_until"),
+        Index("ix_seats_held_by", "held_by_booking_id"),
+    )
 
 class Booking(Base):
     __tablename__ = "bookings"
@@ -70,6 +88,15 @@ class Booking(Base):
     concert_id = Column(Integer, ForeignKey("concerts.concert_id"), nullable=False)
     zone_id = Column(Integer, ForeignKey("zones.zone_id"), nullable=False)
     booking_status = Column(Enum(BookingStatus), default=BookingStatus.pending) 
+    created_at = Column(DateTime, nullable=False, default=func.now())
+    expires_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # booking ของผู้ใช้ เรียงตาม booking_id (อ่านย้อนหลังได้จาก index เดียวกัน)
+        Index("ix_bookings_user", "user_id", "booking_id"),
+        Index("ix_bookings_pending_expiry", "booking_status", "expires_at"),
+        Index("ix_bookings_concert", "concert_id"),
+    )
 
 class BookingSeat(Base):
     __tablename__ = "booking_seats"
@@ -78,6 +105,11 @@ class BookingSeat(Base):
     booking_id = Column(Integer, ForeignKey("bookings.booking_id"), nullable=False)
     seat_id = Column(Integer, ForeignKey("seats.seat_id"), nullable=False)
 
+    __table_args__ = (
+        Index("ix_booking_seats_booking", "booking_id", "seat_id"),
+        Index("ix_booking_seats_seat", "seat_id"),
+    )
+
 class Ticket(Base):
     __tablename__ = "tickets"
 
@@ -88,4 +120,39 @@ class Ticket(Base):
     ticket_code = Column(String, unique=True, nullable=False)
     concert_name = Column(String, nullable=False)  #
     zone_name = Column(String, nullable=False)  
-    seat_number = Column(String, nullable=False)  
+    seat_number = Column(String, nullable=False)
+    scanned_at = Column(DateTime, nullable=True)  # เวลาที่สแกนเข้างานครั้งแรก (sync จากเครื่องสแกน)
+
+    __table_args__ = (
+        # ตั๋วของผู้ใช้ ใหม่สุดก่อน — index ascending อ่านย้อนหลังได้ ไม่ต้องเป็น DESC
+        Index("ix_tickets_user", "user_id", "ticket_id"),
+        Index("ix_tickets_booking", "booking_id"),
+    )
+
+class TicketCodeBlock(Base):
+    """ช่วงของ counter ที่ process หนึ่งจองไว้สร้าง ticket_code (ดู ticket_code.py)"""
+    __tablename__ = "ticket_code_blocks"
+
+    block_id = Column(Integer, primary_key=True, autoincrement=True)
+    allocated_at = Column(DateTime, nullable=False, default=func.now())
+
+class OutboxEvent(Base):
+    """booking event ที่เขียนใน transaction เดียวกับการเปลี่ยนแปลง — relay ลบทิ้งเมื่อส่งถึง sink แล้ว"""
+    __tablename__ = "outbox_events"
+
+    # BIGINT ใน MySQL — sqlite ต้องเป็น INTEGER ถึงจะ autoincrement ได้
+    event_id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    event_type = Column(String(32), nullable=False)
+    # ไม่มี FK — event ต้องอยู่ต่อได้แม้ booking ถูกลบไปแล้ว
+    booking_id = Column(Integer, nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=func.now())
+
+class OutboxRelayState(Base):
+    """หนึ่งแถวต่อ relay — ล็อกแถวนี้ไว้ระหว่างส่ง batch จึงมี relay ทำงานได้ทีละตัว"""
+    __tablename__ = "outbox_relays"
+
+    relay_name = Column(String(64), primary_key=True)
+    last_event_id = Column(BigInteger, nullable=False, default=0)
+    relayed_count = Column(BigInteger, nullable=False, default=0)
+    relayed_at = Column(DateTime, nullable=True)
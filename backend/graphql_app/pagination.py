@@ -0,0 +1,82 @@
+import base64
+import strawberry
+from typing import Awaitable, Callable, Generic, List, Optional, TypeVar
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+T = TypeVar("T")
+
+
+@strawberry.type
+class PageInfo:
+    has_next_page: bool
+    has_previous_page: bool
+    start_cursor: Optional[str]
+    end_cursor: Optional[str]
+
+
+@strawberry.type
+class Edge(Generic[T]):
+    cursor: str
+    node: T
+
+
+@strawberry.type
+class Connection(Generic[T]):
+    """Relay connection บน keyset ของ primary key — total_count นับเฉพาะเมื่อ client เลือก field นี้"""
+
+    edges: List[Edge[T]]
+    page_info: PageInfo
+    count: strawberry.Private[Callable[[], Awaitable[int]]]
+
+    @strawberry.field
+    async def total_count(self) -> int:
+        return await self.count()
+
+
+def encode_cursor(key: int) -> str:
+    return base64.urlsafe_b64encode(f"cursor:{key}".encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    if cursor is None:
+        return None
+    try:
+        prefix, key = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        if prefix == "cursor":
+            return int(key)
+    except (ValueError, UnicodeDecodeError):
+        pass
+    raise ValueError("cursor ไม่ถูกต้อง")
+
+
+def page_size(first: Optional[int]) -> int:
+    if first is None:
+        return DEFAULT_PAGE_SIZE
+    if not 1 <= first <= MAX_PAGE_SIZE:
+        raise ValueError(f"first ต้องอยู่ระหว่าง 1 ถึง {MAX_PAGE_SIZE}")
+    return first
+
+
+def keyset(stmt, column, limit: int, after: Optional[int], descending: bool = False):
+    """หน้าถัดจาก after ตามลำดับ column — ดึงเกินมาหนึ่งแถวเพื่อรู้ว่ายังมีหน้าต่อไป"""
+    if after is not None:
+        stmt = stmt.where(column < after if descending else column > after)
+    return stmt.order_by(column.desc() if descending else column).limit(limit + 1)
+
+
+def connection(rows: list, limit: int, after: Optional[int], key: Callable, node: Callable,
+               count: Callable[[], Awaitable[int]]) -> Connection:
+    """rows คือผลของ keyset(...) (อาจมีเกิน limit หนึ่งแถว)"""
+    edges = [Edge(cursor=encode_cursor(key(row)), node=node(row)) for row in rows[:limit]]
+    return Connection(
+        edges=edges,
+        page_info=PageInfo(
+            has_next_page=len(rows) > limit,
+            has_previous_page=after is not None,
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None
+        ),
+        count=count
+    )
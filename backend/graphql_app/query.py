@@ -1,30 +1,38 @@
+import base64
 import strawberry
 from typing import List, Optional
-from user_gateway import UserGateway
-from concert_gateway import ConcertGateway
-from booking_gateway import BookingGateway
-from ticket_gateway import TicketGateway
-from zone_gateway import ZoneGateway
-from seat_gateway import SeatGateway
-from .Types import UserType, ConcertType, ZoneType, SeatType, BookingType, TicketType
+from user_gateway import AsyncUserGateway
+from concert_gateway import AsyncConcertGateway
+from booking_gateway import AsyncBookingGateway
+from ticket_gateway import AsyncTicketGateway
+from seat_gateway import AsyncSeatGateway
+from gate_gateway import AsyncGateGateway
+from waiting_room import waiting_room
+from .Types import UserType, ConcertType, ZoneType, SeatType, BookingType, TicketType, GateIndexType, AdmissionType
+from .context import require_user, require_staff
+from .pagination import Connection, connection, decode_cursor, page_size
 
 @strawberry.type
 class Query:
     @strawberry.field
-    def get_users(self) -> List[UserType]:
-        users = UserGateway.get_users()
-        return [
-            UserType(
+    async def get_users(self, first: Optional[int] = None, after: Optional[str] = None) -> Connection[UserType]:
+        limit, after_id = page_size(first), decode_cursor(after)
+        users = await AsyncUserGateway.get_users(limit, after_id)
+        return connection(
+            users, limit, after_id,
+            key=lambda user: user.id,
+            node=lambda user: UserType(
                 id=user.id, 
                 display_name=user.display_name, 
                 username=user.username, 
                 profile_picture_url=user.profile_picture_url  
-            ) for user in users
-        ]
+            ),
+            count=AsyncUserGateway.count_users
+        )
 
     @strawberry.field
-    def get_user_by_id(self, id: int) -> Optional[UserType]:
-        user = UserGateway.get_user_by_id(id)
+    async def get_user_by_id(self, id: int) -> Optional[UserType]:
+        user = await AsyncUserGateway.get_user_by_id(id)
         if user:
             return UserType(
                 id=user.id, 
@@ -35,21 +43,25 @@ class Query:
         return None
     
     @strawberry.field
-    def get_concerts(self) -> List[ConcertType]:
-        concerts = ConcertGateway.get_concerts()
-        return [
-            ConcertType(
-                concert_id=c.concert_id,
-                concert_name=c.concert_name,
-                band_name=c.band_name,
-                concert_type=c.concert_type
-            ) for c in concerts
-        ]
+    async def get_concerts(self, first: Optional[int] = None, after: Optional[str] = None) -> Connection[ConcertType]:
+        limit, after_id = page_size(first), decode_cursor(after)
+        concerts = await AsyncConcertGateway.get_concerts_page(limit, after_id)
+        return connection(
+            concerts, limit, after_id,
+            key=lambda c: c["concert_id"],
+            node=lambda c: ConcertType(
+                concert_id=c["concert_id"],
+                concert_name=c["concert_name"],
+                band_name=c["band_name"],
+                concert_type=c["concert_type"]
+            ),
+            count=AsyncConcertGateway.count_concerts
+        )
 
 
     @strawberry.field
-    def get_concert_by_id(self, concert_id: int) -> Optional[ConcertType]:
-        concert = ConcertGateway.get_concert_by_id(concert_id)
+    async def get_concert_by_id(self, info: strawberry.Info, concert_id: int) -> Optional[ConcertType]:
+        concert = await info.context.loaders.concert_by_id.load(concert_id)
         if concert:
             return ConcertType(
                 concert_id=concert["concert_id"],
@@ -60,8 +72,8 @@ class Query:
         return None
 
     @strawberry.field
-    def get_zones_by_concert(self, concert_id: int) -> List[ZoneType]:
-        zones = ZoneGateway.get_zones_by_concert(concert_id)
+    async def get_zones_by_concert(self, info: strawberry.Info, concert_id: int) -> List[ZoneType]:
+        zones = await info.context.loaders.zones_by_concert.load(concert_id)
         return [
             ZoneType(
                 zone_id=z["zone_id"],
@@ -72,8 +84,8 @@ class Query:
         ]
 
     @strawberry.field
-    def get_seats_by_concert_zone(self, concert_id: int, zone_name: str) -> List[SeatType]:
-        seats = SeatGateway.get_seats_by_concert_zone(concert_id, zone_name)
+    async def get_seats_by_concert_zone(self, concert_id: int, zone_name: str) -> List[SeatType]:
+        seats = await AsyncSeatGateway.get_seats_by_concert_zone(concert_id, zone_name)
         return [
             SeatType(
                 seat_id=s["seat_id"],
@@ -85,27 +97,63 @@ class Query:
         ]
 
     @strawberry.field
-    def get_bookings_by_user(self, user_id: int) -> List[BookingType]:
-        bookings = BookingGateway.get_bookings_by_user(user_id)
-        return [
-        BookingType(
-            booking_id=b["booking_id"],
-            user_id=b["user_id"],
-            concert_id=b["concert_id"],  
-            concert_name=b["concert_name"],
-            zone_name=b["zone_name"],
-            seat_number=", ".join(b["seat_numbers"]) if b["seat_numbers"] else "No seats booked",  
-            seat_count=b["seat_count"],
-            total_price=b["total_price"],
-            status=b["booking_status"]
-        ) for b in bookings
-    ]
+    async def get_bookings_by_user(self, info: strawberry.Info, user_id: int, first: Optional[int] = None, after: Optional[str] = None) -> Connection[BookingType]:
+        require_user(info, user_id)
+        limit, after_id = page_size(first), decode_cursor(after)
+        bookings = await AsyncBookingGateway.get_bookings_by_user(user_id, limit, after_id)
+        return connection(
+            bookings, limit, after_id,
+            key=lambda b: b["booking_id"],
+            node=lambda b: BookingType(
+                booking_id=b["booking_id"],
+                user_id=b["user_id"],
+                concert_id=b["concert_id"],  
+                zone_id=b["zone_id"],
+                concert_name=b["concert_name"],
+                zone_name=b["zone_name"],
+                seat_number=", ".join(b["seat_numbers"]) if b["seat_numbers"] else "No seats booked",  
+                seat_count=b["seat_count"],
+                total_price=b["total_price"],
+                status=b["booking_status"]
+            ),
+            count=lambda: AsyncBookingGateway.count_bookings_by_user(user_id)
+        )
 
     @strawberry.field
-    def get_tickets_by_user(self, user_id: int) -> List[TicketType]:
-        tickets = TicketGateway.get_tickets_by_user(user_id)
-        return [
-        TicketType(
+    async def get_tickets_by_user(self, info: strawberry.Info, user_id: int, first: Optional[int] = None, after: Optional[str] = None) -> Connection[TicketType]:
+        require_user(info, user_id)
+        return await _ticket_connection(user_id, first, after)
+        
+    @strawberry.field
+    async def get_ticket_details_by_user(self, info: strawberry.Info, user_id: int, first: Optional[int] = None, after: Optional[str] = None) -> Connection[TicketType]:
+        require_user(info, user_id)
+        return await _ticket_connection(user_id, first, after)
+
+    @strawberry.field
+    async def waiting_room_status(self, queue_token: str) -> AdmissionType:
+        """ตำแหน่งในคิวจอง — ตอบจาก token และตัวนับของคิว ไม่แตะฐานข้อมูล"""
+        return AdmissionType(**await waiting_room.status(queue_token))
+
+    @strawberry.field
+    async def export_gate_index(self, info: strawberry.Info, concert_id: int) -> GateIndexType:
+        """index ของตั๋วทั้งคอนเสิร์ตสำหรับเครื่องสแกนหน้าประตู (โหลดด้วย GateValidationIndex.from_bytes) — เฉพาะเจ้าหน้าที่"""
+        await require_staff(info)
+        index = await AsyncGateGateway.export_index(concert_id)
+        return GateIndexType(
+            concert_id=index.concert_id,
+            issued_through=index.issued_through,
+            ticket_count=len(index),
+            data=base64.b64encode(index.to_bytes()).decode()
+        )
+
+
+async def _ticket_connection(user_id: int, first: Optional[int], after: Optional[str]) -> Connection[TicketType]:
+    limit, after_id = page_size(first), decode_cursor(after)
+    tickets = await AsyncTicketGateway.get_tickets_by_user(user_id, limit, after_id)
+    return connection(
+        tickets, limit, after_id,
+        key=lambda t: t["ticket_id"],
+        node=lambda t: TicketType(
             ticket_id=t["ticket_id"],
             booking_id=t["booking_id"],
             user_id=t["user_id"],
@@ -113,11 +161,6 @@ class Query:
             zone_name=t["zone_name"],
             seat_number=t["seat_number"].strip() if t["seat_number"] else "No seat assigned",  
             ticket_code=t["ticket_code"]
-        ) for t in tickets
-    ]  
-        
-    @strawberry.field
-    def get_ticket_details_by_user(self, user_id: int) -> List[TicketType]:
-        return self.get_tickets_by_user(user_id)
-
-    
+        ),
+        count=lambda: AsyncTicketGateway.count_tickets_by_user(user_id)
+    )
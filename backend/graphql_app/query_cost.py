@@ -0,0 +1,129 @@
+from graphql import (
+    GraphQLError, GraphQLList, GraphQLNonNull, GraphQLObjectType, GraphQLInterfaceType,
+    FieldNode, FragmentSpreadNode, InlineFragmentNode, get_named_type, value_from_ast,
+)
+from graphql.utilities import get_operation_ast
+from strawberry.extensions import AddValidationRules, SchemaExtension
+from strawberry.extensions.query_depth_limiter import create_validator
+from config.config import Config, is_true
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from typing import Dict, Iterator, Optional
+
+query_cost_config = Config("config/config.ini").load_query_cost_config()
+
+ENABLED = is_true(query_cost_config.get('enabled', 'true'))
+MAX_COST = int(query_cost_config.get('max_cost', 300))
+MAX_DEPTH = int(query_cost_config.get('max_depth', 10))
+OBJECT_COST = int(query_cost_config.get('object_cost', 1))
+# configparser เก็บชื่อ key เป็นตัวเล็ก — เทียบชื่อ field แบบไม่สนตัวพิมพ์
+FIELD_COSTS = {
+    key.split(".", 1)[1].lower(): int(value)
+    for key, value in query_cost_config.items() if key.startswith('cost.')
+}
+
+
+class QueryCostTooHighError(GraphQLError):
+    def __init__(self, cost: int, max_cost: int):
+        super().__init__(f"คำขอนี้ซับซ้อนเกินไป (cost {cost} เกิน {max_cost})", extensions={
+            "code": "QUERY_TOO_COMPLEX", "cost": cost, "maxCost": max_cost
+        })
+
+
+class QueryCost:
+    """cost ของ operation จาก document และ variables — ทุกอย่างใต้ list คูณด้วย first หรือ page size ปริยาย"""
+
+    def __init__(self, schema, document, variables: Optional[dict], operation_name: Optional[str],
+                 field_costs: Dict[str, int] = None, object_cost: int = OBJECT_COST):
+        self.schema = schema
+        self.variables = variables or {}
+        self.field_costs = FIELD_COSTS if field_costs is None else field_costs
+        self.object_cost = object_cost
+        self.fragments = {d.name.value: d for d in document.definitions if d.kind == "fragment_definition"}
+        self.operation = get_operation_ast(document, operation_name)
+
+    def compute(self) -> int:
+        if self.operation is None:
+            return 0
+        root = self.schema.get_root_type(self.operation.operation)
+        return self._selection_cost(self.operation.selection_set, root, 1, None)
+
+    def _fields(self, selection_set, parent_type):
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                yield selection, parent_type
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = self.schema.get_type(selection.type_condition.name.value) if selection.type_condition else parent_type
+                yield from self._fields(selection.selection_set, fragment_type)
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment = self.fragments.get(selection.name.value)
+                if fragment is not None:
+                    yield from self._fields(fragment.selection_set, self.schema.get_type(fragment.type_condition.name.value))
+
+    def _selection_cost(self, selection_set, parent_type, multiplier: int, page: Optional[int]) -> int:
+        total = 0
+        for node, node_type in self._fields(selection_set, parent_type):
+            name = node.name.value
+            # introspection (__schema, __type, __typename) ไม่แตะฐานข้อมูล
+            if name.startswith("__") or not isinstance(node_type, (GraphQLObjectType, GraphQLInterfaceType)):
+                continue
+            field = node_type.fields.get(name)
+            if field is None:
+                continue
+
+            field_type = field.type.of_type if isinstance(field.type, GraphQLNonNull) else field.type
+            named_type = get_named_type(field_type)
+            composite = isinstance(named_type, (GraphQLObjectType, GraphQLInterfaceType))
+            own = self.field_costs.get(f"{node_type.name}.{name}".lower(),
+                                       self.field_costs.get(name.lower(), self.object_cost if composite else 0))
+            total += multiplier * own
+
+            if node.selection_set is None or not composite:
+                continue
+            first = self._first(node, field)
+            child_multiplier = multiplier
+            if isinstance(field_type, GraphQLList):
+                child_multiplier *= first or page or DEFAULT_PAGE_SIZE
+            total += self._selection_cost(node.selection_set, named_type, child_multiplier, first)
+        return total
+
+    def _first(self, node: FieldNode, field) -> Optional[int]:
+        """ค่า first ของ field (ถ้ามี) — ใช้เป็นขนาดของ list ข้างใต้"""
+        argument_def = field.args.get("first")
+        if argument_def is None:
+            return None
+        for argument in node.arguments or ():
+            if argument.name.value == "first":
+                value = value_from_ast(argument.value, argument_def.type, self.variables)
+                return min(int(value), MAX_PAGE_SIZE) if isinstance(value, int) and value > 0 else None
+        return None
+
+
+class QueryCostLimiter(SchemaExtension):
+    """ปฏิเสธ operation ที่ cost เกินก่อน resolver ใดทำงาน และรายงาน cost ใน extensions.cost"""
+
+    def __init__(self, *, max_cost: int = MAX_COST):
+        super().__init__()
+        self.max_cost = max_cost
+        self.cost: Optional[int] = None
+
+    def on_execute(self) -> Iterator[None]:
+        context = self.execution_context
+        if context.graphql_document is not None:
+            self.cost = QueryCost(context.schema._schema, context.graphql_document,
+                                  context.variables, context.operation_name).compute()
+            if self.cost > self.max_cost:
+                raise QueryCostTooHighError(self.cost, self.max_cost)
+        yield
+
+    def get_results(self) -> dict:
+        if self.cost is None:
+            return {}
+        return {"cost": {"requested": self.cost, "maximum": self.max_cost}}
+
+
+# rule ตรวจความลึกตัวเดียวกับ QueryDepthLimiter ของ strawberry — สร้างครั้งเดียว ValidationCache จึงใช้ cache ข้ามคำขอได้
+DepthLimitRule = create_validator(MAX_DEPTH, None)
+
+
+def query_cost_extensions() -> list:
+    return [lambda: AddValidationRules([DepthLimitRule]), QueryCostLimiter] if ENABLED else []
@@ -0,0 +1,123 @@
+import contextvars
+import logging
+import random
+import re
+from strawberry.extensions import SchemaExtension
+from config.config import Config, is_true
+from metrics import registry
+from . import tracing
+from typing import Dict, Iterator, List, Optional
+
+query_log_config = Config("config/config.ini").load_query_log_config()
+
+ENABLED = is_true(query_log_config.get('enabled', 'true'))
+SLOW_MS = float(query_log_config.get('slow_ms', 200))
+REPEAT_THRESHOLD = int(query_log_config.get('repeat_threshold', 10))
+SAMPLE_RATE = float(query_log_config.get('sample_rate', 1.0))
+LOG_PARAMETERS = is_true(query_log_config.get('log_parameters', 'false'))
+MAX_STATEMENT_CHARS = int(query_log_config.get('max_statement_chars', 1000))
+
+logger = logging.getLogger("harmoniq.sql")
+
+SLOW_STATEMENTS = registry.counter(
+    "harmoniq_db_slow_statements_total", "SQL statements at or above the slow_ms threshold", ("operation",))
+REPEATED_STATEMENTS = registry.counter(
+    "harmoniq_graphql_repeated_statements_total",
+    "Statements a sampled operation ran more than repeat_threshold times (possible N+1)", ("operation",))
+SAMPLED_OPERATIONS = registry.counter(
+    "harmoniq_graphql_query_log_sampled_total", "Operations whose statements were counted for repeats")
+
+# IN (?, ?, ?) / IN (%s, %s) / VALUES (...), (...) — จำนวน placeholder ต่างกันแต่เป็น statement เดียวกัน
+_PLACEHOLDER = r"\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*"
+_PLACEHOLDER_LIST = re.compile(r"\(" + _PLACEHOLDER + r"(?:," + _PLACEHOLDER + r")*\)")
+_REPEATED_ROWS = re.compile(r"\(…\)(?:\s*,\s*\(…\))+")
+
+
+def normalize(statement: str) -> str:
+    """statement ที่ parameterize แล้ว โดยยุบรายการ placeholder ให้เหลือ (…) และช่องว่างให้เหลือช่องเดียว"""
+    statement = _PLACEHOLDER_LIST.sub("(…)", " ".join(statement.split()))
+    return _REPEATED_ROWS.sub("(…)", statement)
+
+
+def _clip(statement: str) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= MAX_STATEMENT_CHARS else statement[:MAX_STATEMENT_CHARS] + "…"
+
+
+class _RequestLog:
+    __slots__ = ("counts",)
+
+    def __init__(self):
+        # statement ที่ normalize แล้ว → [จำนวนครั้ง, resolver ที่รันมัน]
+        self.counts: Dict[str, List] = {}
+
+
+# operation ที่ถูกสุ่มมานับ statement — None เมื่อไม่ได้ถูกสุ่มหรืออยู่นอก operation
+_request: contextvars.ContextVar[Optional[_RequestLog]] = contextvars.ContextVar("query_log_request", default=None)
+
+
+def _statement_executed(statement: str, parameters, elapsed: float) -> None:
+    resolver = tracing.current_resolver()
+    if elapsed * 1000 >= SLOW_MS:
+        operation = tracing.current_operation()
+        name = operation.name if operation is not None else None
+        SLOW_STATEMENTS.inc((tracing.operation_label(name) if operation is not None else "-",))
+        logger.warning(
+            "slow query %.1f ms operation=%s resolver=%s: %s%s",
+            elapsed * 1000,
+            (name or "anonymous") if operation is not None else "-",
+            resolver.name if resolver is not None else "-",
+            _clip(statement),
+            f" parameters={parameters!r:.500}" if LOG_PARAMETERS else "",
+        )
+
+    request = _request.get()
+    if request is not None:
+        key = normalize(statement)
+        entry = request.counts.get(key)
+        if entry is None:
+            entry = request.counts[key] = [0, set()]
+        entry[0] += 1
+        if resolver is not None:
+            entry[1].add(resolver.name)
+
+
+if ENABLED and tracing.ENABLED:
+    tracing.statement_listeners.append(_statement_executed)
+
+
+class QueryLog(SchemaExtension):
+    """นับ statement ของ operation ที่ถูกสุ่ม แล้ว log statement ที่รันเกิน repeat_threshold ครั้ง (น่าจะเป็น N+1)"""
+
+    def __init__(self, *, sample_rate: float = SAMPLE_RATE, repeat_threshold: int = REPEAT_THRESHOLD):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.repeat_threshold = repeat_threshold
+
+    def on_operation(self) -> Iterator[None]:
+        request = _RequestLog() if random.random() < self.sample_rate else None
+        token = _request.set(request)
+        try:
+            yield
+        finally:
+            _request.reset(token)
+            if request is not None:
+                SAMPLED_OPERATIONS.inc()
+                self._report(request)
+
+    def _report(self, request: _RequestLog) -> None:
+        repeated = [(count, key, resolvers) for key, (count, resolvers) in request.counts.items()
+                    if count > self.repeat_threshold]
+        if not repeated:
+            return
+        name = self.execution_context.operation_name
+        REPEATED_STATEMENTS.inc((tracing.operation_label(name),), len(repeated))
+        for count, key, resolvers in sorted(repeated, key=lambda r: -r[0]):
+            logger.warning(
+                "possible N+1: statement ran %d times in operation=%s resolvers=%s: %s",
+                count, name or "anonymous", ",".join(sorted(resolvers)) or "-", _clip(key),
+            )
+
+
+def query_log_extensions() -> list:
+    return [QueryLog] if ENABLED and tracing.ENABLED else []
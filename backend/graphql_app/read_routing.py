@@ -0,0 +1,80 @@
+import threading
+import time
+from strawberry.extensions import SchemaExtension
+from strawberry.types.graphql import OperationType
+from config.config import Config
+from redis_client import redis_client
+from . import database
+from typing import AsyncIterator, Dict
+
+read_replica_config = Config("config/config.ini").load_read_replica_config()
+
+STICKY_SECONDS = float(read_replica_config.get('sticky_seconds', 5))
+STICKY_STORE = read_replica_config.get('sticky_store', 'memory').strip().lower()
+REDIS_URL = read_replica_config.get('redis_url', 'redis://localhost:6379/0')
+
+
+class MemoryStickyStore:
+    """ผู้ใช้ที่เพิ่ง mutation ใน process นี้ → เวลาที่กลับไปอ่านจาก replica ได้"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._until: Dict[int, float] = {}
+        self._next_prune = 0.0
+
+    async def stick(self, user_id: int, seconds: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._until[user_id] = now + seconds
+            if now >= self._next_prune:
+                self._until = {k: v for k, v in self._until.items() if v > now}
+                self._next_prune = now + 60
+
+    async def is_sticky(self, user_id: int) -> bool:
+        return self._until.get(user_id, 0) > time.monotonic()
+
+
+class RedisStickyStore:
+    """ผู้ใช้ที่เพิ่ง mutation แชร์ทุก process — query ที่ไปตก worker อื่นยังอ่านจาก primary"""
+
+    def __init__(self, client, prefix: str = "harmoniq:read-primary:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def stick(self, user_id: int, seconds: float) -> None:
+        await self.client.set(f"{self.prefix}{user_id}", 1, px=max(1, int(seconds * 1000)))
+
+    async def is_sticky(self, user_id: int) -> bool:
+        return bool(await self.client.exists(f"{self.prefix}{user_id}"))
+
+
+def _store_from_config():
+    if STICKY_STORE == "redis":
+        return RedisStickyStore(redis_client(REDIS_URL, "ReadReplica sticky_store", use_asyncio=True))
+    return MemoryStickyStore()
+
+
+sticky_users = _store_from_config()
+
+
+class ReadRouting(SchemaExtension):
+    """query อ่านจาก replica ได้ ส่วน mutation อยู่ที่ primary และหลัง mutation ผู้เรียกอ่านจาก primary ต่อ sticky_seconds"""
+
+    def __init__(self, *, store=None, sticky_seconds: float = STICKY_SECONDS):
+        super().__init__()
+        self.store = store if store is not None else sticky_users
+        self.sticky_seconds = sticky_seconds
+
+    async def on_execute(self) -> AsyncIterator[None]:
+        context = self.execution_context
+        user_id = getattr(context.context, "user_id", None)
+        operation_type = context.operation_type
+        replicas = operation_type == OperationType.QUERY and not (user_id and await self.store.is_sticky(user_id))
+        with database.replica_reads(replicas):
+            yield
+        if operation_type == OperationType.MUTATION and user_id:
+            await self.store.stick(user_id, self.sticky_seconds)
+
+
+def read_routing_extensions() -> list:
+    return [ReadRouting] if database.replicas.engines else []
@@ -0,0 +1,14 @@
+from strawberry.fastapi import GraphQLRouter as StrawberryGraphQLRouter
+from .document_cache import persisted_hash
+
+
+class GraphQLRouter(StrawberryGraphQLRouter):
+    def should_render_graphql_ide(self, request) -> bool:
+        # GET ที่ส่งมาแค่ hash ของ persisted query ไม่มี query — ไม่ใช่การเปิด GraphiQL
+        if "extensions" in request.query_params:
+            try:
+                if persisted_hash(self.parse_json(request.query_params["extensions"])):
+                    return False
+            except Exception:
+                pass
+        return super().should_render_graphql_ide(request)
@@ -1,5 +1,13 @@
 import strawberry
 from .mutation import Mutation
 from .query import Query
+from .subscription import Subscription
+from .document_cache import document_extensions
+from .query_cost import query_cost_extensions
+from .tracing import tracing_extensions
+from .query_log import query_log_extensions
+from .read_routing import read_routing_extensions
 
-schema = strawberry.Schema(query=Query, mutation=Mutation)
\ No newline at end of file
+schema = strawberry.Schema(query=Query, mutation=Mutation, subscription=Subscription,
+                           extensions=tracing_extensions() + query_log_extensions() + read_routing_extensions()
+                           + document_extensions() + query_cost_extensions())
@@ -0,0 +1,27 @@
+import strawberry
+from typing import AsyncGenerator
+from seat_events import seat_events
+from .Types import SeatDeltaType, SeatType
+
+
+@strawberry.type
+class Subscription:
+
+    @strawberry.subscription
+    async def seat_updates(self, concert_id: int, zone_id: int) -> AsyncGenerator[SeatDeltaType, None]:
+        """seat map ของโซนหนึ่งครั้ง แล้วตามด้วยเฉพาะที่นั่งที่เปลี่ยนสถานะ (จอง/ชำระเงิน/ยกเลิก/หมดเวลาถือ)"""
+        async for snapshot, seats in seat_events.subscribe(concert_id, zone_id):
+            yield SeatDeltaType(
+                concert_id=concert_id,
+                zone_id=zone_id,
+                snapshot=snapshot,
+                seats=[
+                    SeatType(
+                        seat_id=s["seat_id"],
+                        concert_id=s["concert_id"],
+                        zone_name=s["zone_name"],
+                        seat_number=s["seat_number"],
+                        seat_status=s["seat_status"]
+                    ) for s in seats
+                ]
+            )
@@ -0,0 +1,257 @@
+import contextvars
+import threading
+import time
+from inspect import isawaitable
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from strawberry.extensions import SchemaExtension
+from strawberry.extensions.tracing.utils import should_skip_tracing
+from config.config import Config, is_true
+from metrics import registry, gauge
+from . import database
+from typing import Callable, Iterator, List, Optional, Set, Tuple
+
+tracing_config = Config("config/config.ini").load_tracing_config()
+
+ENABLED = is_true(tracing_config.get('enabled', 'true'))
+RESOLVERS = is_true(tracing_config.get('resolvers', 'true'))
+RESPONSE_EXTENSIONS = is_true(tracing_config.get('response_extensions', 'false'))
+MAX_OPERATIONS = int(tracing_config.get('max_operations', 200))
+METRICS_TOKEN = tracing_config.get('metrics_token', '').strip()
+
+OPERATION_SECONDS = registry.histogram(
+    "harmoniq_graphql_operation_seconds", "Wall time of GraphQL operations", ("operation", "type"))
+OPERATION_ERRORS = registry.counter(
+    "harmoniq_graphql_operation_errors_total", "GraphQL operations that returned errors", ("operation", "type"))
+OPERATION_SQL = registry.counter(
+    "harmoniq_graphql_operation_sql_statements_total", "SQL statements run by GraphQL operations", ("operation", "type"))
+OPERATION_SQL_SECONDS = registry.counter(
+    "harmoniq_graphql_operation_sql_seconds_total", "Time spent in SQL by GraphQL operations", ("operation", "type"))
+OPERATION_ROWS = registry.counter(
+    "harmoniq_graphql_operation_rows_fetched_total", "Rows returned to GraphQL operations by SELECTs", ("operation", "type"))
+OPERATION_POOL_WAIT = registry.counter(
+    "harmoniq_graphql_operation_pool_wait_seconds_total", "Time GraphQL operations waited for a pooled connection",
+    ("operation", "type"))
+RESOLVER_SECONDS = registry.histogram(
+    "harmoniq_graphql_resolver_seconds", "Wall time of resolvers (default attribute resolvers are not traced)", ("field",))
+RESOLVER_SQL = registry.counter(
+    "harmoniq_graphql_resolver_sql_statements_total", "SQL statements run by resolvers", ("field",))
+RESOLVER_ROWS = registry.counter(
+    "harmoniq_graphql_resolver_rows_fetched_total", "Rows returned to resolvers by SELECTs", ("field",))
+RESOLVER_POOL_WAIT = registry.counter(
+    "harmoniq_graphql_resolver_pool_wait_seconds_total", "Time resolvers waited for a pooled connection", ("field",))
+SQL_SECONDS = registry.histogram(
+    "harmoniq_db_statement_seconds", "SQL statement time, including background threads")
+POOL_WAIT_SECONDS = registry.histogram(
+    "harmoniq_db_pool_wait_seconds", "Time to check a connection out of the pool",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0))
+
+
+class Span:
+    """เวลา จำนวน SQL แถวที่อ่าน และเวลารอ connection ของ operation หรือ resolver หนึ่งครั้ง"""
+
+    __slots__ = ("name", "started", "duration", "sql", "sql_seconds", "rows", "pool_wait")
+
+    def __init__(self, name: Optional[str] = None):
+        # ชื่อ operation หรือ "Type.field" ของ resolver
+        self.name = name
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.sql = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.pool_wait = 0.0
+
+    def elapsed(self) -> float:
+        return self.duration or time.perf_counter() - self.started
+
+    def to_dict(self) -> dict:
+        return {
+            "durationMs": round(self.elapsed() * 1000, 3),
+            "sqlStatements": self.sql,
+            "sqlMs": round(self.sql_seconds * 1000, 3),
+            "rowsFetched": self.rows,
+            "poolWaitMs": round(self.pool_wait * 1000, 3),
+        }
+
+
+class OperationTrace(Span):
+    __slots__ = ("resolvers",)
+
+    def __init__(self):
+        super().__init__()
+        # (path, "Type.field", span) ของ resolver ที่ถูก trace
+        self.resolvers: List[Tuple[str, str, Span]] = []
+
+
+# operation / resolver ที่กำลังรันใน task นี้ — SQL และเวลารอ pool ถูกนับเข้าทั้งสองตัว
+_operation: contextvars.ContextVar[Optional[OperationTrace]] = contextvars.ContextVar("graphql_operation", default=None)
+_resolver: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("graphql_resolver", default=None)
+
+
+def current_operation() -> Optional[OperationTrace]:
+    return _operation.get()
+
+
+def current_resolver() -> Optional[Span]:
+    return _resolver.get()
+
+
+# ถูกเรียกด้วย (statement, parameters, วินาที) หลัง SQL ทุกคำสั่ง ภายใน context ของ operation/resolver ที่รันมัน — ดู query_log.py
+statement_listeners: List[Callable[[str, object, float], None]] = []
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop("query_started", time.perf_counter())
+    SQL_SECONDS.observe(elapsed)
+    # rowcount ของ SELECT ใช้ได้เมื่อ driver buffer ผลไว้แล้ว (mysqlconnector/aiomysql) — sqlite รายงาน -1 จึงนับเป็น 0
+    rows = cursor.rowcount if cursor.description is not None and cursor.rowcount > 0 else 0
+    for span in (_operation.get(), _resolver.get()):
+        if span is not None:
+            span.sql += 1
+            span.sql_seconds += elapsed
+            span.rows += rows
+    for listener in statement_listeners:
+        listener(statement, parameters, elapsed)
+
+
+def _pool_waited(seconds: float) -> None:
+    POOL_WAIT_SECONDS.observe(seconds)
+    for span in (_operation.get(), _resolver.get()):
+        if span is not None:
+            span.pool_wait += seconds
+
+
+def _pool_gauges():
+    samples = []
+    engines = [("sync", database.engine), ("async", database.async_engine.sync_engine)]
+    engines += [(f"replica{i}", replica.sync_engine) for i, replica in enumerate(database.replicas.engines)]
+    for name, engine in engines:
+        pool = engine.pool
+        if hasattr(pool, "checkedout"):
+            samples.append(((("engine", name), ("state", "checked_out")), pool.checkedout()))
+            samples.append(((("engine", name), ("state", "idle")), pool.checkedin()))
+            samples.append(((("engine", name), ("state", "overflow")), max(pool.overflow(), 0)))
+    return gauge("harmoniq_db_pool_connections", "Connections in the pool by state", samples)
+
+
+if ENABLED:
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    database.pool_wait_listeners.append(_pool_waited)
+    registry.add_collector(_pool_gauges)
+
+
+_operation_names: Set[str] = set()
+_operation_names_lock = threading.Lock()
+
+
+def operation_label(name: Optional[str]) -> str:
+    """ชื่อ operation มาจาก client — จำกัดจำนวนค่าของ label ไว้ไม่ให้ metrics โตไม่สิ้นสุด"""
+    if not name:
+        return "anonymous"
+    if name in _operation_names:
+        return name
+    with _operation_names_lock:
+        if len(_operation_names) < MAX_OPERATIONS:
+            _operation_names.add(name)
+            return name
+    return "other"
+
+
+class Tracing(SchemaExtension):
+    """บันทึกเวลา, SQL และ pool wait ต่อ operation และ resolver ลง /metrics (และ extensions.tracing เมื่อเปิด response_extensions)"""
+
+    def __init__(self, *, resolvers: bool = RESOLVERS, response_extensions: bool = RESPONSE_EXTENSIONS):
+        super().__init__()
+        self.resolvers = resolvers
+        self.response_extensions = response_extensions
+        self.trace: Optional[OperationTrace] = None
+
+    def on_operation(self) -> Iterator[None]:
+        self.trace = OperationTrace()
+        token = _operation.set(self.trace)
+        try:
+            yield
+        finally:
+            _operation.reset(token)
+            self._record()
+
+    def on_execute(self) -> Iterator[None]:
+        # parse แล้ว — ได้ชื่อ operation แม้ client ไม่ได้ส่ง operationName มา
+        self.trace.name = self.execution_context.operation_name
+        yield
+
+    def _record(self) -> None:
+        trace = self.trace
+        trace.duration = time.perf_counter() - trace.started
+        context = self.execution_context
+        try:
+            operation_type = context.operation_type.value
+        except Exception:
+            operation_type = "unknown"
+        if operation_type == "subscription":
+            return
+        labels = (operation_label(context.operation_name), operation_type)
+        OPERATION_SECONDS.observe(trace.duration, labels)
+        OPERATION_SQL.inc(labels, trace.sql)
+        OPERATION_SQL_SECONDS.inc(labels, trace.sql_seconds)
+        OPERATION_ROWS.inc(labels, trace.rows)
+        OPERATION_POOL_WAIT.inc(labels, trace.pool_wait)
+        if context.pre_execution_errors or (context.result is not None and context.result.errors):
+            OPERATION_ERRORS.inc(labels)
+
+    def resolve(self, _next, root, info, *args, **kwargs):
+        if not self.resolvers or should_skip_tracing(_next, info):
+            return _next(root, info, *args, **kwargs)
+
+        span = Span(f"{info.parent_type.name}.{info.field_name}")
+        token = _resolver.set(span)
+        try:
+            result = _next(root, info, *args, **kwargs)
+        except Exception:
+            self._finish(info, span)
+            raise
+        finally:
+            _resolver.reset(token)
+        if isawaitable(result):
+            return self._await(result, info, span)
+        self._finish(info, span)
+        return result
+
+    async def _await(self, result, info, span: Span):
+        # coroutine ของ resolver เริ่มรันตอนถูก await — ตั้ง span ไว้ระหว่างนั้นเพื่อให้ SQL ถูกนับเข้า resolver นี้
+        token = _resolver.set(span)
+        try:
+            return await result
+        finally:
+            _resolver.reset(token)
+            self._finish(info, span)
+
+    def _finish(self, info, span: Span) -> None:
+        span.duration = time.perf_counter() - span.started
+        field = span.name
+        RESOLVER_SECONDS.observe(span.duration, (field,))
+        RESOLVER_SQL.inc((field,), span.sql)
+        RESOLVER_ROWS.inc((field,), span.rows)
+        RESOLVER_POOL_WAIT.inc((field,), span.pool_wait)
+        if self.response_extensions and self.trace is not None:
+            path = ".".join(str(key) for key in info.path.as_list())
+            self.trace.resolvers.append((path, field, span))
+
+    def get_results(self) -> dict:
+        if not self.response_extensions or self.trace is None:
+            return {}
+        tracing = self.trace.to_dict()
+        tracing["resolvers"] = [
+            dict(span.to_dict(), path=path, field=field) for path, field, span in self.trace.resolvers
+        ]
+        return {"tracing": tracing}
+
+
+def tracing_extensions() -> list:
+    return [Tracing] if ENABLED else []
@@ -0,0 +1,221 @@
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from graphql_app.database import SessionLocal
+from graphql_app.model import Seat, Booking, SeatStatus, BookingStatus
+from config.config import Config
+from seat_index import record_seat_change
+from outbox import booking_event, record_events, BOOKING_CANCELLED
+from typing import Optional, List
+
+booking_config = Config("config/config.ini").load_booking_config()
+
+HOLD_TTL_SECONDS = int(booking_config.get('hold_ttl_seconds', 600))
+REAPER_INTERVAL_SECONDS = int(booking_config.get('reaper_interval_seconds', 15))
+
+
+class SeatConflictError(ValueError):
+    """ที่นั่งบางที่ถูกจองหรือถูกถือไว้แล้ว — seat_numbers คือที่นั่งที่ชนทั้งหมด"""
+
+    def __init__(self, seat_numbers: List[str]):
+        self.seat_numbers = seat_numbers
+        super().__init__(f"ที่นั่ง {', '.join(seat_numbers)} ถูกจองแล้ว กรุณาเลือกที่นั่งอื่น")
+
+
+class HoldExpiredError(ValueError):
+    def __init__(self, booking_id: int):
+        self.booking_id = booking_id
+        super().__init__(f"การจอง {booking_id} หมดเวลาถือที่นั่งแล้ว กรุณาจองใหม่")
+
+
+def _claimable(now: datetime):
+    # ที่นั่งว่าง หรือที่นั่งที่ถูกถือไว้แต่หมดเวลาแล้ว (reaper ยังไม่ได้ปล่อย)
+    return or_(
+        Seat.seat_status == SeatStatus.available,
+        and_(Seat.seat_status == SeatStatus.held, Seat.held_until < now)
+    )
+
+
+def _claim_stmt(booking_id: int, concert_id: int, zone_id: int, seat_ids: List[int],
+                now: datetime, held_until: datetime):
+    return (
+        update(Seat)
+        .where(
+            Seat.seat_id.in_(seat_ids),
+            Seat.concert_id == concert_id,
+            Seat.zone_id == zone_id,
+            _claimable(now)
+        )
+        .values(seat_status=SeatStatus.held, held_by_booking_id=booking_id, held_until=held_until)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _claimable_stmt(concert_id: int, zone_id: int, seat_ids: List[int], now: datetime):
+    return select(Seat.seat_id).where(
+        Seat.seat_id.in_(seat_ids),
+        Seat.concert_id == concert_id,
+        Seat.zone_id == zone_id,
+        _claimable(now)
+    )
+
+
+def _seat_numbers_stmt(seat_ids: List[int]):
+    return select(Seat.seat_id, Seat.seat_number).where(Seat.seat_id.in_(seat_ids))
+
+
+def _confirm_stmt(booking_id: int, seat_ids: List[int], now: datetime):
+    return (
+        update(Seat)
+        .where(
+            Seat.seat_id.in_(seat_ids),
+            Seat.held_by_booking_id == booking_id,
+            Seat.seat_status == SeatStatus.held,
+            Seat.held_until >= now
+        )
+        .values(seat_status=SeatStatus.booked, held_until=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _held_by_stmt(booking_id: int):
+    return (
+        select(Seat.seat_id)
+        .where(Seat.held_by_booking_id == booking_id, Seat.seat_status == SeatStatus.held)
+        .with_for_update()
+    )
+
+
+def _expired_holds_stmt(now: datetime):
+    return (
+        select(Seat.seat_id)
+        .where(Seat.seat_status == SeatStatus.held, Seat.held_until < now)
+        .with_for_update()
+    )
+
+
+def _release_stmt(seat_ids: List[int]):
+    return (
+        update(Seat)
+        .where(Seat.seat_id.in_(seat_ids))
+        .values(seat_status=SeatStatus.available, held_by_booking_id=None, held_until=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _expired_bookings_stmt(now: datetime):
+    return (
+        select(Booking.booking_id, Booking.user_id, Booking.concert_id, Booking.zone_id)
+        .where(Booking.booking_status == BookingStatus.pending, Booking.expires_at < now)
+        .with_for_update()
+    )
+
+
+def _cancel_stmt(booking_ids: List[int]):
+    return (
+        update(Booking)
+        .where(Booking.booking_id.in_(booking_ids), Booking.booking_status == BookingStatus.pending)
+        .values(booking_status=BookingStatus.cancelled)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _conflicts(seat_ids: List[int], free: set, numbers: dict) -> List[str]:
+    return [numbers.get(seat_id, str(seat_id)) for seat_id in seat_ids if seat_id not in free]
+
+
+class HoldGateway:
+    """ส่วนแบบ sync ที่ HoldReaper ใช้ใน thread เบื้องหลัง"""
+
+    @classmethod
+    def release_expired(cls, now: Optional[datetime] = None) -> int:
+        """ปล่อยที่นั่งที่หมดเวลาถือ และยกเลิก booking pending ที่หมดอายุ — เรียกจาก HoldReaper"""
+        now = now or datetime.now()
+        with SessionLocal() as db:
+            seat_ids = db.execute(_expired_holds_stmt(now)).scalars().all()
+            released = cls._release(db, seat_ids)
+            expired = db.execute(_expired_bookings_stmt(now)).all()
+            if expired:
+                db.execute(_cancel_stmt([b.booking_id for b in expired]))
+                record_events(db, [
+                    booking_event(BOOKING_CANCELLED, b.booking_id, user_id=b.user_id,
+                                  concert_id=b.concert_id, zone_id=b.zone_id, reason="expired")
+                    for b in expired
+                ])
+            db.commit()
+            return released
+
+    @classmethod
+    def _release(cls, db: Session, seat_ids: List[int]) -> int:
+        if not seat_ids:
+            return 0
+        db.execute(_release_stmt(seat_ids))
+        record_seat_change(db, seat_ids, SeatStatus.available)
+        return len(seat_ids)
+
+
+class AsyncHoldGateway:
+    """การถือที่นั่งของ booking pending — ทุกการเปลี่ยนสถานะเป็น UPDATE แบบมีเงื่อนไขคำสั่งเดียว รันใน session ของผู้เรียกและไม่ commit"""
+
+    @classmethod
+    async def claim_seats(cls, db: AsyncSession, booking_id: int, concert_id: int, zone_id: int,
+                          seat_ids: List[int], now: Optional[datetime] = None) -> datetime:
+        now = now or datetime.now()
+        held_until = now + timedelta(seconds=HOLD_TTL_SECONDS)
+
+        result = await db.execute(_claim_stmt(booking_id, concert_id, zone_id, seat_ids, now, held_until))
+        if result.rowcount == len(seat_ids):
+            record_seat_change(db, seat_ids, SeatStatus.held)
+            return held_until
+
+        await db.rollback()
+        raise SeatConflictError(await cls.get_conflicts(db, concert_id, zone_id, seat_ids, now))
+
+    @classmethod
+    async def get_conflicts(cls, db: AsyncSession, concert_id: int, zone_id: int,
+                            seat_ids: List[int], now: Optional[datetime] = None) -> List[str]:
+        now = now or datetime.now()
+        free = set((await db.execute(_claimable_stmt(concert_id, zone_id, seat_ids, now))).scalars())
+        if len(free) == len(seat_ids):
+            return []
+        numbers = dict((await db.execute(_seat_numbers_stmt(seat_ids))).all())
+        return _conflicts(seat_ids, free, numbers)
+
+    @classmethod
+    async def confirm_seats(cls, db: AsyncSession, booking_id: int, seat_ids: List[int],
+                            now: Optional[datetime] = None) -> None:
+        result = await db.execute(_confirm_stmt(booking_id, seat_ids, now or datetime.now()))
+        if result.rowcount != len(seat_ids):
+            await db.rollback()
+            raise HoldExpiredError(booking_id)
+        record_seat_change(db, seat_ids, SeatStatus.booked)
+
+    @classmethod
+    async def release_booking(cls, db: AsyncSession, booking_id: int) -> int:
+        seat_ids = (await db.execute(_held_by_stmt(booking_id))).scalars().all()
+        if not seat_ids:
+            return 0
+        await db.execute(_release_stmt(seat_ids))
+        record_seat_change(db, seat_ids, SeatStatus.available)
+        return len(seat_ids)
+
+
+class HoldReaper(threading.Thread):
+    """thread เบื้องหลังที่คืนที่นั่งซึ่ง hold หมดอายุแล้วทุก interval วินาที"""
+
+    def __init__(self, interval: int = REAPER_INTERVAL_SECONDS):
+        super().__init__(name="hold-reaper", daemon=True)
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                HoldGateway.release_expired()
+            except Exception as e:
+                print(f"❌ Error releasing expired holds: {str(e)}")
+
+    def stop(self):
+        self._stopped.set()
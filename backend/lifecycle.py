@@ -0,0 +1,208 @@
+import asyncio
+import os
+import signal
+import threading
+from contextlib import AsyncExitStack, ExitStack
+from sqlalchemy import text
+from graphql_app import database
+from concert_gateway import AsyncConcertGateway
+from zone_gateway import AsyncZoneGateway
+from config.config import Config, is_true
+from typing import List, Optional
+
+server_config = Config("config/config.ini").load_server_config()
+
+HOST = server_config.get('host', '127.0.0.1').strip()
+PORT = int(server_config.get('port', 8000))
+WORKERS = int(server_config.get('workers', 1))
+RELOAD = is_true(server_config.get('reload', 'false'))
+BACKLOG = int(server_config.get('backlog', 2048))
+KEEP_ALIVE_SECONDS = int(server_config.get('keep_alive_seconds', 5))
+LIMIT_CONCURRENCY = int(server_config.get('limit_concurrency', 0))
+DRAIN_SECONDS = float(server_config.get('drain_seconds', 5))
+GRACEFUL_TIMEOUT_SECONDS = float(server_config.get('graceful_timeout_seconds', 30))
+WARM_CONNECTIONS = int(server_config.get('warm_connections', 4))
+WARM_CACHES = is_true(server_config.get('warm_caches', 'true'))
+READY_TIMEOUT_SECONDS = float(server_config.get('ready_timeout_seconds', 2))
+PROXY_HEADERS = is_true(server_config.get('proxy_headers', 'false'))
+FORWARDED_ALLOW_IPS = server_config.get('forwarded_allow_ips', '127.0.0.1').strip()
+
+
+def worker_count(workers: int = WORKERS) -> int:
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def memory_store_warnings() -> List[str]:
+    """ส่วนที่ยังเก็บ state ไว้ใน process — เมื่อมีหลาย worker แต่ละ worker จะเห็นข้อมูลไม่ตรงกัน"""
+    import catalog_cache, rate_limit, seat_events, session_tokens, waiting_room
+    from graphql_app import document_cache, read_routing
+
+    stores = [
+        ("[Cache] backend", catalog_cache.BACKEND, "catalog changes reach other workers only after ttl_seconds"),
+        ("[SeatEvents] broker", seat_events.BROKER, "seat updates and seat indexes stay inside the worker that made the change"),
+        ("[WaitingRoom] store", waiting_room.STORE, "each worker keeps its own queue and admits admit_per_second on its own"),
+        ("[RateLimit] store", rate_limit.STORE, "each caller gets the limit once per worker"),
+        ("[Session] store", session_tokens.STORE, "a logged-out token keeps working on the other workers"),
+        ("[GraphQL] persisted_query_store", document_cache.PERSISTED_QUERY_STORE,
+         "a persisted query registered on one worker is unknown to the others"),
+    ]
+    if database.replicas.engines:
+        stores.append(("[ReadReplica] sticky_store", read_routing.STICKY_STORE,
+                       "after a mutation, a query served by another worker may read from a lagging replica"))
+    warnings = [f"{name}=memory: {effect}" for name, value, effect in stores if value == "memory"]
+    warnings.append("/metrics: each scrape only sees the counters of the worker that answered it")
+    return warnings
+
+
+def _shared_secret_error(section: str, env_name: str, secret: str, shared: bool) -> Optional[str]:
+    """secret ที่ลงลายเซ็น token — ค่าตัวอย่างใช้ไม่ได้เลย ค่าว่าง (สุ่มต่อ process) ใช้ได้เฉพาะเมื่อมี process เดียว"""
+    if secret.startswith("change-me"):
+        return f"{section} secret is a placeholder: set {env_name}"
+    if not secret and shared:
+        return f"{section} secret is not set and tokens must be shared between workers: set {env_name}"
+    return None
+
+
+def config_errors(workers: int = WORKERS) -> List[str]:
+    """ค่าที่ต้องตั้งก่อนเปิด server — คืนรายการปัญหา (ว่างเมื่อพร้อม)"""
+    import session_tokens, ticket_code, waiting_room
+
+    errors = []
+    if ticket_code.SECRET is None:
+        errors.append("[TicketCode] secret is not set: set HARMONIQ_TICKET_CODE_SECRET")
+    shared = worker_count(workers) > 1
+    signing_keys = [
+        ("[Session]", "HARMONIQ_SESSION_SECRET", session_tokens.session_config.get('secret', ''),
+         shared or session_tokens.STORE == "redis"),
+        ("[WaitingRoom]", "HARMONIQ_WAITING_ROOM_SECRET", waiting_room.waiting_room_config.get('secret', ''),
+         shared or waiting_room.STORE == "redis"),
+    ]
+    for section, env_name, secret, shared_store in signing_keys:
+        error = _shared_secret_error(section, env_name, secret, shared_store)
+        if error:
+            errors.append(error)
+    return errors
+
+
+def check_config() -> None:
+    errors = config_errors()
+    if errors:
+        raise RuntimeError("; ".join(errors))
+
+
+class ServerState:
+    """สถานะของ worker สำหรับ /readyz — ready เมื่อ warm เสร็จ, draining เมื่อได้ SIGTERM, in_flight คือคำขอ HTTP ที่ยังไม่ตอบ"""
+
+    def __init__(self):
+        self.ready = False
+        self.draining = False
+        self.in_flight = 0
+
+
+server_state = ServerState()
+
+
+def drain_on_sigterm(state: ServerState = server_state, seconds: float = DRAIN_SECONDS) -> None:
+    """ครอบ handler SIGTERM ของ uvicorn — /readyz ตอบ draining ทันที แล้วจึงส่งต่อให้ uvicorn ปิดหลัง seconds วินาที"""
+    # uvicorn ติดตั้ง handler ก่อน lifespan startup และคืน handler เดิมเองตอนปิด
+    if threading.current_thread() is not threading.main_thread():
+        return
+    previous = signal.getsignal(signal.SIGTERM)
+    if not callable(previous):
+        return
+    loop = asyncio.get_running_loop()
+
+    def handle(sig, frame):
+        if state.draining or seconds <= 0:
+            # SIGTERM ครั้งที่สองปิดทันที
+            state.draining = True
+            previous(sig, frame)
+            return
+        state.draining = True
+        loop.call_soon_threadsafe(loop.call_later, seconds, previous, sig, frame)
+
+    signal.signal(signal.SIGTERM, handle)
+
+
+class InFlightMiddleware:
+    """นับคำขอ HTTP ที่กำลังทำงานอยู่ — websocket (subscription) ไม่นับ เพราะเปิดค้างได้ตลอด"""
+
+    def __init__(self, app, state: ServerState = server_state):
+        self.app = app
+        self.state = state
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self.state.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.state.in_flight -= 1
+
+
+def _warm_sync_pool(connections: int) -> None:
+    with ExitStack() as stack:
+        for _ in range(connections):
+            stack.enter_context(database.engine.connect()).execute(text("SELECT 1"))
+
+
+async def warm_pools(connections: int = WARM_CONNECTIONS) -> None:
+    """เปิด connection ไว้ใน pool ของทั้งสอง engine ก่อนรับคำขอแรก (ไม่เกิน pool_size — ที่เกินจะถูกปิดทันทีที่คืน)"""
+    pool = database.async_engine.sync_engine.pool
+    if hasattr(pool, "size"):
+        connections = min(connections, pool.size())
+    if connections <= 0:
+        return
+    for async_engine in [database.async_engine] + database.replicas.engines:
+        async with AsyncExitStack() as stack:
+            for _ in range(connections):
+                conn = await stack.enter_async_context(async_engine.connect())
+                await conn.execute(text("SELECT 1"))
+    # engine แบบ sync ใช้โดย thread เบื้องหลัง (reaper, outbox relay) และ bcrypt
+    await asyncio.to_thread(_warm_sync_pool, min(connections, 2))
+
+
+async def warm_caches() -> int:
+    """โหลดคอนเสิร์ตและโซนทั้งหมดเข้า catalog_cache คืนจำนวนคอนเสิร์ต"""
+    concerts = await AsyncConcertGateway.get_concerts()
+    if concerts:
+        await AsyncZoneGateway.get_zones_by_concerts([c["concert_id"] for c in concerts])
+    return len(concerts)
+
+
+async def check_database(timeout: float = READY_TIMEOUT_SECONDS) -> Optional[str]:
+    """None ถ้าฐานข้อมูลตอบ SELECT 1 ทันเวลา ไม่เช่นนั้นคืนข้อความของปัญหา"""
+
+    async def ping():
+        async with database.async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    try:
+        await asyncio.wait_for(ping(), timeout)
+        return None
+    except asyncio.TimeoutError:
+        return f"database did not answer within {timeout:g}s"
+    except Exception as e:
+        return f"database error: {str(e)}"
+
+
+async def startup(state: ServerState = server_state) -> None:
+    """warm pool และ cache — ถ้าฐานข้อมูลยังไม่พร้อม worker ยังเปิดได้ และ /readyz จะรายงานเองจนกว่าจะต่อได้"""
+    check_config()
+    drain_on_sigterm(state)
+    try:
+        await warm_pools()
+        if WARM_CACHES:
+            await warm_caches()
+    except Exception as e:
+        print(f"❌ Error warming up worker {os.getpid()}: {str(e)}")
+    state.ready = True
+
+
+async def dispose_engines() -> None:
+    await database.async_engine.dispose()
+    for replica in database.replicas.engines:
+        await replica.dispose()
+    database.engine.dispose()
@@ -0,0 +1,42 @@
+# ปรับ schema ของฐานข้อมูลเดิมให้ตรงกับ model — รันจากโฟลเดอร์ backend
+#   python migrate.py status
+#   python migrate.py upgrade [--to VERSION]
+#   python migrate.py downgrade --to VERSION
+#   python migrate.py stamp VERSION
+import argparse
+from graphql_app.database import get_engine
+import migrations
+
+
+def status(engine) -> None:
+    with engine.begin() as conn:
+        applied = set(migrations.applied_versions(conn))
+    for migration in migrations.discover():
+        mark = "applied" if migration.version in applied else "pending"
+        print(f"{migration.version:04d}  {mark:8}  {migration.name} — {migration.description}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Versioned schema migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status")
+    up = commands.add_parser("upgrade")
+    up.add_argument("--to", type=int, default=None)
+    down = commands.add_parser("downgrade")
+    down.add_argument("--to", type=int, required=True)
+    mark = commands.add_parser("stamp", help="record versions as applied without running them")
+    mark.add_argument("version", type=int)
+    args = parser.parse_args()
+
+    engine = get_engine()
+    if args.command == "status":
+        status(engine)
+    elif args.command == "upgrade":
+        for migration in migrations.upgrade(engine, args.to):
+            print(f"✅ upgraded {migration.version:04d} {migration.name}")
+    elif args.command == "downgrade":
+        for migration in migrations.downgrade(engine, args.to):
+            print(f"✅ downgraded {migration.version:04d} {migration.name}")
+    else:
+        migrations.stamp(engine, args.version)
+        print(f"✅ stamped {args.version:04d}")
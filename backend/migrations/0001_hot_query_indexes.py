@@ -0,0 +1,28 @@
+from migrations import create_index, drop_index
+
+description = "secondary indexes for the seat, booking and ticket query paths"
+
+# (name, table, columns, FK column the index also serves in MySQL)
+INDEXES = [
+    ("ix_zones_concert_name", "zones", ["concert_id", "zone_name"], "concert_id"),
+    ("ix_seats_zone_status", "seats", ["zone_id", "seat_status"], "zone_id"),
+    ("ix_seats_hold_expiry", "seats", ["seat_status", "held_until"], None),
+    ("ix_seats_held_by", "seats", ["held_by_booking_id"], "held_by_booking_id"),
+    ("ix_bookings_user", "bookings", ["user_id", "booking_id"], "user_id"),
+    ("ix_bookings_pending_expiry", "bookings", ["booking_status", "expires_at"], None),
+    ("ix_bookings_concert", "bookings", ["concert_id"], "concert_id"),
+    ("ix_booking_seats_booking", "booking_seats", ["booking_id", "seat_id"], "booking_id"),
+    ("ix_booking_seats_seat", "booking_seats", ["seat_id"], "seat_id"),
+    ("ix_tickets_user", "tickets", ["user_id", "ticket_id"], "user_id"),
+    ("ix_tickets_booking", "tickets", ["booking_id"], "booking_id"),
+]
+
+
+def upgrade(conn):
+    for name, table, columns, _ in INDEXES:
+        create_index(conn, name, table, columns)
+
+
+def downgrade(conn):
+    for name, table, _, fk_column in reversed(INDEXES):
+        drop_index(conn, name, table, fk_column)
@@ -0,0 +1,30 @@
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Integer, MetaData, String, Table, func
+
+description = "outbox_events and outbox_relays for the booking event stream"
+
+metadata = MetaData()
+
+outbox_events = Table(
+    "outbox_events", metadata,
+    Column("event_id", BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True),
+    Column("event_type", String(32), nullable=False),
+    Column("booking_id", Integer, nullable=False),
+    Column("payload", JSON, nullable=False),
+    Column("created_at", DateTime, nullable=False, server_default=func.now()),
+)
+
+outbox_relays = Table(
+    "outbox_relays", metadata,
+    Column("relay_name", String(64), primary_key=True),
+    Column("last_event_id", BigInteger, nullable=False, server_default="0"),
+    Column("relayed_count", BigInteger, nullable=False, server_default="0"),
+    Column("relayed_at", DateTime, nullable=True),
+)
+
+
+def upgrade(conn):
+    metadata.create_all(conn, checkfirst=True)
+
+
+def downgrade(conn):
+    metadata.drop_all(conn, checkfirst=True)
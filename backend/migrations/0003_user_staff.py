@@ -0,0 +1,14 @@
+from sqlalchemy import text
+from migrations import column_names
+
+description = "users.is_staff for seat status changes and the gate scanners"
+
+
+def upgrade(conn):
+    if "is_staff" not in column_names(conn, "users"):
+        conn.execute(text("ALTER TABLE users ADD COLUMN is_staff BOOLEAN NOT NULL DEFAULT FALSE"))
+
+
+def downgrade(conn):
+    if "is_staff" in column_names(conn, "users"):
+        conn.execute(text("ALTER TABLE users DROP COLUMN is_staff"))
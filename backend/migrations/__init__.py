@@ -0,0 +1,116 @@
+# Versioned schema migrations — รันด้วย python migrate.py จากโฟลเดอร์ backend
+#
+# แต่ละไฟล์ NNNN_<name>.py คือหนึ่ง version (NNNN) และต้องมี description,
+# upgrade(conn) และ downgrade(conn). version ที่รันแล้วถูกบันทึกใน schema_migrations
+import importlib
+import pkgutil
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, text
+from sqlalchemy.engine import Connection
+from typing import List, NamedTuple, Optional
+
+metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations", metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    description: str
+    module: object
+
+
+def discover() -> List[Migration]:
+    migrations = []
+    for info in pkgutil.iter_modules(__path__):
+        prefix, _, name = info.name.partition("_")
+        if not prefix.isdigit():
+            continue
+        module = importlib.import_module(f"{__name__}.{info.name}")
+        migrations.append(Migration(int(prefix), name, module.description, module))
+    migrations.sort(key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError("migration version ซ้ำกัน")
+    return migrations
+
+
+def applied_versions(conn: Connection) -> List[int]:
+    metadata.create_all(conn, checkfirst=True)
+    return sorted(conn.execute(schema_migrations.select().with_only_columns(schema_migrations.c.version)).scalars())
+
+
+def upgrade(engine, target: Optional[int] = None) -> List[Migration]:
+    """รัน migration ที่ยังไม่ได้รันตามลำดับจนถึง target (ไม่ระบุ = ล่าสุด) — หนึ่ง transaction ต่อ version"""
+    done = []
+    with engine.begin() as conn:
+        applied = set(applied_versions(conn))
+    for migration in discover():
+        if migration.version in applied or (target is not None and migration.version > target):
+            continue
+        with engine.begin() as conn:
+            migration.module.upgrade(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=migration.version, description=migration.description, applied_at=datetime.now()
+            ))
+        done.append(migration)
+    return done
+
+
+def downgrade(engine, target: int) -> List[Migration]:
+    """ย้อน migration ที่ version มากกว่า target จากใหม่ไปเก่า"""
+    done = []
+    with engine.begin() as conn:
+        applied = set(applied_versions(conn))
+    for migration in reversed(discover()):
+        if migration.version not in applied or migration.version <= target:
+            continue
+        with engine.begin() as conn:
+            migration.module.downgrade(conn)
+            conn.execute(schema_migrations.delete().where(schema_migrations.c.version == migration.version))
+        done.append(migration)
+    return done
+
+
+def stamp(engine, version: int) -> None:
+    """บันทึกว่ารันถึง version แล้วโดยไม่รันจริง — สำหรับฐานข้อมูลที่สร้างจาก database.txt ล่าสุด"""
+    with engine.begin() as conn:
+        applied = set(applied_versions(conn))
+        for migration in discover():
+            if migration.version <= version and migration.version not in applied:
+                conn.execute(schema_migrations.insert().values(
+                    version=migration.version, description=migration.description, applied_at=datetime.now()
+                ))
+
+
+# helpers สำหรับไฟล์ migration
+
+def index_names(conn: Connection, table: str) -> List[str]:
+    return [ix["name"] for ix in inspect(conn).get_indexes(table)]
+
+
+def column_names(conn: Connection, table: str) -> List[str]:
+    return [column["name"] for column in inspect(conn).get_columns(table)]
+
+
+def create_index(conn: Connection, name: str, table: str, columns: List[str]) -> None:
+    if name not in index_names(conn, table):
+        conn.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+
+
+def drop_index(conn: Connection, name: str, table: str, fk_column: Optional[str] = None) -> None:
+    if name not in index_names(conn, table):
+        return
+    if conn.dialect.name == "mysql":
+        if fk_column:
+            # MySQL ต้องมี index ที่ขึ้นต้นด้วยคอลัมน์ FK เสมอ — สร้างแบบคอลัมน์เดียวไว้ก่อนลบ
+            create_index(conn, f"{table}_{fk_column}_fk", table, [fk_column])
+        conn.execute(text(f"DROP INDEX {name} ON {table}"))
+    else:
+        conn.execute(text(f"DROP INDEX {name}"))
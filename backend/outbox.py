@@ -0,0 +1,206 @@
+import enum
+import json
+import os
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from graphql_app.database import SessionLocal
+from graphql_app.model import OutboxEvent, OutboxRelayState
+from config.config import Config, is_true
+from redis_client import redis_client
+from typing import List
+
+outbox_config = Config("config/config.ini").load_outbox_config()
+
+ENABLED = is_true(outbox_config.get('enabled', 'true'))
+SINK = outbox_config.get('sink', 'jsonl').strip().lower()
+PATH = outbox_config.get('path', 'outbox/booking-events.jsonl')
+REDIS_URL = outbox_config.get('redis_url', 'redis://localhost:6379/0')
+STREAM = outbox_config.get('stream', 'harmoniq:booking-events')
+STREAM_MAXLEN = int(outbox_config.get('stream_maxlen', 1000000))
+RELAY_NAME = outbox_config.get('relay_name', 'default')
+BATCH_SIZE = int(outbox_config.get('batch_size', 500))
+INTERVAL_SECONDS = float(outbox_config.get('interval_seconds', 1))
+
+BOOKING_CREATED = "booking_created"
+BOOKING_CONFIRMED = "booking_confirmed"
+BOOKING_CANCELLED = "booking_cancelled"
+TICKET_ISSUED = "ticket_issued"
+
+
+def _jsonable(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return value
+
+
+def booking_event(event_type: str, booking_id: int, **data) -> dict:
+    """แถวของ outbox_events หนึ่งแถว — data ต้องแปลงเป็น JSON ได้ (datetime/enum/Decimal แปลงให้)"""
+    return {
+        "event_type": event_type,
+        "booking_id": booking_id,
+        "payload": _jsonable(data),
+        "created_at": datetime.now()
+    }
+
+
+def record_events(db: Session, events: List[dict]) -> None:
+    """เพิ่ม event ลงใน transaction ของ db — commit หรือ rollback ไปพร้อมกับการเปลี่ยนแปลงของ booking"""
+    if ENABLED and events:
+        db.execute(insert(OutboxEvent), events)
+
+
+async def arecord_events(db: AsyncSession, events: List[dict]) -> None:
+    if ENABLED and events:
+        await db.execute(insert(OutboxEvent), events)
+
+
+class JsonlFileSink:
+    """ต่อท้ายไฟล์ทีละ batch หนึ่งบรรทัดต่อ event และ fsync ก่อนที่ relay จะลบแถวออกจาก outbox"""
+
+    def __init__(self, path: str = PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, events: List[dict]) -> None:
+        lines = "".join(json.dumps(e, ensure_ascii=False, separators=(",", ":")) + "\n" for e in events)
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+
+
+class MemorySink:
+    """เก็บ event ไว้ใน list ของ process นี้ — แทน broker จริงตอนรันในเครื่อง"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.events: List[dict] = []
+
+    def write(self, events: List[dict]) -> None:
+        with self._lock:
+            self.events.extend(events)
+
+
+class RedisStreamSink:
+    """XADD แต่ละ event ลง redis stream — หนึ่ง pipeline ต่อ batch"""
+
+    def __init__(self, client, stream: str = STREAM, maxlen: int = STREAM_MAXLEN):
+        self.client = client
+        self.stream = stream
+        self.maxlen = maxlen
+
+    def write(self, events: List[dict]) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for e in events:
+            pipe.xadd(self.stream, {"event": json.dumps(e, ensure_ascii=False)}, maxlen=self.maxlen, approximate=True)
+        pipe.execute()
+
+
+def _sink_from_config():
+    if SINK == "redis":
+        return RedisStreamSink(redis_client(REDIS_URL, "Outbox sink"))
+    if SINK == "memory":
+        return MemorySink()
+    return JsonlFileSink()
+
+
+def _message(row) -> dict:
+    return {
+        "event_id": row.event_id,
+        "type": row.event_type,
+        "booking_id": row.booking_id,
+        "occurred_at": row.created_at.isoformat(),
+        "data": row.payload
+    }
+
+
+class OutboxRelay(threading.Thread):
+    """thread ที่ส่ง outbox_events ไป sink ตามลำดับ event_id แบบ at-least-once — consumer ต้อง dedupe ด้วย event_id"""
+
+    def __init__(self, sink=None, relay_name: str = RELAY_NAME, batch_size: int = BATCH_SIZE,
+                 interval: float = INTERVAL_SECONDS):
+        super().__init__(name="outbox-relay", daemon=True)
+        self.sink = sink if sink is not None else _sink_from_config()
+        self.relay_name = relay_name
+        self.batch_size = batch_size
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def relay_batch(self) -> int:
+        """ส่ง event ที่เก่าที่สุดไม่เกิน batch_size รายการ คืนจำนวนที่ส่ง (0 = ไม่มี หรือ relay อื่นกำลังส่งอยู่)"""
+        with SessionLocal() as db:
+            state = self._lock_state(db)
+            if state is None:
+                return 0
+
+            rows = db.execute(
+                select(OutboxEvent.event_id, OutboxEvent.event_type, OutboxEvent.booking_id,
+                       OutboxEvent.payload, OutboxEvent.created_at)
+                .order_by(OutboxEvent.event_id)
+                .limit(self.batch_size)
+            ).all()
+            if not rows:
+                db.rollback()
+                return 0
+
+            self.sink.write([_message(r) for r in rows])
+
+            event_ids = [r.event_id for r in rows]
+            db.execute(delete(OutboxEvent).where(OutboxEvent.event_id.in_(event_ids))
+                       .execution_options(synchronize_session=False))
+            state.last_event_id = max(state.last_event_id or 0, event_ids[-1])
+            state.relayed_count = (state.relayed_count or 0) + len(rows)
+            state.relayed_at = datetime.now()
+            db.commit()
+            return len(rows)
+
+    def _lock_state(self, db: Session):
+        state = db.execute(
+            select(OutboxRelayState)
+            .where(OutboxRelayState.relay_name == self.relay_name)
+            .with_for_update(skip_locked=True)
+        ).scalar_one_or_none()
+        if state is not None:
+            return state
+        if db.execute(select(OutboxRelayState.relay_name)
+                      .where(OutboxRelayState.relay_name == self.relay_name)).first() is not None:
+            # มีแถวแต่ถูกล็อกอยู่ — relay ใน process อื่นกำลังส่ง batch
+            db.rollback()
+            return None
+        state = OutboxRelayState(relay_name=self.relay_name, last_event_id=0, relayed_count=0)
+        db.add(state)
+        try:
+            db.flush()
+        except IntegrityError:
+            db.rollback()
+            return None
+        return state
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                # batch เต็มแปลว่ายังมีค้าง — ส่งต่อทันทีไม่ต้องรอรอบถัดไป
+                while self.relay_batch() >= self.batch_size and not self._stopped.is_set():
+                    pass
+            except Exception as e:
+                print(f"❌ Error relaying outbox events: {str(e)}")
+
+    def stop(self):
+        self._stopped.set()
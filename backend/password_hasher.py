@@ -0,0 +1,83 @@
+import asyncio
+import os
+import threading
+import bcrypt
+from concurrent.futures import ThreadPoolExecutor
+from config.config import Config
+
+password_config = Config("config/config.ini").load_password_config()
+
+BCRYPT_ROUNDS = int(password_config.get('bcrypt_rounds', 12))
+WORKERS = int(password_config.get('workers', 0)) or min(4, os.cpu_count() or 1)
+MAX_QUEUE = int(password_config.get('max_queue', 64))
+
+
+class PasswordHasherBusyError(ValueError):
+    def __init__(self, message: str = "ระบบกำลังมีผู้ใช้เข้าสู่ระบบจำนวนมาก กรุณาลองใหม่อีกครั้ง"):
+        super().__init__(message)
+
+
+class PasswordHasher:
+    """bcrypt บน thread pool ขนาดคงที่ — รอคิวเกิน max_queue จะโยน PasswordHasherBusyError ทันที"""
+
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, workers: int = WORKERS, max_queue: int = MAX_QUEUE):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._inflight = 0
+
+    def _hash(self, password: str) -> str:
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.rounds)).decode('utf-8')
+
+    @staticmethod
+    def _verify(password: str, hashed: str) -> bool:
+        try:
+            return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+        except ValueError:
+            # hash ในฐานข้อมูลเสียหรือไม่ใช่ bcrypt
+            return False
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self._inflight >= self.workers + self.max_queue:
+                raise PasswordHasherBusyError()
+            self._inflight += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, _future) -> None:
+        with self._lock:
+            self._inflight -= 1
+
+    def hash(self, password: str) -> str:
+        return self._submit(self._hash, password).result()
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self._submit(self._verify, password, hashed).result()
+
+    async def ahash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(self._hash, password))
+
+    async def averify(self, password: str, hashed: str) -> bool:
+        return await asyncio.wrap_future(self._submit(self._verify, password, hashed))
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True ถ้า hash นี้สร้างด้วย cost ที่ไม่ตรงกับ bcrypt_rounds ปัจจุบัน"""
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+
+password_hasher = PasswordHasher()
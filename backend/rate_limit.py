@@ -0,0 +1,206 @@
+import inspect
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from config.config import Config, is_true
+from redis_client import redis_client
+from graphql_app.document_cache import request_payloads, payload_query, operation_fields
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+rate_limit_config = Config("config/config.ini").load_rate_limit_config()
+
+ENABLED = is_true(rate_limit_config.get('enabled', 'true'))
+STORE = rate_limit_config.get('store', 'memory').strip().lower()
+REDIS_URL = rate_limit_config.get('redis_url', 'redis://localhost:6379/0')
+MAX_KEYS = int(rate_limit_config.get('max_keys', 100000))
+TRUST_FORWARDED_FOR = is_true(rate_limit_config.get('trust_forwarded_for', 'false'))
+
+
+def _parse_limit(value: str) -> Tuple[float, float]:
+    """'rate,burst' → (token ต่อวินาที, จำนวน token สูงสุด)"""
+    rate, _, burst = value.partition(",")
+    rate = float(rate)
+    return rate, float(burst) if burst.strip() else max(1.0, rate)
+
+
+DEFAULT_LIMIT = _parse_limit(rate_limit_config.get('default', '10,40'))
+# configparser เก็บชื่อ key เป็นตัวเล็ก — เทียบชื่อ field แบบไม่สนตัวพิมพ์
+FIELD_LIMITS = {
+    key.split(".", 1)[1].lower(): _parse_limit(value)
+    for key, value in rate_limit_config.items() if key.startswith('limit.')
+}
+
+
+class MemoryRateLimitStore:
+    """token bucket ใน process นี้ — เก็บแบบ LRU ไม่เกิน max_keys"""
+
+    def __init__(self, max_keys: int = MAX_KEYS):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # key → [tokens, updated_at]
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    def take(self, key: str, rate: float, burst: float, now: float) -> float:
+        """ใช้ 1 token — คืน 0 ถ้าผ่าน หรือจำนวนวินาทีที่ต้องรอถ้าไม่ผ่าน"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [burst, now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / rate if rate > 0 else math.inf
+
+    async def atake(self, key: str, rate: float, burst: float, now: float) -> float:
+        return self.take(key, rate, burst, now)
+
+
+# เติมและใช้ token แบบ atomic ใน redis — เหมือน MemoryRateLimitStore.take
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens') or ARGV[2])
+local updated = tonumber(redis.call('HGET', KEYS[1], 'updated') or ARGV[3])
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisRateLimitStore:
+    """token bucket ที่แชร์ทุก process"""
+
+    def __init__(self, client, prefix: str = "harmoniq:rate-limit:"):
+        self.client = client
+        self.prefix = prefix
+        self._take = client.register_script(_TAKE_SCRIPT)
+
+    async def atake(self, key: str, rate: float, burst: float, now: float) -> float:
+        result = self._take(keys=[f"{self.prefix}{key}"], args=[rate, burst, now])
+        if inspect.isawaitable(result):
+            result = await result
+        return float(result)
+
+
+class RateLimitMiddleware:
+    """จำกัดคำขอ /graphql ด้วย token bucket ต่อ root field และผู้ใช้ (หรือ IP) — เกินตอบ 429 ก่อนถึง GraphQL"""
+
+    def __init__(self, app, store=None, enabled: bool = ENABLED,
+                 default_limit: Tuple[float, float] = DEFAULT_LIMIT,
+                 field_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 trust_forwarded_for: bool = TRUST_FORWARDED_FOR,
+                 identify_user: Optional[Callable[[dict], Awaitable[Optional[int]]]] = None,
+                 path: str = "/graphql"):
+        self.app = app
+        self.store = store or rate_limit_store
+        self.enabled = enabled
+        self.default_limit = default_limit
+        field_limits = FIELD_LIMITS if field_limits is None else field_limits
+        self.field_limits = {field.lower(): limit for field, limit in field_limits.items()}
+        self.trust_forwarded_for = trust_forwarded_for
+        self.identify_user = identify_user
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http" or not scope["path"].startswith(self.path):
+            await self.app(scope, receive, send)
+            return
+
+        body = b""
+        if scope["method"] == "POST":
+            messages = []
+            while True:
+                message = await receive()
+                messages.append(message)
+                body += message.get("body", b"")
+                if not message.get("more_body"):
+                    break
+
+            # ส่ง body ที่อ่านไปแล้วให้ app อ่านซ้ำได้
+            async def replay():
+                return messages.pop(0) if messages else await receive()
+            app_receive = replay
+        else:
+            app_receive = receive
+
+        retry_after = await self.check(scope, body)
+        if retry_after:
+            await self._reject(send, retry_after)
+            return
+        await self.app(scope, app_receive, send)
+
+    async def check(self, scope, body: bytes) -> float:
+        """คืน 0 ถ้าผ่านทุก bucket หรือจำนวนวินาทีที่ต้องรอ"""
+        identity = await self._identity(scope)
+        buckets = {}
+        for field in self._fields(scope, body):
+            limit = self.field_limits.get(field.lower())
+            if limit is None:
+                buckets["*"] = self.default_limit
+            else:
+                buckets[field] = limit
+        if not buckets:
+            buckets["*"] = self.default_limit
+
+        now = time.time()
+        retry_after = 0.0
+        for name, (rate, burst) in buckets.items():
+            retry_after = max(retry_after, await self.store.atake(f"{name}:{identity}", rate, burst, now))
+        return retry_after
+
+    async def _identity(self, scope) -> str:
+        if self.identify_user is not None:
+            user_id = await self.identify_user(scope)
+            if user_id is not None:
+                return f"user:{user_id}"
+        if self.trust_forwarded_for:
+            for name, value in scope.get("headers", ()):
+                if name == b"x-forwarded-for":
+                    return f"ip:{value.decode('latin-1').split(',')[0].strip()}"
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    def _fields(self, scope, body: bytes) -> List[str]:
+        fields = []
+        # persisted query ที่ส่งมาแค่ hash ใช้ข้อความที่ลงทะเบียนไว้ — ไม่ให้เลี่ยง limit ของ field ได้
+        for payload in request_payloads(scope["method"], scope.get("query_string", b""), body):
+            fields.extend(operation_fields(payload_query(payload), payload.get("operationName")))
+        return fields
+
+    async def _reject(self, send, retry_after: float) -> None:
+        seconds = "60" if math.isinf(retry_after) else str(max(1, math.ceil(retry_after)))
+        body = json.dumps({
+            "data": None,
+            "errors": [{"message": "ส่งคำขอถี่เกินไป กรุณาลองใหม่ภายหลัง", "extensions": {"code": "RATE_LIMITED"}}]
+        }, ensure_ascii=False).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", seconds.encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def _store_from_config():
+    if STORE == "redis":
+        return RedisRateLimitStore(redis_client(REDIS_URL, "RateLimit store", use_asyncio=True))
+    return MemoryRateLimitStore()
+
+
+rate_limit_store = _store_from_config()
@@ -0,0 +1,13 @@
+# client redis สำหรับ store ที่ตั้งเป็น redis ใน config.ini — import package redis เฉพาะเมื่อมีการใช้จริง
+
+
+def redis_client(url: str, setting: str, *, use_asyncio: bool = False):
+    """client จาก url — use_asyncio=True คืน redis.asyncio.Redis สำหรับเรียกบน event loop, setting ใช้ในข้อความ error"""
+    try:
+        if use_asyncio:
+            import redis.asyncio as redis
+        else:
+            import redis
+    except ImportError:
+        raise RuntimeError(f"{setting} 'redis' ต้องติดตั้ง package redis ก่อน (pip install redis)")
+    return redis.Redis.from_url(url)
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from config.config import Config, is_true
+from catalog_cache import catalog_cache
+from graphql_app.document_cache import request_payloads, payload_query, operation_fields
+from typing import Iterable, List, Optional, Tuple
+
+response_cache_config = Config("config/config.ini").load_response_cache_config()
+
+ENABLED = is_true(response_cache_config.get('enabled', 'true'))
+MAX_AGE = int(response_cache_config.get('max_age', 30))
+STALE_WHILE_REVALIDATE = int(response_cache_config.get('stale_while_revalidate', 60))
+MAX_ENTRIES = int(response_cache_config.get('max_entries', 1000))
+
+# field ระดับบนสุดที่ทุกคนเห็นเหมือนกัน และทุก field ที่อยู่ข้างใต้ก็มาจาก catalog (คอนเสิร์ต/โซน) เท่านั้น
+PUBLIC_FIELDS = frozenset({"getConcerts", "getConcertById", "getZonesByConcert"})
+
+
+class ResponseCacheMiddleware:
+    """HTTP cache และ ETag ของ query สาธารณะ (PUBLIC_FIELDS) บน /graphql"""
+
+    def __init__(self, app, enabled: bool = ENABLED, max_age: int = MAX_AGE,
+                 stale_while_revalidate: int = STALE_WHILE_REVALIDATE, max_entries: int = MAX_ENTRIES,
+                 public_fields: Iterable[str] = PUBLIC_FIELDS, path: str = "/graphql"):
+        self.app = app
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.public_fields = frozenset(public_fields)
+        self.path = path
+        self.cache_control = f"public, max-age={max_age}, stale-while-revalidate={stale_while_revalidate}".encode()
+        self._lock = threading.Lock()
+        # key → (data version, response headers, body, etag)
+        self._responses: "OrderedDict[str, Tuple[int, list, bytes, bytes]]" = OrderedDict()
+
+    async def __call__(self, scope, receive, send):
+        if (not self.enabled or scope["type"] != "http" or scope["method"] not in ("GET", "POST")
+                or not scope["path"].startswith(self.path)):
+            await self.app(scope, receive, send)
+            return
+
+        body = b""
+        app_receive = receive
+        if scope["method"] == "POST":
+            messages = []
+            while True:
+                message = await receive()
+                messages.append(message)
+                body += message.get("body", b"")
+                if not message.get("more_body"):
+                    break
+
+            # ส่ง body ที่อ่านไปแล้วให้ app อ่านซ้ำได้
+            async def replay():
+                return messages.pop(0) if messages else await receive()
+            app_receive = replay
+
+        key = self._key(scope, body)
+        if key is None:
+            if scope["method"] == "GET":
+                send = self._with_headers(send, [(b"cache-control", b"private, no-store")])
+            await self.app(scope, app_receive, send)
+            return
+
+        version = await catalog_cache.data_version()
+        cached = self._get(key)
+        if cached is not None and cached[0] == version:
+            await self._respond(scope, send, cached[1], cached[2], cached[3], b"HIT")
+            return
+
+        status, response_headers, response_body = await self._run(scope, app_receive)
+        if status == 200 and await catalog_cache.data_version() == version and not self._has_errors(response_body):
+            response_headers = [(k, v) for k, v in response_headers if k.lower() not in (b"etag", b"cache-control")]
+            etag = self._etag(response_body)
+            self._set(key, (version, response_headers, response_body, etag))
+            await self._respond(scope, send, response_headers, response_body, etag, b"MISS")
+        else:
+            # ข้อมูลเปลี่ยนระหว่างรัน หรือมี error — ส่งต่อโดยไม่ cache
+            await self._send(send, status, response_body, response_headers, None)
+
+    def _key(self, scope, body: bytes) -> Optional[str]:
+        payloads = request_payloads(scope["method"], scope.get("query_string", b""), body)
+        if len(payloads) != 1:
+            return None
+        payload = payloads[0]
+        query = payload_query(payload)
+        fields = operation_fields(query, payload.get("operationName"))
+        if not fields or not self.public_fields.issuperset(fields):
+            return None
+        raw = json.dumps([query, payload.get("operationName"), payload.get("variables") or {}],
+                         sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def _respond(self, scope, send, headers: list, body: bytes, etag: bytes, cache_status: bytes) -> None:
+        validators = [(b"etag", etag), (b"cache-control", self.cache_control)]
+        if scope["method"] == "GET" and etag in self._if_none_match(scope):
+            await send({"type": "http.response.start", "status": 304, "headers": validators})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await self._send(send, 200, body, headers + validators, cache_status)
+
+    @staticmethod
+    def _etag(body: bytes) -> bytes:
+        # มาจากเนื้อหาของคำตอบ — ทุก worker ให้ etag เดียวกันกับข้อมูลชุดเดียวกัน
+        return f'"{hashlib.sha256(body).hexdigest()[:32]}"'.encode()
+
+    @staticmethod
+    def _has_errors(body: bytes) -> bool:
+        try:
+            return bool(json.loads(body).get("errors"))
+        except (ValueError, AttributeError):
+            return True
+
+    @staticmethod
+    def _if_none_match(scope) -> List[bytes]:
+        for name, value in scope.get("headers", ()):
+            if name == b"if-none-match":
+                return [tag.strip().removeprefix(b"W/") for tag in value.split(b",")]
+        return []
+
+    async def _run(self, scope, receive) -> Tuple[int, list, bytes]:
+        start = {}
+        chunks = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        headers = [(k, v) for k, v in start.get("headers", []) if k.lower() != b"content-length"]
+        return start.get("status", 500), headers, b"".join(chunks)
+
+    @staticmethod
+    async def _send(send, status: int, body: bytes, headers: list, cache_status: Optional[bytes]) -> None:
+        headers = headers + [(b"content-length", str(len(body)).encode())]
+        if cache_status is not None:
+            headers.append((b"x-cache", cache_status))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    def _with_headers(send, extra: list):
+        async def wrapped(message):
+            if message["type"] == "http.response.start":
+                message = dict(message, headers=list(message.get("headers", [])) + extra)
+            await send(message)
+        return wrapped
+
+    def _get(self, key: str) -> Optional[Tuple[int, list, bytes, bytes]]:
+        with self._lock:
+            entry = self._responses.get(key)
+            if entry is not None:
+                self._responses.move_to_end(key)
+            return entry
+
+    def _set(self, key: str, entry: Tuple[int, list, bytes, bytes]) -> None:
+        with self._lock:
+            self._responses[key] = entry
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_entries:
+                self._responses.popitem(last=False)
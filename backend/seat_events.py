@@ -0,0 +1,197 @@
+import asyncio
+import json
+import threading
+import uuid
+from graphql_app.model import SeatStatus
+from config.config import Config
+from redis_client import redis_client
+from seat_index import seat_index, seat_change_listeners
+from zone_gateway import AsyncZoneGateway
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+seat_events_config = Config("config/config.ini").load_seat_events_config()
+
+BROKER = seat_events_config.get('broker', 'memory').strip().lower()
+REDIS_URL = seat_events_config.get('redis_url', 'redis://localhost:6379/0')
+CHANNEL = seat_events_config.get('channel', 'harmoniq:seat-events')
+
+
+class InProcessBroker:
+    """ไม่ส่งต่อไปไหน — subscriber เห็นเฉพาะการเปลี่ยนแปลงใน process นี้"""
+
+    def start(self, receive: Callable[[dict], None]) -> None:
+        pass
+
+    def publish(self, message: dict) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class RedisBroker:
+    """ส่ง seat event ข้าม process ผ่าน redis pub/sub"""
+
+    def __init__(self, client, async_client=None, channel: str = CHANNEL):
+        # client (sync) ฟังใน thread และส่งจาก thread เบื้องหลัง — async_client ส่งเมื่อ commit เกิดบน event loop
+        self.client = client
+        self.async_client = async_client
+        self.channel = channel
+        self._pubsub = None
+        self._thread = None
+        self._last: Optional[asyncio.Task] = None
+
+    def start(self, receive: Callable[[dict], None]) -> None:
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(self.channel)
+
+        def listen():
+            for item in self._pubsub.listen():
+                try:
+                    receive(json.loads(item["data"]))
+                except Exception as e:
+                    print(f"❌ Error receiving seat event: {str(e)}")
+
+        self._thread = threading.Thread(target=listen, name="seat-events", daemon=True)
+        self._thread.start()
+
+    def publish(self, message: dict) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is None or self.async_client is None:
+            self.client.publish(self.channel, json.dumps(message))
+            return
+        # ไม่รอผลบน event loop แต่ส่งตามลำดับ — สถานะล่าสุดของที่นั่งต้องถึงปลายทางเป็นอันสุดท้าย
+        self._last = loop.create_task(self._apublish(self._last, json.dumps(message)))
+        self._last.add_done_callback(self._done)
+
+    async def _apublish(self, previous: Optional[asyncio.Task], data: str) -> None:
+        if previous is not None and not previous.done():
+            await asyncio.wait([previous])
+        await self.async_client.publish(self.channel, data)
+
+    def _done(self, task: asyncio.Task) -> None:
+        if self._last is task:
+            self._last = None
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ Error publishing seat event: {str(task.exception())}")
+
+    def stop(self) -> None:
+        if self._pubsub is not None:
+            self._pubsub.close()
+
+
+class _Subscriber:
+    """subscription หนึ่งราย — รวมการเปลี่ยนแปลงต่อที่นั่งไว้จนกว่าจะถูกอ่าน client ที่ช้าจึงได้ delta เดียว"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.event = asyncio.Event()
+        self._lock = threading.Lock()
+        self._pending: Dict[int, SeatStatus] = {}
+
+    def push(self, seat_ids: Iterable[int], status: SeatStatus) -> None:
+        with self._lock:
+            for seat_id in seat_ids:
+                self._pending[seat_id] = status
+        try:
+            # push ถูกเรียกได้จากทุก thread (เช่น HoldReaper) — ปลุก consumer ผ่าน loop ของมัน
+            self.loop.call_soon_threadsafe(self.event.set)
+        except RuntimeError:
+            pass
+
+    async def next(self) -> Dict[int, SeatStatus]:
+        await self.event.wait()
+        self.event.clear()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+
+class SeatEventBus:
+    """ส่งการเปลี่ยนสถานะที่นั่งที่ commit แล้วให้ subscriber ของ (concert_id, zone_id) ทั้งใน process และผ่าน broker"""
+
+    def __init__(self, broker=None):
+        self.broker = broker or InProcessBroker()
+        self.origin = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._subscribers: Dict[Tuple[int, int], Set[_Subscriber]] = {}
+        self._seat_topics: Dict[int, Tuple[int, int]] = {}
+
+    def start(self) -> None:
+        self.broker.start(self._receive)
+
+    def stop(self) -> None:
+        self.broker.stop()
+
+    def publish(self, seat_ids: List[int], status: SeatStatus) -> None:
+        self._dispatch(seat_ids, status)
+        self.broker.publish({"origin": self.origin, "seat_ids": list(seat_ids), "status": status.name})
+
+    def _receive(self, message: dict) -> None:
+        if message.get("origin") == self.origin:
+            return
+        status = SeatStatus[message["status"]]
+        seat_index.mark(message["seat_ids"], status)
+        self._dispatch(message["seat_ids"], status)
+
+    def _dispatch(self, seat_ids: Iterable[int], status: SeatStatus) -> None:
+        by_topic: Dict[Tuple[int, int], List[int]] = {}
+        with self._lock:
+            for seat_id in seat_ids:
+                topic = self._seat_topics.get(seat_id)
+                if topic is not None:
+                    by_topic.setdefault(topic, []).append(seat_id)
+            targets = [(list(self._subscribers.get(topic, ())), ids) for topic, ids in by_topic.items()]
+        for subscribers, ids in targets:
+            for subscriber in subscribers:
+                subscriber.push(ids, status)
+
+    async def subscribe(self, concert_id: int, zone_id: int) -> AsyncIterator[Tuple[bool, List[dict]]]:
+        """
+        yield (True, seat map ทั้งโซน) ครั้งแรก แล้วตามด้วย (False, ที่นั่งที่เปลี่ยน) ทุกครั้งที่มีการเปลี่ยนแปลง
+        """
+        zones = await AsyncZoneGateway.get_zones_by_ids([zone_id])
+        if not zones or zones[0]["concert_id"] != concert_id:
+            raise ValueError("ไม่พบโซนนี้ในคอนเสิร์ต")
+        zone_name = zones[0]["zone_name"]
+        topic = (concert_id, zone_id)
+
+        seats = await seat_index.aget_seats(concert_id, zone_name)
+        subscriber = _Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(topic, set()).add(subscriber)
+            for seat in seats:
+                self._seat_topics[seat["seat_id"]] = topic
+        try:
+            # อ่าน seat map อีกครั้งหลังลงทะเบียน — การเปลี่ยนแปลงก่อนหน้านี้อยู่ใน snapshot ที่เหลือมาเป็น delta
+            seats = await seat_index.aget_seats(concert_id, zone_name)
+            yield True, seats
+            by_id = {seat["seat_id"]: seat for seat in seats}
+            while True:
+                changes = await subscriber.next()
+                yield False, [
+                    dict(by_id[seat_id], seat_status=status)
+                    for seat_id, status in changes.items() if seat_id in by_id
+                ]
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(topic)
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[topic]
+                    for seat in seats:
+                        self._seat_topics.pop(seat["seat_id"], None)
+
+
+def _broker_from_config():
+    if BROKER == "redis":
+        return RedisBroker(redis_client(REDIS_URL, "SeatEvents broker"),
+                           redis_client(REDIS_URL, "SeatEvents broker", use_asyncio=True))
+    return InProcessBroker()
+
+
+seat_events = SeatEventBus(_broker_from_config())
+seat_change_listeners.append(seat_events.publish)
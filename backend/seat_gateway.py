@@ -1,75 +1,77 @@
-from sqlalchemy.orm import Session
-from graphql_app.database import SessionLocal
-from graphql_app.model import Seat, Concert, Zone
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from graphql_app.database import AsyncSessionLocal
+from graphql_app.model import Seat, Zone, SeatStatus, BookingSeat
 from typing import Optional, List
+from seat_index import seat_index, record_seat_change
+from hold_gateway import HOLD_TTL_SECONDS
 
-class SeatGateway:
-    @classmethod
-    def get_seats_by_concert(cls, concert_id: int) -> List[Seat]:
-        
-        with SessionLocal() as db:
-            return db.query(Seat).filter(Seat.concert_id == concert_id).all()
+def _seats_by_bookings_stmt(booking_ids: List[int]):
+    return (
+        select(BookingSeat.booking_id, Seat.seat_id, Seat.concert_id, Seat.zone_id, Zone.zone_name, Seat.seat_number, Seat.seat_status)
+        .join(Seat, BookingSeat.seat_id == Seat.seat_id)
+        .join(Zone, Seat.zone_id == Zone.zone_id)
+        .where(BookingSeat.booking_id.in_(booking_ids))
+        .order_by(Seat.seat_id)
+    )
 
-    @classmethod
-    def get_seat_status(cls, seat_id: int) -> Optional[str]:
-        
-        with SessionLocal() as db:
-            seat = db.query(Seat).filter(Seat.seat_id == seat_id).first()
-            return seat.status if seat else None
 
+class AsyncSeatGateway:
     @classmethod
-    def update_seat_status(cls, seat_id: int, new_status: str) -> Optional[Seat]:
-       
-        with SessionLocal() as db:
-            seat = db.query(Seat).filter(Seat.seat_id == seat_id).first()
-            if seat:
-                seat.status = new_status
-                db.commit()
-                return seat
-        return None
-    
+    async def get_seats_by_concert_zone(cls, concert_id: int, zone_name: str) -> List[dict]:
+        return await seat_index.aget_seats(concert_id, zone_name)
+
     @classmethod
-    def get_seats_by_concert_zone(cls, concert_id: int, zone_name: str) -> List[dict]:
-       
-        with SessionLocal() as db:
-            seats = (
-                db.query(Seat)
-                .join(Concert, Seat.concert_id == Concert.concert_id)
+    async def get_seats_by_ids(cls, seat_ids: List[int]) -> List[dict]:
+        """ใช้โดย DataLoader — ดึงหลายที่นั่งพร้อมชื่อโซนด้วย IN (...) ครั้งเดียว"""
+        async with AsyncSessionLocal() as db:
+            seats = (await db.execute(
+                select(Seat.seat_id, Seat.concert_id, Seat.zone_id, Zone.zone_name, Seat.seat_number, Seat.seat_status)
                 .join(Zone, Seat.zone_id == Zone.zone_id)
-                .filter(
-                    Concert.concert_id == concert_id,
-                    Zone.zone_name == zone_name
-                )
-                .all()
-            )
-            return [
-                {
-                    "seat_id": s.seat_id,
-                    "concert_id": concert_id,
-                    "zone_name": zone_name,
-                    "seat_number": s.seat_number,
-                    "seat_status": s.seat_status
-                }
-                for s in seats
-            ]
+                .where(Seat.seat_id.in_(seat_ids))
+            )).all()
+            return [_seat_dict(s) for s in seats]
 
     @classmethod
-    def update_seat_status(cls, concert_name: str, zone_name: str, seat_number: str, new_status: str) -> Optional[Seat]:
-        
-        with SessionLocal() as db:
-            seat = (
-                db.query(Seat)
-                .join(Concert, Seat.concert_id == Concert.concert_id)
-                .join(Zone, Seat.zone_id == Zone.zone_id)
-                .filter(
-                    Concert.concert_name == concert_name,
-                    Zone.zone_name == zone_name,
-                    Seat.seat_number == seat_number
-                )
-                .first()
-            )
-            if seat:
-                seat.status = new_status
-                db.commit()
-                return seat
-        return None
\ No newline at end of file
+    async def get_seats_by_bookings(cls, booking_ids: List[int]) -> List[dict]:
+        """ใช้โดย DataLoader — ที่นั่งของหลาย booking ใน query เดียว (มี booking_id ในแต่ละแถว)"""
+        async with AsyncSessionLocal() as db:
+            seats = (await db.execute(_seats_by_bookings_stmt(booking_ids))).all()
+            return [dict(_seat_dict(s), booking_id=s.booking_id) for s in seats]
+
+    @classmethod
+    async def update_seat_status(cls, seat_id: int, new_status: str) -> Optional[dict]:
+        """เปลี่ยนสถานะที่นั่งด้วยมือ — held ได้ held_until ใหม่ให้ reaper ปล่อยเอง สถานะอื่นล้างการถือเดิมออก"""
+        if new_status not in SeatStatus.__members__:
+            raise ValueError(f"สถานะ {new_status} ไม่ถูกต้อง")
+        status = SeatStatus[new_status]
+
+        async with AsyncSessionLocal() as db:
+            seat = await db.get(Seat, seat_id, with_for_update=True)
+            if not seat:
+                return None
+
+            zone = await db.get(Zone, seat.zone_id)
+            seat.seat_status = status
+            seat.held_by_booking_id = None
+            seat.held_until = datetime.now() + timedelta(seconds=HOLD_TTL_SECONDS) if status == SeatStatus.held else None
+            record_seat_change(db, [seat_id], seat.seat_status)
+            await db.commit()
+            return {
+                "seat_id": seat.seat_id,
+                "concert_id": seat.concert_id,
+                "zone_name": zone.zone_name if zone else None,
+                "seat_number": seat.seat_number,
+                "seat_status": seat.seat_status
+            }
+
+
+def _seat_dict(s) -> dict:
+    return {
+        "seat_id": s.seat_id,
+        "concert_id": s.concert_id,
+        "zone_id": s.zone_id,
+        "zone_name": s.zone_name,
+        "seat_number": s.seat_number,
+        "seat_status": s.seat_status
+    }
@@ -0,0 +1,203 @@
+import asyncio
+import threading
+import time
+from array import array
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from graphql_app.database import AsyncSessionLocal, replica_reads
+from graphql_app.model import Seat, Zone, SeatStatus
+from config.config import Config
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+seat_index_config = Config("config/config.ini").load_seat_index_config()
+
+REFRESH_SECONDS = float(seat_index_config.get('refresh_seconds', 30))
+
+_STATUSES = list(SeatStatus)
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+
+
+class ZoneSeatMap:
+    """สถานะที่นั่งของหนึ่งโซน เรียงตาม seat_id — ลำดับของที่นั่งคือตำแหน่งใน status array"""
+
+    __slots__ = ("zone_id", "concert_id", "zone_name", "seat_ids", "seat_numbers",
+                 "ordinals", "status", "version", "loaded_at", "_snapshot", "_snapshot_version")
+
+    def __init__(self, zone_id: int, concert_id: int, zone_name: str,
+                 rows: List[Tuple[int, str, SeatStatus]], loaded_at: float):
+        self.zone_id = zone_id
+        self.concert_id = concert_id
+        self.zone_name = zone_name
+        self.seat_ids = array('i', (r[0] for r in rows))
+        self.seat_numbers = tuple(r[1] for r in rows)
+        self.ordinals = {seat_id: i for i, seat_id in enumerate(self.seat_ids)}
+        self.status = bytearray(_STATUS_CODES[r[2] or SeatStatus.available] for r in rows)
+        self.version = 0
+        self.loaded_at = loaded_at
+        self._snapshot: Optional[List[dict]] = None
+        self._snapshot_version = -1
+
+    def set_status(self, seat_id: int, status: SeatStatus) -> None:
+        ordinal = self.ordinals.get(seat_id)
+        if ordinal is not None:
+            self.status[ordinal] = _STATUS_CODES[status]
+            self.version += 1
+
+    def snapshot(self) -> List[dict]:
+        """seat map ในรูปแบบเดียวกับ SeatGateway — สร้างใหม่เฉพาะเมื่อสถานะเปลี่ยน"""
+        if self._snapshot_version != self.version:
+            version = self.version
+            self._snapshot = [
+                {
+                    "seat_id": seat_id,
+                    "concert_id": self.concert_id,
+                    "zone_name": self.zone_name,
+                    "seat_number": seat_number,
+                    "seat_status": _STATUSES[code]
+                }
+                for seat_id, seat_number, code in zip(self.seat_ids, self.seat_numbers, self.status)
+            ]
+            self._snapshot_version = version
+        return self._snapshot
+
+
+class SeatAvailabilityIndex:
+    """สถานะที่นั่งทั้ง process — โหลดทีละโซน อัปเดตจากการเปลี่ยนที่ commit แล้ว และโหลดใหม่ทุก refresh_seconds"""
+
+    def __init__(self, refresh_seconds: float = REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._zones: Dict[int, ZoneSeatMap] = {}
+        self._zone_keys: Dict[Tuple[int, str], int] = {}
+        self._seat_zones: Dict[int, int] = {}
+        # โซนที่กำลังโหลด → การเปลี่ยนสถานะที่เกิดระหว่างโหลด (None = ถูก invalidate ระหว่างโหลด)
+        self._loading: Dict[Tuple[int, str], Optional[List[Tuple[List[int], SeatStatus]]]] = {}
+        self._inflight: Dict[Tuple[int, str], asyncio.Future] = {}
+
+    def mark(self, seat_ids: Iterable[int], status: SeatStatus) -> None:
+        seat_ids = list(seat_ids)
+        with self._lock:
+            # ยังไม่รู้ว่าที่นั่งอยู่โซนไหนจนกว่าจะโหลดเสร็จ — เก็บไว้ให้ทุกโซนที่กำลังโหลดนำไปใช้ซ้ำ
+            for changes in self._loading.values():
+                if changes is not None:
+                    changes.append((seat_ids, status))
+            for seat_id in seat_ids:
+                zone = self._zones.get(self._seat_zones.get(seat_id))
+                if zone:
+                    zone.set_status(seat_id, status)
+
+    def invalidate(self, zone_id: Optional[int] = None) -> None:
+        with self._lock:
+            for key in self._loading:
+                if zone_id is None or self._zone_keys.get(key) == zone_id:
+                    self._loading[key] = None
+            if zone_id is None:
+                self._zones.clear()
+                self._zone_keys.clear()
+                self._seat_zones.clear()
+            elif zone_id in self._zones:
+                self._zones[zone_id].loaded_at = 0
+
+    async def aget_seats(self, concert_id: int, zone_name: str) -> List[dict]:
+        """seat map ของโซน — โหลดจากฐานข้อมูลเฉพาะครั้งแรกและเมื่อครบ refresh_seconds"""
+        key = (concert_id, zone_name)
+        zone = self._zones.get(self._zone_keys.get(key))
+        if not zone or time.monotonic() - zone.loaded_at >= self.refresh_seconds:
+            zone = await self._areload(key, zone)
+        return zone.snapshot() if zone else []
+
+    async def _areload(self, key: Tuple[int, str], stale: Optional[ZoneSeatMap]) -> Optional[ZoneSeatMap]:
+        # โหลดโซนละครั้งเดียว — ระหว่างนั้นคำขออื่นใช้ seat map เดิม (ซึ่ง mark() ยังอัปเดตอยู่) หรือรอผลเดียวกัน
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return stale if stale is not None else await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            zone = await self._aload_zone(*key)
+            future.set_result(zone)
+            return zone
+        except BaseException as e:
+            future.set_exception(e)
+            # ไม่มีใครรอ future นี้ก็ไม่ต้องเตือน "exception was never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _aload_zone(self, concert_id: int, zone_name: str) -> Optional[ZoneSeatMap]:
+        key, loaded_at = (concert_id, zone_name), time.monotonic()
+        with self._lock:
+            self._loading[key] = []
+        try:
+            # โหลดจาก primary — seat map ที่ replica ยังตามไม่ทันจะแสดงที่นั่งที่ถูกจองไปแล้วว่าว่างจนกว่าจะ refresh
+            with replica_reads(False):
+                async with AsyncSessionLocal() as db:
+                    zone_id = (await db.execute(_zone_id_query(concert_id, zone_name))).scalar()
+                    if zone_id is None:
+                        return None
+                    rows = (await db.execute(_zone_seats_query(concert_id, zone_id))).all()
+            return self._store_zone(ZoneSeatMap(zone_id, concert_id, zone_name, rows, loaded_at))
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+
+    def _store_zone(self, zone: ZoneSeatMap) -> ZoneSeatMap:
+        with self._lock:
+            changes = self._loading.pop((zone.concert_id, zone.zone_name), [])
+            if changes is None:
+                # ถูก invalidate ระหว่างโหลด — ใช้ผลนี้ไปก่อน แต่ให้โหลดใหม่ในครั้งถัดไป
+                zone.loaded_at = 0
+            else:
+                # การเปลี่ยนที่ commit ระหว่างโหลดอาจมาไม่ทันแถวที่อ่านได้ — ใช้ซ้ำตามลำดับ (ซ้ำกับที่อ่านมาแล้วก็ได้ผลเดิม)
+                for seat_ids, status in changes:
+                    for seat_id in seat_ids:
+                        zone.set_status(seat_id, status)
+            self._zones[zone.zone_id] = zone
+            self._zone_keys[(zone.concert_id, zone.zone_name)] = zone.zone_id
+            for seat_id in zone.seat_ids:
+                self._seat_zones[seat_id] = zone.zone_id
+        return zone
+
+
+def _zone_id_query(concert_id: int, zone_name: str):
+    return select(Zone.zone_id).where(Zone.concert_id == concert_id, Zone.zone_name == zone_name)
+
+
+def _zone_seats_query(concert_id: int, zone_id: int):
+    return (
+        select(Seat.seat_id, Seat.seat_number, Seat.seat_status)
+        .where(Seat.concert_id == concert_id, Seat.zone_id == zone_id)
+        .order_by(Seat.seat_id)
+    )
+
+
+seat_index = SeatAvailabilityIndex()
+
+# เรียกหลัง commit ทุกครั้งที่สถานะที่นั่งเปลี่ยน ด้วย (seat_ids, status) — เช่น seat_events
+seat_change_listeners: List[Callable[[List[int], SeatStatus], None]] = []
+
+
+def record_seat_change(db: Union[Session, AsyncSession], seat_ids: Iterable[int], status: SeatStatus) -> None:
+    """จดการเปลี่ยนสถานะที่นั่งไว้กับ session แล้วค่อยอัปเดต index หลัง commit สำเร็จ"""
+    db.info.setdefault("seat_changes", []).append((list(seat_ids), status))
+
+
+# ฟังที่ระดับ Session class เพื่อให้ครอบคลุมทั้ง SessionLocal และ AsyncSessionLocal
+@event.listens_for(Session, "after_commit")
+def _apply_seat_changes(db: Session):
+    for seat_ids, status in db.info.pop("seat_changes", []):
+        seat_index.mark(seat_ids, status)
+        for listener in seat_change_listeners:
+            try:
+                listener(seat_ids, status)
+            except Exception as e:
+                # commit สำเร็จไปแล้ว — listener ที่พังต้องไม่ทำให้ผู้เรียกเห็นเป็น error
+                print(f"❌ Error in seat change listener: {str(e)}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_seat_changes(db: Session):
+    db.info.pop("seat_changes", None)
@@ -0,0 +1,123 @@
+import base64
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from config.config import Config
+from redis_client import redis_client
+from typing import Dict, Optional, Tuple
+
+session_config = Config("config/config.ini").load_session_config()
+
+TTL_SECONDS = int(session_config.get('ttl_seconds', 86400))
+# ไม่ได้ตั้ง secret — ใช้ค่าสุ่มต่อ process (ทุกคนต้อง login ใหม่หลัง restart lifecycle.config_errors จึงไม่ยอมเมื่อมีหลาย worker)
+SECRET = session_config.get('secret', '').encode() or secrets.token_bytes(32)
+STORE = session_config.get('store', 'memory').strip().lower()
+REDIS_URL = session_config.get('redis_url', 'redis://localhost:6379/0')
+
+
+class MemoryRevocationStore:
+    """token ที่ logout แล้วของ process นี้ — เก็บไว้แค่จนกว่า token นั้นจะหมดอายุเอง"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revoked: Dict[str, int] = {}
+        self._next_prune = 0.0
+
+    async def revoke(self, jti: str, expires_at: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._revoked[jti] = expires_at
+            if now >= self._next_prune:
+                self._revoked = {k: v for k, v in self._revoked.items() if v > now}
+                self._next_prune = now + 60
+
+    async def is_revoked(self, jti: str) -> bool:
+        return jti in self._revoked
+
+
+class RedisRevocationStore:
+    """token ที่ logout แล้ว แชร์ทุก process"""
+
+    def __init__(self, client, prefix: str = "harmoniq:revoked-session:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def revoke(self, jti: str, expires_at: int) -> None:
+        await self.client.set(f"{self.prefix}{jti}", 1, ex=max(1, expires_at - int(time.time())))
+
+    async def is_revoked(self, jti: str) -> bool:
+        return bool(await self.client.exists(f"{self.prefix}{jti}"))
+
+
+class SessionTokens:
+    """session token ที่ลงลายเซ็นและหมดอายุ "session:<user_id>:<expires_at>:<jti>.<sig>" — verify ไม่ต้องอ่านตาราง users"""
+
+    def __init__(self, store=None, secret: bytes = SECRET, ttl_seconds: int = TTL_SECONDS):
+        self.store = store or MemoryRevocationStore()
+        self.secret = secret
+        self.ttl_seconds = ttl_seconds
+
+    def _sign(self, payload: str) -> str:
+        signature = hmac.new(self.secret, payload.encode(), hashlib.sha256).digest()[:16]
+        return f"{payload}.{base64.urlsafe_b64encode(signature).decode().rstrip('=')}"
+
+    def _parse(self, token: Optional[str]) -> Optional[Tuple[int, int, str]]:
+        if not token:
+            return None
+        payload, _, _ = token.rpartition(".")
+        # token ที่ออกให้เป็น ASCII เสมอ — compare_digest กับ str ที่ไม่ใช่ ASCII โยน TypeError
+        if not payload or not token.isascii() or not hmac.compare_digest(self._sign(payload), token):
+            return None
+        kind, user_id, expires_at, jti = payload.split(":")
+        if kind != "session":
+            return None
+        return int(user_id), int(expires_at), jti
+
+    def issue(self, user_id: int) -> Tuple[str, int]:
+        """คืน (token, เวลาหมดอายุเป็น unix timestamp)"""
+        expires_at = int(time.time()) + self.ttl_seconds
+        return self._sign(f"session:{user_id}:{expires_at}:{secrets.token_urlsafe(9)}"), expires_at
+
+    async def verify(self, token: Optional[str]) -> Optional[int]:
+        """user_id ของ token หรือ None ถ้า token ไม่ถูกต้อง หมดอายุ หรือ logout ไปแล้ว"""
+        parsed = self._parse(token)
+        if parsed is None:
+            return None
+        user_id, expires_at, jti = parsed
+        if expires_at < time.time() or await self.store.is_revoked(jti):
+            return None
+        return user_id
+
+    async def revoke(self, token: Optional[str]) -> bool:
+        parsed = self._parse(token)
+        if parsed is None:
+            return False
+        _, expires_at, jti = parsed
+        if expires_at >= time.time():
+            await self.store.revoke(jti, expires_at)
+        return True
+
+
+def bearer_token(authorization: Optional[str]) -> Optional[str]:
+    if authorization and authorization[:7].lower() == "bearer ":
+        return authorization[7:].strip()
+    return None
+
+
+async def user_from_scope(scope) -> Optional[int]:
+    """user_id จาก Authorization header ของ ASGI scope — ใช้กับ middleware ที่อยู่ก่อน GraphQL"""
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            return await session_tokens.verify(bearer_token(value.decode("latin-1")))
+    return None
+
+
+def _store_from_config():
+    if STORE == "redis":
+        return RedisRevocationStore(redis_client(REDIS_URL, "Session store", use_asyncio=True))
+    return MemoryRevocationStore()
+
+
+session_tokens = SessionTokens(_store_from_config())
@@ -0,0 +1,153 @@
+# การถือที่นั่ง การยืนยัน และการปล่อยที่นั่งของ booking — ใช้ sqlite ชั่วคราวแทน MySQL
+#   python -m pytest test_hold_gateway.py   (รันจากโฟลเดอร์ backend)
+# ข้ามทั้งไฟล์เมื่อไม่มี aiosqlite — sqlite ไม่มี SELECT ... FOR UPDATE จึงทดสอบได้เฉพาะการแย่งที่นั่งตอน claim
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+from graphql_app import database
+from graphql_app.model import Base, Booking, BookingStatus, Concert, Seat, SeatStatus, Ticket, User, Zone
+import booking_gateway
+from booking_gateway import AsyncBookingGateway
+from hold_gateway import HoldGateway, HoldExpiredError, SeatConflictError
+from ticket_code import TicketCodeGenerator
+
+pytest.importorskip("aiosqlite")
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture(autouse=True)
+def db(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'holds.db'}"
+    engine = create_engine(url)
+    async_engine = create_async_engine(url.replace("sqlite:", "sqlite+aiosqlite:"))
+    binds = database.SessionLocal.kw["bind"], database.AsyncSessionLocal.kw["bind"]
+    database.SessionLocal.configure(bind=engine)
+    database.AsyncSessionLocal.configure(bind=async_engine)
+    # จอง block ไว้ก่อน — sqlite เขียนได้ทีละ transaction จึงจอง block ใหม่ระหว่าง confirm_payment ไม่ได้
+    codes = TicketCodeGenerator(0x5F3A17C2)
+    codes.add_block(1)
+    monkeypatch.setattr(booking_gateway, "ticket_codes", codes)
+
+    Base.metadata.create_all(engine)
+    with database.SessionLocal() as session:
+        session.add(User(id=1, display_name="u", username="u@harmoniq.test", password="x"))
+        session.add(Concert(concert_id=1, concert_name="C1", band_name="B", concert_type="rock"))
+        session.add(Zone(zone_id=1, concert_id=1, zone_name="A1", price=3000))
+        session.add_all(Seat(seat_id=i, concert_id=1, zone_id=1, seat_number=f"A{i}") for i in range(1, 11))
+        session.commit()
+    yield
+    database.SessionLocal.configure(bind=binds[0])
+    database.AsyncSessionLocal.configure(bind=binds[1])
+    run(async_engine.dispose())
+    engine.dispose()
+
+
+def book(*seat_ids: int) -> dict:
+    return run(AsyncBookingGateway.create_booking(1, 1, 1, list(seat_ids)))
+
+
+def seat_statuses(*seat_ids: int) -> list:
+    with database.SessionLocal() as session:
+        rows = session.execute(select(Seat.seat_status).where(Seat.seat_id.in_(seat_ids)).order_by(Seat.seat_id))
+        return list(rows.scalars())
+
+
+def booking_status(booking_id: int):
+    with database.SessionLocal() as session:
+        return session.execute(select(Booking.booking_status).where(Booking.booking_id == booking_id)).scalar()
+
+
+def expire_hold(booking_id: int) -> None:
+    with database.SessionLocal() as session:
+        session.execute(update(Seat).where(Seat.held_by_booking_id == booking_id)
+                        .values(held_until=datetime.now() - timedelta(seconds=1)))
+        session.commit()
+
+
+def test_claim_holds_every_seat_or_none():
+    booking = book(1, 2)
+    assert booking["booking_status"] == BookingStatus.pending
+    assert seat_statuses(1, 2) == [SeatStatus.held, SeatStatus.held]
+
+    with pytest.raises(SeatConflictError) as conflict:
+        book(2, 3)
+    assert conflict.value.seat_numbers == ["A2"]
+    # ที่นั่งที่ว่างใน booking ที่ชนต้องไม่ถูกถือค้างไว้
+    assert seat_statuses(3) == [SeatStatus.available]
+
+
+def test_only_one_of_concurrent_claims_wins():
+    async def race():
+        return await asyncio.gather(*(AsyncBookingGateway.create_booking(1, 1, 1, [5]) for _ in range(5)),
+                                    return_exceptions=True)
+
+    results = run(race())
+    assert sum(isinstance(r, dict) for r in results) == 1
+    assert all(isinstance(r, SeatConflictError) for r in results if not isinstance(r, dict))
+    assert seat_statuses(5) == [SeatStatus.held]
+
+
+def test_confirm_issues_tickets_once():
+    booking = book(1, 2)
+    tickets = run(AsyncBookingGateway.confirm_payment(booking["booking_id"]))
+    assert len(tickets) == 2 and len({t["ticket_code"] for t in tickets}) == 2
+    assert seat_statuses(1, 2) == [SeatStatus.booked, SeatStatus.booked]
+    assert booking_status(booking["booking_id"]) == BookingStatus.confirmed
+
+    assert run(AsyncBookingGateway.confirm_payment(booking["booking_id"])) == []
+    with database.SessionLocal() as session:
+        assert len(session.execute(select(Ticket.ticket_id)).all()) == 2
+
+
+def test_expired_hold_can_be_claimed_by_someone_else():
+    first = book(3)
+    expire_hold(first["booking_id"])
+    second = book(3)
+    with pytest.raises(HoldExpiredError):
+        run(AsyncBookingGateway.confirm_payment(first["booking_id"]))
+    assert len(run(AsyncBookingGateway.confirm_payment(second["booking_id"]))) == 1
+
+
+def test_cancel_releases_seats_and_deletes_the_booking():
+    booking = book(1, 2)
+    assert run(AsyncBookingGateway.update_booking_status(booking["booking_id"], "cancelled")) is None
+    assert seat_statuses(1, 2) == [SeatStatus.available, SeatStatus.available]
+    assert booking_status(booking["booking_id"]) is None
+    assert book(1, 2)["seat_count"] == 2
+
+
+def test_only_pending_bookings_can_be_cancelled():
+    booking = book(4)
+    for status in ("confirmed", "pending", "refunded"):
+        with pytest.raises(ValueError):
+            run(AsyncBookingGateway.update_booking_status(booking["booking_id"], status))
+    assert booking_status(booking["booking_id"]) == BookingStatus.pending
+
+    run(AsyncBookingGateway.confirm_payment(booking["booking_id"]))
+    with pytest.raises(ValueError):
+        run(AsyncBookingGateway.update_booking_status(booking["booking_id"], "cancelled"))
+    assert seat_statuses(4) == [SeatStatus.booked]
+
+
+def test_reaper_releases_expired_holds_and_cancels_the_booking():
+    booking = book(6, 7)
+    held = book(8)
+    expire_hold(booking["booking_id"])
+    with database.SessionLocal() as session:
+        session.execute(update(Booking).where(Booking.booking_id == booking["booking_id"])
+                        .values(expires_at=datetime.now() - timedelta(seconds=1)))
+        session.commit()
+
+    assert HoldGateway.release_expired() == 2
+    assert seat_statuses(6, 7, 8) == [SeatStatus.available, SeatStatus.available, SeatStatus.held]
+    assert booking_status(booking["booking_id"]) == BookingStatus.cancelled
+    assert booking_status(held["booking_id"]) == BookingStatus.pending
+    # booking ที่ถูกยกเลิกแล้วชำระเงินไม่ได้ แต่ผู้ใช้ยังลบทิ้งได้
+    assert run(AsyncBookingGateway.confirm_payment(booking["booking_id"])) == []
+    run(AsyncBookingGateway.update_booking_status(booking["booking_id"], "cancelled"))
+    assert booking_status(booking["booking_id"]) is None
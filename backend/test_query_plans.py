@@ -0,0 +1,27 @@
+# query ที่ถูกเรียกบ่อยต้องไม่ scan ทั้งตาราง — plan ชุดเดียวกับ python -m bench.query_plans
+#   python -m pytest test_query_plans.py   (รันจากโฟลเดอร์ backend)
+# ใช้ฐานข้อมูลใน [Database] และข้ามทั้งไฟล์เมื่อต่อ MySQL ไม่ได้
+# ควรรันกับข้อมูลขนาดใกล้ของจริง: ตารางเล็กๆ MySQL อาจเลือก full scan เพราะถูกกว่าใช้ index
+import pytest
+from sqlalchemy import text
+from graphql_app.database import SessionLocal
+from bench.query_plans import hot_queries, explain
+
+
+@pytest.fixture(scope="module")
+def db():
+    session = SessionLocal()
+    try:
+        session.execute(text("SELECT 1"))
+    except Exception as e:
+        session.close()
+        pytest.skip(f"MySQL is not available: {e}")
+    yield session
+    session.close()
+
+
+@pytest.mark.parametrize("name", list(hot_queries()))
+def test_hot_query_uses_an_index(db, name):
+    lines, full_scans = explain(db, hot_queries()[name])
+    db.rollback()
+    assert not full_scans, f"{name}: full scan on {', '.join(full_scans)}\n" + "\n".join(lines)
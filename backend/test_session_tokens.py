@@ -0,0 +1,65 @@
+# session token — ลายเซ็น, วันหมดอายุ และการ logout
+#   python -m pytest test_session_tokens.py   (รันจากโฟลเดอร์ backend)
+import asyncio
+import time
+from session_tokens import SessionTokens, MemoryRevocationStore, bearer_token
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def tokens(**kwargs) -> SessionTokens:
+    options = dict(secret=b"test-secret", ttl_seconds=3600)
+    options.update(kwargs)
+    return SessionTokens(MemoryRevocationStore(), **options)
+
+
+def test_issued_token_verifies_to_its_user():
+    t = tokens()
+    token, expires_at = t.issue(42)
+    assert run(t.verify(token)) == 42
+    assert expires_at >= time.time() + 3599
+
+
+def test_tampered_or_foreign_tokens_are_rejected():
+    t = tokens()
+    token, _ = t.issue(42)
+    payload, _, signature = token.rpartition(".")
+    assert run(t.verify(payload.replace(":42:", ":43:") + "." + signature)) is None
+    assert run(t.verify(token[:-1])) is None
+    assert run(tokens(secret=b"other-secret").verify(token)) is None
+    for bad in (None, "", "garbage", ".", "session:1:2:3"):
+        assert run(t.verify(bad)) is None
+
+
+def test_non_ascii_token_is_rejected_not_an_error():
+    t = tokens()
+    assert run(t.verify("é")) is None
+    assert run(t.verify("session:1:2:é.é")) is None
+    assert run(t.verify("\ud800")) is None
+    assert run(t.revoke("é")) is False
+
+
+def test_expired_token_is_rejected():
+    t = tokens(ttl_seconds=-1)
+    token, _ = t.issue(42)
+    assert run(t.verify(token)) is None
+
+
+def test_revoked_token_stops_verifying():
+    t = tokens()
+    token, _ = t.issue(42)
+    other, _ = t.issue(42)
+    assert run(t.revoke(token)) is True
+    assert run(t.verify(token)) is None
+    # logout ครั้งหนึ่งไม่กระทบ session อื่นของผู้ใช้เดียวกัน
+    assert run(t.verify(other)) == 42
+    assert run(t.revoke("garbage")) is False
+
+
+def test_bearer_token():
+    assert bearer_token("Bearer abc ") == "abc"
+    assert bearer_token("bearer abc") == "abc"
+    assert bearer_token("Basic abc") is None
+    assert bearer_token(None) is None
@@ -0,0 +1,76 @@
+# ticket code — ไม่ซ้ำ, ถอดกลับเป็น counter ได้ และ check symbol จับการพิมพ์ผิด
+#   python -m pytest test_ticket_code.py   (รันจากโฟลเดอร์ backend)
+import asyncio
+import pytest
+import ticket_code
+from ticket_code import TicketCodeGenerator, BLOCK_SIZE, CODE_LENGTH, ALPHABET, is_valid_code
+
+
+def generator(*block_ids: int) -> TicketCodeGenerator:
+    g = TicketCodeGenerator(0x5F3A17C2)
+    for block_id in block_ids:
+        g.add_block(block_id)
+    return g
+
+
+def test_codes_decode_back_to_their_counter():
+    g = generator()
+    start = 3 * BLOCK_SIZE
+    codes = g.encode_range(start, 1000)
+    assert all(len(code) == CODE_LENGTH and is_valid_code(code) for code in codes)
+    assert [g.decode(code) for code in codes] == list(range(start, start + 1000))
+
+
+def test_codes_are_unique_across_blocks():
+    g = generator(1, 2)
+    codes = g.encode_range(BLOCK_SIZE - 500, 1000)
+    assert len(set(codes)) == 1000
+    # ช่วงของ block ติดกันไม่ทับกัน
+    assert g.generate(1) == g.encode_range(BLOCK_SIZE, 1)
+    assert g.generate(1) == g.encode_range(BLOCK_SIZE + 1, 1)
+
+
+def test_generate_allocates_a_block_when_the_range_runs_out(monkeypatch):
+    allocated = iter([7, 8])
+    monkeypatch.setattr(ticket_code, "allocate_block", lambda: next(allocated))
+    g = generator()
+    codes = g.generate(BLOCK_SIZE + 2)
+    assert len(set(codes)) == BLOCK_SIZE + 2
+    assert g.decode(codes[0]) == 7 * BLOCK_SIZE
+    assert g.decode(codes[-1]) == 8 * BLOCK_SIZE + 1
+
+
+def test_agenerate_allocates_a_block(monkeypatch):
+    async def aallocate_block():
+        return 4
+    monkeypatch.setattr(ticket_code, "aallocate_block", aallocate_block)
+    g = generator()
+    codes = asyncio.run(g.agenerate(3))
+    assert [g.decode(code) for code in codes] == [4 * BLOCK_SIZE, 4 * BLOCK_SIZE + 1, 4 * BLOCK_SIZE + 2]
+
+
+def test_check_symbol_catches_typos():
+    code = generator().encode_range(42, 1)[0]
+    assert is_valid_code(code.lower())
+    assert is_valid_code(f"{code[:5]}-{code[5:]}")
+    for i in range(CODE_LENGTH - 1):
+        typo = code[:i] + next(c for c in ALPHABET if c != code[i]) + code[i + 1:]
+        assert not is_valid_code(typo)
+    assert not is_valid_code(code[:-1])
+    assert not is_valid_code("é" * CODE_LENGTH)
+
+
+def test_different_secret_gives_different_codes():
+    assert generator().encode_range(0, 100) != TicketCodeGenerator(0x1234).encode_range(0, 100)
+
+
+def test_code_space_is_bounded():
+    with pytest.raises(ValueError):
+        generator((1 << 50) // BLOCK_SIZE)
+
+
+def test_missing_secret_refuses_to_issue():
+    g = TicketCodeGenerator(None)
+    g.add_block(1)
+    with pytest.raises(RuntimeError):
+        g.generate(1)
@@ -0,0 +1,85 @@
+# ห้องรอหน้า createBooking — คิว, admission token และการใช้ token จองได้ครั้งเดียว
+#   python -m pytest test_waiting_room.py   (รันจากโฟลเดอร์ backend)
+import asyncio
+import time
+import pytest
+from waiting_room import WaitingRoom, MemoryAdmissionStore, AdmissionRequiredError, _sign
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def room(**kwargs) -> WaitingRoom:
+    options = dict(enabled=True, rate=1000, burst=2, pass_ttl_seconds=600, queue_ttl_seconds=3600, concert_rates={})
+    options.update(kwargs)
+    return WaitingRoom(MemoryAdmissionStore(), **options)
+
+
+def test_burst_is_admitted_and_the_rest_wait():
+    w = room(rate=0.001)
+    statuses = [run(w.join(1, user_id)) for user_id in range(1, 6)]
+    # คนแรกเข้าได้พร้อม burst คนถัดไป
+    assert [s["admitted"] for s in statuses] == [True, True, True, False, False]
+    assert [s["position"] for s in statuses] == [0, 0, 0, 1, 2]
+    assert statuses[3]["admission_token"] is None
+
+
+def test_polling_returns_the_same_pass():
+    w = room()
+    joined = run(w.join(1, 7))
+    tokens = {run(w.status(joined["queue_token"]))["admission_token"] for _ in range(5)}
+    assert tokens == {joined["admission_token"]}
+
+
+def test_a_pass_books_once():
+    w = room()
+    queue_token = run(w.join(1, 7))["queue_token"]
+    token = run(w.status(queue_token))["admission_token"]
+    assert run(w.claim(token, 1, 7)) is not None
+    with pytest.raises(AdmissionRequiredError):
+        run(w.claim(token, 1, 7))
+    # ถามสถานะซ้ำหลังจองแล้วก็ไม่ได้ pass ใหม่
+    again = run(w.status(queue_token))["admission_token"]
+    with pytest.raises(AdmissionRequiredError):
+        run(w.claim(again, 1, 7))
+
+
+def test_released_pass_can_book_again():
+    w = room()
+    token = run(w.join(1, 7))["admission_token"]
+    pass_id = run(w.claim(token, 1, 7))
+    run(w.release(pass_id))
+    assert run(w.claim(token, 1, 7)) == pass_id
+
+
+def test_pass_is_bound_to_concert_and_user():
+    w = room()
+    token = run(w.join(1, 7))["admission_token"]
+    with pytest.raises(AdmissionRequiredError):
+        run(w.claim(token, 2, 7))
+    with pytest.raises(AdmissionRequiredError):
+        run(w.claim(token, 1, 8))
+    with pytest.raises(AdmissionRequiredError):
+        run(w.claim(None, 1, 7))
+    with pytest.raises(AdmissionRequiredError):
+        run(w.claim(token + "x", 1, 7))
+    with pytest.raises(AdmissionRequiredError):
+        run(w.claim(token + "é", 1, 7))
+    with pytest.raises(ValueError):
+        run(w.status("queue:1:7:é.é"))
+
+
+def test_expired_tokens_are_rejected():
+    w = room()
+    expired = int(time.time()) - 1
+    with pytest.raises(ValueError):
+        run(w.status(_sign(f"queue:1:7:{expired}:1")))
+    with pytest.raises(AdmissionRequiredError):
+        run(w.claim(_sign(f"pass:1:7:{expired}:1-1"), 1, 7))
+
+
+def test_disabled_room_needs_no_token():
+    w = room(enabled=False)
+    assert run(w.claim(None, 1, 7)) is None
+    assert run(w.join(1, 7))["admitted"]
@@ -0,0 +1,167 @@
+import threading
+from collections import deque
+from graphql_app.database import SessionLocal, AsyncSessionLocal
+from graphql_app.model import TicketCodeBlock
+from config.config import Config
+from typing import Deque, List, Optional, Tuple
+
+ticket_code_config = Config("config/config.ini").load_ticket_code_config()
+
+_secret = ticket_code_config.get('secret', '').strip()
+SECRET: Optional[int] = int(_secret, 0) if _secret else None
+# block_id ของ ticket_code_blocks คูณด้วยค่านี้เป็นช่วงของ counter — ห้ามเปลี่ยนหลังออกตั๋วแล้ว ช่วงเก่ากับใหม่จะทับกันจน code ซ้ำ
+BLOCK_SIZE = 1 << 20
+
+# Crockford base32 — ไม่มี I, L, O, U ให้สับสนตอนอ่าน/พิมพ์
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+# Crockford check symbols (ค่า mod 37)
+CHECK_SYMBOLS = ALPHABET + "*~$=U"
+CODE_LENGTH = 11
+
+_BITS = 50
+_HALF_BITS = _BITS // 2
+_HALF_MASK = (1 << _HALF_BITS) - 1
+_MASK64 = (1 << 64) - 1
+_ROUNDS = 4
+
+_DECODE = {c: i for i, c in enumerate(ALPHABET)}
+_DECODE.update({"O": 0, "I": 1, "L": 1})
+# 10 บิต → 2 ตัวอักษร ใช้ lookup แทนการหารทีละหลัก
+_PAIRS = [ALPHABET[i >> 5] + ALPHABET[i & 31] for i in range(1024)]
+
+
+def _round_keys(secret: int) -> Tuple[int, ...]:
+    # splitmix64 — ขยาย secret เป็น key ของแต่ละรอบ
+    keys = []
+    x = secret & _MASK64
+    for _ in range(_ROUNDS):
+        x = (x + 0x9E3779B97F4A7C15) & _MASK64
+        z = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+        keys.append((z ^ (z >> 31)) & _HALF_MASK)
+    return tuple(keys)
+
+
+def _mix(r: int, k: int) -> int:
+    r = ((r ^ k) * 0x2C1B3C6D) & _HALF_MASK
+    return r ^ (r >> 12)
+
+
+class TicketCodeGenerator:
+    """ticket code ไม่ซ้ำโดยไม่ต้องถามฐานข้อมูลทุกใบ — counter จาก ticket_code_blocks ผ่าน Feistel 4 รอบ เขียนเป็น Crockford base32 + check symbol"""
+
+    def __init__(self, secret: Optional[int] = SECRET):
+        self._keys = _round_keys(secret) if secret is not None else None
+        self._lock = threading.Lock()
+        self._ranges: Deque[List[int]] = deque()
+
+    def generate(self, count: int) -> List[str]:
+        codes: List[str] = []
+        while len(codes) < count:
+            codes += self._take(count - len(codes))
+            if len(codes) < count:
+                self.add_block(allocate_block())
+        return codes
+
+    async def agenerate(self, count: int) -> List[str]:
+        codes: List[str] = []
+        while len(codes) < count:
+            codes += self._take(count - len(codes))
+            if len(codes) < count:
+                self.add_block(await aallocate_block())
+        return codes
+
+    def add_block(self, block_id: int) -> None:
+        start = block_id * BLOCK_SIZE
+        if start + BLOCK_SIZE > 1 << _BITS:
+            raise ValueError("ticket code space exhausted")
+        with self._lock:
+            self._ranges.append([start, start + BLOCK_SIZE])
+
+    def encode_range(self, start: int, count: int) -> List[str]:
+        k0, k1, k2, k3 = self._require_keys()
+        mask, half, pairs, checks = _HALF_MASK, _HALF_BITS, _PAIRS, CHECK_SYMBOLS
+        codes = []
+        append = codes.append
+        for n in range(start, start + count):
+            # Feistel 4 รอบแบบ inline (เท่ากับ _mix ทีละรอบ) — ส่วนนี้คือ hot loop
+            right = n & mask
+            t = ((right ^ k0) * 0x2C1B3C6D) & mask
+            left = (n >> half) ^ t ^ (t >> 12)
+            t = ((left ^ k1) * 0x2C1B3C6D) & mask
+            right ^= t ^ (t >> 12)
+            t = ((right ^ k2) * 0x2C1B3C6D) & mask
+            left ^= t ^ (t >> 12)
+            t = ((left ^ k3) * 0x2C1B3C6D) & mask
+            right ^= t ^ (t >> 12)
+            y = (left << half) | right
+            append(pairs[y >> 40] + pairs[(y >> 30) & 1023] + pairs[(y >> 20) & 1023]
+                   + pairs[(y >> 10) & 1023] + pairs[y & 1023] + checks[y % 37])
+        return codes
+
+    def decode(self, code: str) -> Optional[int]:
+        """คืน counter ของ code ถ้ารูปแบบและ check symbol ถูกต้อง ไม่เช่นนั้นคืน None"""
+        y = _parse(code)
+        if y is None:
+            return None
+        left, right = y >> _HALF_BITS, y & _HALF_MASK
+        for k in reversed(self._require_keys()):
+            left, right = right ^ _mix(left, k), left
+        return (left << _HALF_BITS) | right
+
+    def _require_keys(self) -> Tuple[int, ...]:
+        if self._keys is None:
+            raise RuntimeError("ยังไม่ได้ตั้ง [TicketCode] secret (HARMONIQ_TICKET_CODE_SECRET) — ออก ticket code ไม่ได้")
+        return self._keys
+
+    def _take(self, count: int) -> List[str]:
+        with self._lock:
+            if not self._ranges:
+                return []
+            current = self._ranges[0]
+            start = current[0]
+            taken = min(count, current[1] - start)
+            current[0] += taken
+            if current[0] == current[1]:
+                self._ranges.popleft()
+        return self.encode_range(start, taken)
+
+
+def _parse(code: str) -> Optional[int]:
+    code = code.strip().upper().replace("-", "")
+    if len(code) != CODE_LENGTH:
+        return None
+    y = 0
+    for c in code[:-1]:
+        digit = _DECODE.get(c)
+        if digit is None:
+            return None
+        y = (y << 5) | digit
+    return y if CHECK_SYMBOLS[y % 37] == code[-1] else None
+
+
+def is_valid_code(code: str) -> bool:
+    """ตรวจรูปแบบและ check symbol โดยไม่ต้องแตะฐานข้อมูล"""
+    return _parse(code) is not None
+
+
+def allocate_block() -> int:
+    # commit แยกจาก transaction ที่ออกตั๋ว — การออกตั๋วไม่ต้อง retry เพราะ code ชน
+    with SessionLocal() as db:
+        block = TicketCodeBlock()
+        db.add(block)
+        db.flush()
+        block_id = block.block_id
+        db.commit()
+        return block_id
+
+
+async def aallocate_block() -> int:
+    async with AsyncSessionLocal() as db:
+        block = TicketCodeBlock()
+        db.add(block)
+        await db.commit()
+        return block.block_id
+
+
+ticket_codes = TicketCodeGenerator()
@@ -1,42 +1,35 @@
-from sqlalchemy.orm import Session
-from graphql_app.database import SessionLocal
-from graphql_app.model import Ticket, Booking, Concert, Zone, Seat, BookingSeat
+from sqlalchemy import select
+from graphql_app.database import AsyncSessionLocal
+from graphql_app.model import Ticket
+from graphql_app.pagination import keyset, MAX_PAGE_SIZE
 from typing import Optional, List
 from sqlalchemy.sql import func
 
-class TicketGateway:
-    @classmethod
-    def get_tickets(cls) -> List[Ticket]:
-        
-        with SessionLocal() as db:
-            return db.query(Ticket).all()
 
-    @classmethod
-    def get_ticket_by_id(cls, ticket_id: int) -> Optional[Ticket]:
-       
-        with SessionLocal() as db:
-            return db.query(Ticket).filter(Ticket.ticket_id == ticket_id).first()
+def _tickets_by_user_stmt(user_id: int):
+    return (
+        select(
+            Ticket.ticket_id,
+            Ticket.booking_id,
+            Ticket.user_id,
+            Ticket.ticket_code,
+            Ticket.concert_name,
+            Ticket.zone_name,
+            Ticket.seat_number
+        )
+        .where(Ticket.user_id == user_id)
+    )
 
+
+class AsyncTicketGateway:
     @classmethod
-    def get_tickets_by_user(cls, user_id: int) -> List[dict]:
-        
-        with SessionLocal() as db:
-            tickets = (
-            db.query(
-                Ticket.ticket_id,
-                Ticket.booking_id,
-                Ticket.user_id,
-                Ticket.ticket_code,
-                Ticket.concert_name,
-                Ticket.zone_name,
-                Ticket.seat_number 
-            )
-            .filter(Ticket.user_id == user_id)
-            .order_by(Ticket.ticket_id.desc())  
-            .all()
-        )
+    async def get_tickets_by_user(cls, user_id: int, limit: int = MAX_PAGE_SIZE, after: Optional[int] = None) -> List[dict]:
+        """ตั๋วของผู้ใช้ ใหม่สุดก่อน ต่อจาก ticket_id after ไม่เกิน limit + 1 ใบ"""
+        async with AsyncSessionLocal() as db:
+            tickets = (await db.execute(
+                keyset(_tickets_by_user_stmt(user_id), Ticket.ticket_id, limit, after, descending=True)
+            )).all()
 
-        db.expire_all() 
         return [
             {
                 "ticket_id": t.ticket_id,
@@ -45,36 +38,13 @@ class TicketGateway:
                 "ticket_code": t.ticket_code,
                 "concert_name": t.concert_name,
                 "zone_name": t.zone_name,
-                "seat_number": t.seat_number.strip().replace(" ", "").replace(",", "") 
+                "seat_number": t.seat_number.strip().replace(" ", "").replace(",", "")
             }
             for t in tickets
         ]
 
-
-
-
-
-
-       
     @classmethod
-    def create_ticket(cls, booking_id: int, user_id: int, ticket_code: str, concert_name: str, zone_name: str, seat_number: str) -> dict:
-      
-        with SessionLocal() as db:
-            new_ticket = Ticket(
-                booking_id=booking_id,
-                user_id=user_id,
-                ticket_code=ticket_code,  
-            )
-            db.add(new_ticket)
-            db.commit()
-            db.refresh(new_ticket)
+    async def count_tickets_by_user(cls, user_id: int) -> int:
 
-            return {
-                "ticket_id": new_ticket.ticket_id,
-                "booking_id": new_ticket.booking_id,
-                "user_id": new_ticket.user_id,
-                "ticket_code": new_ticket.ticket_code,  
-                "concert_name": concert_name,
-                "zone_name": zone_name,
-                "seat_number": seat_number
-            }
\ No newline at end of file
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(select(func.count(Ticket.ticket_id)).where(Ticket.user_id == user_id))).scalar()
@@ -1,44 +1,56 @@
-import bcrypt
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import NoResultFound
+from sqlalchemy import select, update
 from sqlalchemy.sql import func
-from graphql_app.database import SessionLocal
+from graphql_app.database import AsyncSessionLocal
 from graphql_app.model import User
+from graphql_app.pagination import keyset, MAX_PAGE_SIZE
+from password_hasher import password_hasher
 from typing import Optional, List
 
-class UserGateway:
+class AsyncUserGateway:
     @classmethod
-    def get_users(cls) -> List[User]:
-       
-        with SessionLocal() as db:
-            return db.query(User).all()
+    async def get_users(cls, limit: int = MAX_PAGE_SIZE, after: Optional[int] = None) -> List[User]:
+
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(keyset(select(User), User.id, limit, after))).scalars().all()
+
+    @classmethod
+    async def count_users(cls) -> int:
+
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(select(func.count(User.id)))).scalar()
+
+    @classmethod
+    async def get_user_by_id(cls, id: int) -> Optional[User]:
+
+        async with AsyncSessionLocal() as db:
+            return await db.get(User, id)
 
     @classmethod
-    def get_user_by_id(cls, id: int) -> Optional[User]:
-       
-        with SessionLocal() as db:
-            return db.query(User).filter(User.id == id).first()
+    async def is_staff(cls, id: int) -> bool:
+
+        async with AsyncSessionLocal() as db:
+            return bool((await db.execute(select(User.is_staff).where(User.id == id))).scalar())
 
     @classmethod
-    def add_user(cls, display_name: str, username: str, password: str, profile_picture_url: Optional[str] = None) -> Optional[User]:
-      
-        hashed_pw = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode('utf-8')
-        with SessionLocal() as db:
-            if db.query(User).filter(User.username == username).first():
+    async def add_user(cls, display_name: str, username: str, password: str, profile_picture_url: Optional[str] = None) -> Optional[User]:
+
+        hashed_pw = await password_hasher.ahash(password)
+        async with AsyncSessionLocal() as db:
+            if (await db.execute(select(User.id).where(User.username == username))).first():
                 raise ValueError("username already in use")
-            
+
             new_user = User(display_name=display_name, username=username, password=hashed_pw, profile_picture_url=profile_picture_url)
             db.add(new_user)
-            db.commit()
-            db.refresh(new_user)
+            await db.commit()
+            await db.refresh(new_user)
             return new_user
 
     @classmethod
-    def update_user(cls, id: int, display_name: Optional[str] = None, username: Optional[str] = None,
-                    password: Optional[str] = None, profile_picture_url: Optional[str] = None) -> Optional[User]:
-       
-        with SessionLocal() as db:
-            user = db.query(User).filter(User.id == id).first()
+    async def update_user(cls, id: int, display_name: Optional[str] = None, username: Optional[str] = None,
+                          password: Optional[str] = None, profile_picture_url: Optional[str] = None) -> Optional[User]:
+
+        async with AsyncSessionLocal() as db:
+            user = await db.get(User, id)
             if not user:
                 return None
 
@@ -47,61 +59,53 @@ class UserGateway:
             if username:
                 user.username = username
             if password:
-                user.password = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode('utf-8')
+                user.password = await password_hasher.ahash(password)
             if profile_picture_url:
                 user.profile_picture_url = profile_picture_url
 
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
             return user
-  
+
     @classmethod
-    def update_user_avatar(cls, user_id: int, profile_picture_url: str) -> Optional[User]:
-        
-        with SessionLocal() as db:
-            user = db.query(User).filter(User.id == user_id).first()
+    async def update_user_avatar(cls, user_id: int, profile_picture_url: str) -> Optional[User]:
+
+        async with AsyncSessionLocal() as db:
+            user = await db.get(User, user_id)
             if not user:
                 return None
-            
+
             user.profile_picture_url = profile_picture_url
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
             return user
 
     @classmethod
-    def delete_user(cls, id: int) -> bool:
-      
-        with SessionLocal() as db:
-            user = db.query(User).filter(User.id == id).first()
+    async def delete_user(cls, id: int) -> bool:
+
+        async with AsyncSessionLocal() as db:
+            user = await db.get(User, id)
             if not user:
                 return False
-            db.delete(user)
-            db.commit()
+            await db.delete(user)
+            await db.commit()
             return True
 
-    @classmethod
-    def login_user(cls, username: str, password: str) -> Optional[User]:
-      
-        with SessionLocal() as db:
-            user = db.query(User).filter(User.username == username).first()
-            if not user or not bcrypt.checkpw(password.encode('utf-8'), user.password.encode('utf-8')):
-                raise ValueError("Invalid username or password")
-            return user
-
     @staticmethod
-    def get_user_by_email(username: str) -> Optional[User]:
-       
-        with SessionLocal() as db:
-            try:
-                return db.query(User).filter(User.username == username).one()
-            except NoResultFound:
-                return None
-
-    @staticmethod
-    def verify_password(user: User, password: str) -> bool:
-        
-        return bcrypt.checkpw(password.encode('utf-8'), user.password.encode('utf-8'))
-
-
+    async def get_user_by_email(username: str) -> Optional[User]:
 
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(select(User).where(User.username == username))).scalars().first()
 
+    @staticmethod
+    async def verify_password(user: User, password: str) -> bool:
+        # bcrypt ใช้ CPU นาน — รันใน pool ของ password_hasher ไม่ให้บล็อก event loop
+        if not await password_hasher.averify(password, user.password):
+            return False
+        # bcrypt_rounds เปลี่ยน — hash ใหม่ด้วย cost ปัจจุบันตอนที่ยังมีรหัสผ่านจริงอยู่
+        if password_hasher.needs_rehash(user.password):
+            user.password = await password_hasher.ahash(password)
+            async with AsyncSessionLocal() as db:
+                await db.execute(update(User).where(User.id == user.id).values(password=user.password))
+                await db.commit()
+        return True
@@ -0,0 +1,245 @@
+import base64
+import hashlib
+import hmac
+import math
+import secrets
+import threading
+import time
+from config.config import Config, is_true
+from redis_client import redis_client
+from typing import Dict, List, Optional, Tuple
+
+waiting_room_config = Config("config/config.ini").load_waiting_room_config()
+
+ENABLED = is_true(waiting_room_config.get('enabled', 'true'))
+ADMIT_PER_SECOND = float(waiting_room_config.get('admit_per_second', 20))
+BURST = float(waiting_room_config.get('burst', 20))
+PASS_TTL_SECONDS = int(waiting_room_config.get('pass_ttl_seconds', 600))
+QUEUE_TTL_SECONDS = int(waiting_room_config.get('queue_ttl_seconds', 7200))
+# ไม่ได้ตั้ง secret — ใช้ค่าสุ่มต่อ process (token ใช้ข้าม process หรือหลัง restart ไม่ได้ lifecycle.config_errors จึงไม่ยอมเมื่อมีหลาย worker)
+SECRET = waiting_room_config.get('secret', '').encode() or secrets.token_bytes(32)
+STORE = waiting_room_config.get('store', 'memory').strip().lower()
+REDIS_URL = waiting_room_config.get('redis_url', 'redis://localhost:6379/0')
+
+CONCERT_RATES = {
+    int(key.split(".", 1)[1]): float(value)
+    for key, value in waiting_room_config.items() if key.startswith('admit_per_second.')
+}
+
+
+class AdmissionRequiredError(ValueError):
+    def __init__(self, message: str = "กรุณาเข้าคิวในห้องรอก่อนจองที่นั่ง"):
+        super().__init__(message)
+
+
+class MemoryAdmissionStore:
+    """คิวของแต่ละคอนเสิร์ตใน process นี้ — ใช้ได้เมื่อรัน process เดียว"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # concert_id → [last_seq, cursor, updated_at] — cursor None คือคิวใหม่ที่ยังไม่เคยคำนวณ
+        self._queues: Dict[int, list] = {}
+        # pass ที่ออกไปแล้ว → (เวลาหมดอายุของ pass, เก็บไว้ถึงเมื่อไร) / pass ที่ใช้จองแล้ว → เวลาหมดอายุของ pass
+        self._issued: Dict[str, Tuple[int, int]] = {}
+        self._used: Dict[str, int] = {}
+        self._next_prune = 0.0
+
+    async def join(self, concert_id: int) -> int:
+        with self._lock:
+            queue = self._queues.setdefault(concert_id, [0, None, time.time()])
+            queue[0] += 1
+            return queue[0]
+
+    async def admitted_through(self, concert_id: int, rate: float, burst: float, now: float) -> int:
+        with self._lock:
+            queue = self._queues.setdefault(concert_id, [0, None, now])
+            if queue[1] is None:
+                queue[1] = queue[0] + burst
+            queue[1] = min(queue[1] + max(0.0, now - queue[2]) * rate, queue[0] + burst)
+            queue[2] = now
+            return math.floor(queue[1])
+
+    async def issue_pass(self, pass_id: str, expires_at: int, keep_until: int) -> int:
+        """เวลาหมดอายุของ pass ที่ออกให้ pass_id ไปแล้ว — ถ้ายังไม่เคยออกจะบันทึก expires_at ไว้จนถึง keep_until"""
+        now = time.time()
+        with self._lock:
+            issued = self._issued.get(pass_id)
+            if issued is None or issued[1] <= now:
+                issued = self._issued[pass_id] = (expires_at, keep_until)
+            self._prune(now)
+            return issued[0]
+
+    async def use_pass(self, pass_id: str, expires_at: int) -> bool:
+        """False ถ้า admission token นี้ถูกใช้จองไปแล้ว"""
+        now = time.time()
+        with self._lock:
+            if self._used.get(pass_id, 0) > now:
+                return False
+            self._used[pass_id] = expires_at
+            self._prune(now)
+            return True
+
+    def _prune(self, now: float) -> None:
+        if now >= self._next_prune:
+            self._issued = {k: v for k, v in self._issued.items() if v[1] > now}
+            self._used = {k: v for k, v in self._used.items() if v > now}
+            self._next_prune = now + 60
+
+    async def release_pass(self, pass_id: str) -> None:
+        with self._lock:
+            self._used.pop(pass_id, None)
+
+
+# เลื่อน cursor แบบ atomic ใน redis — เหมือน MemoryAdmissionStore.admitted_through
+_ADMIT_SCRIPT = """
+local seq = tonumber(redis.call('HGET', KEYS[1], 'seq') or '0')
+local cursor = tonumber(redis.call('HGET', KEYS[1], 'cursor') or '-1')
+local now = tonumber(ARGV[1])
+if cursor < 0 then cursor = seq + tonumber(ARGV[3]) end
+local updated = tonumber(redis.call('HGET', KEYS[1], 'updated') or ARGV[1])
+cursor = math.min(cursor + math.max(0, now - updated) * tonumber(ARGV[2]), seq + tonumber(ARGV[3]))
+redis.call('HSET', KEYS[1], 'cursor', tostring(cursor), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], 86400)
+return math.floor(cursor)
+"""
+
+
+class RedisAdmissionStore:
+    """สถานะคิวที่แชร์ทุก process"""
+
+    def __init__(self, client, prefix: str = "harmoniq:waiting-room:"):
+        self.client = client
+        self.prefix = prefix
+        self._admit = client.register_script(_ADMIT_SCRIPT)
+
+    async def join(self, concert_id: int) -> int:
+        key = f"{self.prefix}{concert_id}"
+        seq = await self.client.hincrby(key, "seq", 1)
+        await self.client.expire(key, 86400)
+        return int(seq)
+
+    async def admitted_through(self, concert_id: int, rate: float, burst: float, now: float) -> int:
+        return int(await self._admit(keys=[f"{self.prefix}{concert_id}"], args=[now, rate, burst]))
+
+    async def issue_pass(self, pass_id: str, expires_at: int, keep_until: int) -> int:
+        key = f"{self.prefix}issued:{pass_id}"
+        if await self.client.set(key, expires_at, nx=True, exat=max(keep_until, int(time.time()) + 1)):
+            return expires_at
+        issued = await self.client.get(key)
+        return int(issued) if issued is not None else expires_at
+
+    async def use_pass(self, pass_id: str, expires_at: int) -> bool:
+        return bool(await self.client.set(f"{self.prefix}used:{pass_id}", 1, nx=True, exat=max(expires_at, int(time.time()) + 1)))
+
+    async def release_pass(self, pass_id: str) -> None:
+        await self.client.delete(f"{self.prefix}used:{pass_id}")
+
+
+def _sign(payload: str) -> str:
+    signature = hmac.new(SECRET, payload.encode(), hashlib.sha256).digest()[:16]
+    return f"{payload}.{base64.urlsafe_b64encode(signature).decode().rstrip('=')}"
+
+
+def _verify(token: str, kind: str) -> Optional[List[str]]:
+    """field หลังชนิดของ token "<kind>:<concert_id>:<user_id>:<expires_at>:<id>" — None ถ้าลายเซ็นผิดหรือหมดอายุแล้ว"""
+    payload, _, _ = token.rpartition(".")
+    # token ที่ออกให้เป็น ASCII เสมอ — compare_digest กับ str ที่ไม่ใช่ ASCII โยน TypeError
+    if not payload or not token.isascii() or not hmac.compare_digest(_sign(payload), token):
+        return None
+    fields = payload.split(":")
+    if fields[0] != kind or len(fields) != 5 or int(fields[3]) < time.time():
+        return None
+    return fields[1:]
+
+
+class WaitingRoom:
+    """คิว FIFO หน้า createBooking — ปล่อยเข้าตาม admit_per_second และออก admission token ที่ลงลายเซ็น"""
+
+    def __init__(self, store=None, enabled: bool = ENABLED, rate: float = ADMIT_PER_SECOND,
+                 burst: float = BURST, pass_ttl_seconds: int = PASS_TTL_SECONDS,
+                 queue_ttl_seconds: int = QUEUE_TTL_SECONDS, concert_rates: Optional[Dict[int, float]] = None):
+        self.store = store or MemoryAdmissionStore()
+        self.enabled = enabled
+        self.rate = rate
+        self.burst = burst
+        self.pass_ttl_seconds = pass_ttl_seconds
+        self.queue_ttl_seconds = queue_ttl_seconds
+        self.concert_rates = CONCERT_RATES if concert_rates is None else concert_rates
+
+    async def join(self, concert_id: int, user_id: int) -> dict:
+        if not self.enabled:
+            return self._admitted(concert_id, user_id)
+        seq = await self.store.join(concert_id)
+        expires_at = int(time.time()) + self.queue_ttl_seconds
+        return await self.status(_sign(f"queue:{concert_id}:{user_id}:{expires_at}:{seq}"))
+
+    async def status(self, queue_token: str) -> dict:
+        """ตำแหน่งในคิวของ queue_token — ถ้าถึงคิวแล้วจะได้ admission_token สำหรับจอง"""
+        fields = _verify(queue_token, "queue")
+        if fields is None:
+            raise ValueError("queue token ไม่ถูกต้องหรือหมดอายุแล้ว กรุณาเข้าคิวใหม่")
+        concert_id, user_id, queue_expires_at, seq = map(int, fields)
+        rate = self.rate_for(concert_id)
+        admitted_through = await self.store.admitted_through(concert_id, rate, self.burst, time.time())
+        if seq <= admitted_through:
+            # ลำดับคิวหนึ่งได้ pass เดียว — ถามซ้ำได้ pass เดิม
+            pass_id = f"{concert_id}-{seq}"
+            expires_at = await self.store.issue_pass(pass_id, int(time.time()) + self.pass_ttl_seconds,
+                                                     max(queue_expires_at, int(time.time()) + self.pass_ttl_seconds))
+            return dict(self._admitted(concert_id, user_id, pass_id, expires_at), queue_token=queue_token)
+        position = seq - admitted_through
+        return {
+            "concert_id": concert_id,
+            "queue_token": queue_token,
+            "position": position,
+            "admitted": False,
+            "admission_token": None,
+            "retry_after_seconds": min(30.0, max(1.0, position / rate / 2))
+        }
+
+    async def claim(self, admission_token: Optional[str], concert_id: int, user_id: int) -> Optional[str]:
+        """ใช้ admission_token จองได้ครั้งเดียว คืน pass_id ไว้ release เมื่อจองไม่สำเร็จ — โยน AdmissionRequiredError ถ้าใช้ไม่ได้"""
+        if not self.enabled:
+            return None
+        if not admission_token:
+            raise AdmissionRequiredError()
+        fields = _verify(admission_token, "pass")
+        if fields is None:
+            raise AdmissionRequiredError("admission token ไม่ถูกต้องหรือหมดอายุแล้ว กรุณาเข้าคิวใหม่")
+        pass_concert_id, pass_user_id, expires_at = map(int, fields[:3])
+        if pass_concert_id != concert_id or pass_user_id != user_id:
+            raise AdmissionRequiredError("admission token นี้ไม่ได้ออกให้การจองนี้")
+        pass_id = fields[3]
+        if not await self.store.use_pass(pass_id, expires_at):
+            raise AdmissionRequiredError("admission token นี้ถูกใช้จองไปแล้ว กรุณาเข้าคิวใหม่")
+        return pass_id
+
+    async def release(self, pass_id: Optional[str]) -> None:
+        """คืน admission token ที่ claim ไว้ เมื่อการจองไม่สำเร็จ ให้ลองจองใหม่ได้โดยไม่ต้องเข้าคิวอีก"""
+        if pass_id is not None:
+            await self.store.release_pass(pass_id)
+
+    def rate_for(self, concert_id: int) -> float:
+        return self.concert_rates.get(concert_id, self.rate)
+
+    def _admitted(self, concert_id: int, user_id: int, pass_id: Optional[str] = None,
+                  expires_at: Optional[int] = None) -> dict:
+        pass_id = pass_id or secrets.token_hex(8)
+        expires_at = expires_at or int(time.time()) + self.pass_ttl_seconds
+        return {
+            "concert_id": concert_id,
+            "queue_token": None,
+            "position": 0,
+            "admitted": True,
+            "admission_token": _sign(f"pass:{concert_id}:{user_id}:{expires_at}:{pass_id}"),
+            "retry_after_seconds": 0.0
+        }
+
+
+def _store_from_config():
+    if STORE == "redis":
+        return RedisAdmissionStore(redis_client(REDIS_URL, "WaitingRoom store", use_asyncio=True))
+    return MemoryAdmissionStore()
+
+
+waiting_room = WaitingRoom(_store_from_config())
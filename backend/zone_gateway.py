@@ -1,24 +1,53 @@
-from sqlalchemy.orm import Session
-from graphql_app.database import SessionLocal
+from sqlalchemy import select
+from graphql_app.database import AsyncSessionLocal
 from graphql_app.model import Zone
-from typing import List
+from catalog_cache import catalog_cache
+from typing import Dict, List, Optional
+
+class AsyncZoneGateway:
+    """อ่านผ่าน catalog_cache — ถึงฐานข้อมูลเฉพาะตอน cache miss"""
+
+    @classmethod
+    async def get_zones_by_concert(cls, concert_id: int) -> List[dict]:
+        return await cls.get_zones_by_concerts([concert_id])
 
-class ZoneGateway:
     @classmethod
-    def get_zones_by_concert(cls, concert_id: int) -> List[dict]:
-    
-        with SessionLocal() as db:
-            zones = (
-                db.query(Zone)
-                .filter(Zone.concert_id == concert_id)
-                .all()
-            )
-            return [
-                {
-                    "zone_id": z.zone_id,
-                    "concert_id": z.concert_id,
-                    "zone_name": z.zone_name,
-                    "price": float(z.price)
-                }
-                for z in zones
-            ]
+    async def get_zones_by_ids(cls, zone_ids: List[int]) -> List[dict]:
+        """ใช้โดย DataLoader — id ที่ไม่อยู่ใน cache ถูกดึงด้วย IN (...) ครั้งเดียว"""
+        zones = await catalog_cache.aget_many([f"zone:{i}" for i in zone_ids], cls._load_missing_zones)
+        return [z for z in zones if z]
+
+    @classmethod
+    async def get_zones_by_concerts(cls, concert_ids: List[int]) -> List[dict]:
+        """ใช้โดย DataLoader — โซนของหลายคอนเสิร์ต คอนเสิร์ตที่ไม่อยู่ใน cache ถูกดึงใน query เดียว"""
+        groups = await catalog_cache.aget_many([f"zones:{i}" for i in concert_ids], cls._load_missing_concerts)
+        return [z for zones in groups for z in zones]
+
+    @classmethod
+    async def _load_missing_zones(cls, keys: List[str]) -> Dict[str, Optional[dict]]:
+        zone_ids = [int(key.split(":")[1]) for key in keys]
+        async with AsyncSessionLocal() as db:
+            zones = (await db.execute(select(Zone).where(Zone.zone_id.in_(zone_ids)))).scalars().all()
+        found = {f"zone:{z.zone_id}": _zone_dict(z) for z in zones}
+        return {key: found.get(key) for key in keys}
+
+    @classmethod
+    async def _load_missing_concerts(cls, keys: List[str]) -> Dict[str, List[dict]]:
+        concert_ids = [int(key.split(":")[1]) for key in keys]
+        async with AsyncSessionLocal() as db:
+            zones = (await db.execute(
+                select(Zone).where(Zone.concert_id.in_(concert_ids)).order_by(Zone.zone_id)
+            )).scalars().all()
+        groups: Dict[str, List[dict]] = {key: [] for key in keys}
+        for z in zones:
+            groups[f"zones:{z.concert_id}"].append(_zone_dict(z))
+        return groups
+
+
+def _zone_dict(z: Zone) -> dict:
+    return {
+        "zone_id": z.zone_id,
+        "concert_id": z.concert_id,
+        "zone_name": z.zone_name,
+        "price": float(z.price)
+    }
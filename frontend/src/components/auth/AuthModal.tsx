@@ -63,7 +63,14 @@ const AuthModal: React.FC<AuthModalProps> = ({ initialMode = 'login' }) => {
         );
         navigate('/');
       } else {
-        const user = await addUser(username, email, password);
+        await addUser(username, email, password);
+        // sign in straight away so the new account gets a session token
+        const res = await loginUser(email, password);
+        if (!res.success) {
+          setError(res.message);
+          return;
+        }
+        const user = res.user;
         dispatch({ type: 'LOGIN', payload: user });
         localStorage.setItem(
           'userStore',
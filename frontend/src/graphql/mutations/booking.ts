@@ -7,6 +7,7 @@ export const CREATE_BOOKING = gql`
     $zoneId: Int!
     $seatCount: Int!
     $seatIds: [Int!]!
+    $admissionToken: String
   ) {
     createBooking(
       userId: $userId
@@ -14,6 +15,7 @@ export const CREATE_BOOKING = gql`
       zoneId: $zoneId
       seatCount: $seatCount
       seatIds: $seatIds
+      admissionToken: $admissionToken
     ) {
       bookingId
     }
@@ -39,4 +41,16 @@ export const CONFIRM_PAYMENT_AND_GENERATE_TICKETS = gql`
       seatNumber
     }
   }
-`;
\ No newline at end of file
+`;
+
+export const JOIN_WAITING_ROOM = gql`
+  mutation JoinWaitingRoom($concertId: Int!, $userId: Int!) {
+    joinWaitingRoom(concertId: $concertId, userId: $userId) {
+      queueToken
+      position
+      admitted
+      admissionToken
+      retryAfterSeconds
+    }
+  }
+`;
@@ -1,11 +1,12 @@
 // src/graphql/mutations/loginUser.ts
-import client from '@/lib/graphqlClient';
+import client, { setSessionToken } from '@/lib/graphqlClient';
 
 export const LOGIN_USER = `
   mutation LoginUser($username: String!, $password: String!) {
     loginUser(username: $username, password: $password) {
       success
       message
+      token
       user {
         id
         displayName
@@ -20,6 +21,7 @@ type LoginResponse = {
   loginUser: {
     success: boolean;
     message: string;
+    token: string | null;
     user: {
       id: number;
       displayName: string;
@@ -31,5 +33,21 @@ type LoginResponse = {
 
 export const loginUser = async (username: string, password: string) => {
   const res = await client.request<LoginResponse>(LOGIN_USER, { username, password });
+  if (res.loginUser.success) setSessionToken(res.loginUser.token);
   return res.loginUser;
 };
+
+export const LOGOUT_USER = `
+  mutation LogoutUser {
+    logoutUser
+  }
+`;
+
+// Revokes the session token on the server, then forgets it locally
+export const logoutUser = async () => {
+  try {
+    await client.request(LOGOUT_USER);
+  } finally {
+    setSessionToken(null);
+  }
+};
@@ -14,13 +14,33 @@ export const GET_BOOKING_BY_USER = gql`
 `;
 
 export const GET_TICKETS_BY_USER = gql`
-  query GetTicketsByUser($userId: Int!) {
-    getTicketsByUser(userId: $userId) {
-      ticketId
-      ticketCode
-      concertName
-      zoneName
-      seatNumber
+  query GetTicketsByUser($userId: Int!, $first: Int, $after: String) {
+    getTicketsByUser(userId: $userId, first: $first, after: $after) {
+      edges {
+        node {
+          ticketId
+          ticketCode
+          concertName
+          zoneName
+          seatNumber
+        }
+      }
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+    }
+  }
+`;
+
+export const WAITING_ROOM_STATUS = gql`
+  query WaitingRoomStatus($queueToken: String!) {
+    waitingRoomStatus(queueToken: $queueToken) {
+      queueToken
+      position
+      admitted
+      admissionToken
+      retryAfterSeconds
     }
   }
 `;
@@ -1,10 +1,18 @@
 export const GET_CONCERTS = `
-  query {
-    getConcerts {
-      concertId
-      concertName
-      bandName
-      concertType
+  query ($first: Int, $after: String) {
+    getConcerts(first: $first, after: $after) {
+      edges {
+        node {
+          concertId
+          concertName
+          bandName
+          concertType
+        }
+      }
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
     }
   }
 `;
@@ -44,30 +52,46 @@ export const GET_SEATS_BY_CONCERT_ZONE = `
 `;
 
 export const GET_BOOKINGS_BY_USER = `
-  query ($userId: Int!) {
-    getBookingsByUser(userId: $userId) {
-      bookingId
-      userId
-      concertName
-      zoneName
-      seatNumber
-      seatCount
-      totalPrice
-      status
+  query ($userId: Int!, $first: Int, $after: String) {
+    getBookingsByUser(userId: $userId, first: $first, after: $after) {
+      edges {
+        node {
+          bookingId
+          userId
+          concertName
+          zoneName
+          seatNumber
+          seatCount
+          totalPrice
+          status
+        }
+      }
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
     }
   }
 `;
 
 export const GET_TICKETS_BY_USER = `
-  query ($userId: Int!) {
-    getTicketsByUser(userId: $userId) {
-      ticketId
-      bookingId
-      userId
-      concertName
-      zoneName
-      seatNumber
-      ticketCode
+  query ($userId: Int!, $first: Int, $after: String) {
+    getTicketsByUser(userId: $userId, first: $first, after: $after) {
+      edges {
+        node {
+          ticketId
+          bookingId
+          userId
+          concertName
+          zoneName
+          seatNumber
+          ticketCode
+        }
+      }
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
     }
   }
 `;
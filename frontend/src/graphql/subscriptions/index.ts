@@ -0,0 +1,14 @@
+export const SEAT_UPDATES = `
+  subscription ($concertId: Int!, $zoneId: Int!) {
+    seatUpdates(concertId: $concertId, zoneId: $zoneId) {
+      snapshot
+      seats {
+        seatId
+        concertId
+        zoneName
+        seatNumber
+        seatStatus
+      }
+    }
+  }
+`;
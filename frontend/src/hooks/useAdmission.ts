@@ -0,0 +1,57 @@
+import { useEffect, useState } from 'react';
+import client from '@/lib/graphqlClient';
+import { JOIN_WAITING_ROOM } from '@/graphql/mutations/booking';
+import { WAITING_ROOM_STATUS } from '@/graphql/queries/booking';
+
+type Admission = {
+  queueToken: string | null;
+  position: number;
+  admitted: boolean;
+  admissionToken: string | null;
+  retryAfterSeconds: number;
+};
+
+// Joins the concert's waiting room and polls the queue position until the user is admitted
+export function useAdmission(concertId: number, userId?: number) {
+  const [admission, setAdmission] = useState<Admission | null>(null);
+
+  useEffect(() => {
+    if (!concertId || !userId) return;
+    let cancelled = false;
+    let timer: ReturnType<typeof setTimeout>;
+
+    const schedule = (next: Admission) => {
+      if (cancelled) return;
+      setAdmission(next);
+      if (!next.admitted && next.queueToken) {
+        timer = setTimeout(() => poll(next.queueToken as string), next.retryAfterSeconds * 1000);
+      }
+    };
+
+    const poll = async (queueToken: string) => {
+      try {
+        const res = await client.request<{ waitingRoomStatus: Admission }>(WAITING_ROOM_STATUS, { queueToken });
+        schedule(res.waitingRoomStatus);
+      } catch (error) {
+        console.error('Waiting room error:', error);
+        if (!cancelled) timer = setTimeout(() => poll(queueToken), 5000);
+      }
+    };
+
+    client
+      .request<{ joinWaitingRoom: Admission }>(JOIN_WAITING_ROOM, { concertId, userId })
+      .then((res) => schedule(res.joinWaitingRoom))
+      .catch((error) => console.error('Waiting room error:', error));
+
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [concertId, userId]);
+
+  return {
+    admitted: admission?.admitted ?? false,
+    admissionToken: admission?.admissionToken ?? null,
+    position: admission?.position ?? null,
+  };
+}
@@ -2,10 +2,59 @@
 import { GraphQLClient } from 'graphql-request';
 import API_URL from '@/configURL/config';
 
+const SESSION_TOKEN_KEY = 'sessionToken';
+
+const hashes = new Map<string, string>();
+
+const sha256 = async (text: string) => {
+  let hash = hashes.get(text);
+  if (!hash) {
+    const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(text));
+    hash = Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, '0')).join('');
+    hashes.set(text, hash);
+  }
+  return hash;
+};
+
+// Automatic persisted queries: send only the query's hash, and the full text once if the server has not seen it yet
+const persistedQueryFetch: typeof fetch = async (input, init) => {
+  // crypto.subtle is only available on https and localhost
+  if (typeof init?.body !== 'string' || !globalThis.crypto?.subtle) return fetch(input, init);
+  const body = JSON.parse(init.body);
+  if (Array.isArray(body) || !body.query) return fetch(input, init);
+
+  const extensions = { ...body.extensions, persistedQuery: { version: 1, sha256Hash: await sha256(body.query) } };
+  const { query, ...withoutQuery } = body;
+  const response = await fetch(input, { ...init, body: JSON.stringify({ ...withoutQuery, extensions }) });
+  const result = await response.clone().json().catch(() => null);
+  if (!result?.errors?.some((error: { message?: string }) => error.message === 'PersistedQueryNotFound')) {
+    return response;
+  }
+  return fetch(input, { ...init, body: JSON.stringify({ ...body, query, extensions }) });
+};
+
 const client = new GraphQLClient(API_URL, {
   headers: {
     'Content-Type': 'application/json',
   },
+  fetch: persistedQueryFetch,
 });
 
+// Session token from loginUser, sent as a bearer token on every request
+export const setSessionToken = (token: string | null) => {
+  if (token) {
+    localStorage.setItem(SESSION_TOKEN_KEY, token);
+    client.setHeader('Authorization', `Bearer ${token}`);
+  } else {
+    localStorage.removeItem(SESSION_TOKEN_KEY);
+    client.setHeader('Authorization', '');
+  }
+};
+
+// Public catalog reads (concerts, zones) go out as GET so the browser, a reverse proxy or a CDN can cache them by ETag
+export const publicClient = new GraphQLClient(API_URL, { method: 'GET' });
+
+const storedToken = localStorage.getItem(SESSION_TOKEN_KEY);
+if (storedToken) client.setHeader('Authorization', `Bearer ${storedToken}`);
+
 export default client;
@@ -0,0 +1,43 @@
+// src/lib/subscriptionClient.ts
+// Minimal graphql-transport-ws client for the backend's /graphql WebSocket endpoint
+import API_URL from '@/configURL/config';
+
+const WS_URL = API_URL.replace(/^http/, 'ws');
+
+type Handlers<T> = {
+  next: (data: T) => void;
+  error?: (error: unknown) => void;
+};
+
+export function subscribe<T>(query: string, variables: Record<string, unknown>, handlers: Handlers<T>): () => void {
+  const socket = new WebSocket(WS_URL, 'graphql-transport-ws');
+  let closed = false;
+
+  socket.onopen = () => socket.send(JSON.stringify({ type: 'connection_init' }));
+
+  socket.onmessage = (event) => {
+    const message = JSON.parse(event.data);
+    if (message.type === 'connection_ack') {
+      socket.send(JSON.stringify({ id: '1', type: 'subscribe', payload: { query, variables } }));
+    } else if (message.type === 'next') {
+      if (message.payload.errors) handlers.error?.(message.payload.errors);
+      else handlers.next(message.payload.data as T);
+    } else if (message.type === 'error') {
+      handlers.error?.(message.payload);
+    } else if (message.type === 'ping') {
+      socket.send(JSON.stringify({ type: 'pong' }));
+    }
+  };
+
+  socket.onerror = (event) => {
+    if (!closed) handlers.error?.(event);
+  };
+
+  return () => {
+    closed = true;
+    if (socket.readyState === WebSocket.OPEN) {
+      socket.send(JSON.stringify({ id: '1', type: 'complete' }));
+    }
+    socket.close();
+  };
+}
@@ -9,6 +9,7 @@ import { Avatar, AvatarFallback, AvatarImage } from '@/components/ui/avatar';
 import { useToast } from '@/hooks/use-toast';
 import { updateAvatar } from '@/graphql/mutations/updateUserAvatar';
 import { updateUser } from '@/graphql/mutations/updateUser';
+import { logoutUser } from '@/graphql/mutations/loginUser';
 
 const profilePictures = [
   'https://api.dicebear.com/6.x/micah/svg?seed=Felix',
@@ -84,7 +85,8 @@ const Profile: React.FC = () => {
     }
   };
 
-  const handleLogout = () => {
+  const handleLogout = async () => {
+    await logoutUser().catch((err) => console.error('Logout failed', err));
     localStorage.removeItem('userStore');
     dispatch({ type: 'LOGOUT' });
     navigate('/auth');
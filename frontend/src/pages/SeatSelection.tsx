@@ -1,14 +1,17 @@
 import type React from "react"
-import { useState } from "react"
+import { useEffect, useRef, useState } from "react"
 import { useNavigate, useParams } from "react-router-dom"
 import { useApp } from "@/context/AppContext"
 import type { Seat, Zone } from "@/types"
-import { useQuery } from "@tanstack/react-query"
-import client from "@/lib/graphqlClient"
+import { useQuery, useQueryClient } from "@tanstack/react-query"
+import client, { publicClient } from "@/lib/graphqlClient"
+import { subscribe } from "@/lib/subscriptionClient"
 import { GET_SEATS_BY_CONCERT_ZONE, GET_ZONES_BY_CONCERT } from "@/graphql/queries"
+import { SEAT_UPDATES } from "@/graphql/subscriptions"
 import { Check, X } from "lucide-react"
 import { motion } from "framer-motion"
 import { CREATE_BOOKING } from "@/graphql/mutations/booking"
+import { useAdmission } from "@/hooks/useAdmission"
 
 const SeatSelection: React.FC = () => {
   const { id } = useParams<{ id: string }>()
@@ -16,11 +19,15 @@ const SeatSelection: React.FC = () => {
   const navigate = useNavigate()
   const { state, dispatch } = useApp()
   const [selectedSection, setSelectedSection] = useState<string | null>(null)
+  const queryClient = useQueryClient()
+  // true while this user's own createBooking is in flight — its held seats must stay selected
+  const submitting = useRef(false)
+  const { admitted, admissionToken, position } = useAdmission(concertId, state.auth.user?.id)
 
   const { data: zones = [] } = useQuery({
     queryKey: ["zones", concertId],
     queryFn: async () => {
-      const res = await client.request<{ getZonesByConcert: Zone[] }>(
+      const res = await publicClient.request<{ getZonesByConcert: Zone[] }>(
         GET_ZONES_BY_CONCERT,
         { concertId }
       )
@@ -42,13 +49,44 @@ const SeatSelection: React.FC = () => {
     enabled: !!concertId && !!selectedSection,
   })
 
+  const selectedZoneId = zones.find((z) => z.zoneName === selectedSection)?.zoneId
+
+  // Seat changes are pushed over the seatUpdates subscription instead of re-querying the seat map
+  useEffect(() => {
+    if (!concertId || !selectedSection || !selectedZoneId) return
+    const seatsKey = ["seats", concertId, selectedSection]
+
+    return subscribe<{ seatUpdates: { snapshot: boolean; seats: Seat[] } }>(
+      SEAT_UPDATES,
+      { concertId, zoneId: selectedZoneId },
+      {
+        next: ({ seatUpdates }) => {
+          if (seatUpdates.snapshot) {
+            queryClient.setQueryData<Seat[]>(seatsKey, seatUpdates.seats)
+            return
+          }
+          const changed = new Map(seatUpdates.seats.map((s) => [s.seatId, s]))
+          queryClient.setQueryData<Seat[]>(seatsKey, (current = []) =>
+            current.map((s) => changed.get(s.seatId) ?? s)
+          )
+          // someone else took a seat this user had selected
+          if (submitting.current) return
+          seatUpdates.seats
+            .filter((s) => s.seatStatus !== "SeatStatus.available")
+            .forEach((s) => dispatch({ type: "REMOVE_SEAT", payload: s.seatId.toString() }))
+        },
+        error: (error) => console.error("Seat updates error:", error),
+      }
+    )
+  }, [concertId, selectedSection, selectedZoneId, queryClient, dispatch])
+
   const handleSectionSelect = (section: string) => {
     setSelectedSection(section)
     dispatch({ type: "CLEAR_SEATS" })
   }
 
   const handleSeatClick = (seat: Seat) => {
-    if (seat.seatStatus === "SeatStatus.booked") return
+    if (seat.seatStatus !== "SeatStatus.available") return
 
     const isSelected = state.selectedSeats.some((s) => s.seatId === seat.seatId)
 
@@ -71,6 +109,7 @@ const SeatSelection: React.FC = () => {
     const zone = zones.find((z) => z.zoneName === zoneName)
     const zoneId = zone?.zoneId
 
+    submitting.current = true
     try {
       const res: { createBooking: { bookingId: number } } = await client.request(CREATE_BOOKING, {
         userId,
@@ -78,12 +117,14 @@ const SeatSelection: React.FC = () => {
         zoneId,
         seatCount,
         seatIds,
+        admissionToken,
       })
 
       const bookingId = res.createBooking.bookingId
       dispatch({ type: "SET_BOOKING_ID", payload: bookingId.toString() })
       navigate("/payment")
     } catch (error) {
+      submitting.current = false
       console.error("Booking error:", error)
     }
   }
@@ -194,7 +235,7 @@ const SeatSelection: React.FC = () => {
                     <div className="flex gap-2">
                       {rowSeats.map((seat) => {
                         const isSelected = state.selectedSeats.some((s) => s.seatId === seat.seatId)
-                        const isBooked = seat.seatStatus === "SeatStatus.booked"
+                        const isBooked = seat.seatStatus !== "SeatStatus.available"
                         return (
                           <div
                             key={seat.seatId}
@@ -238,12 +279,20 @@ const SeatSelection: React.FC = () => {
               Total Price: <strong>{totalPrice.toLocaleString()} BATH</strong>
             </div>
 
+            {!admitted && (
+              <div className="text-center text-white mt-6">
+                {position
+                  ? <>You are in line — <strong>{position.toLocaleString()}</strong> ahead of you. Booking opens when it is your turn.</>
+                  : "Joining the queue..."}
+              </div>
+            )}
+
             <div className="flex justify-center mt-8">
               <button
                 onClick={handleSubmit}
-                disabled={state.selectedSeats.length === 0}
+                disabled={state.selectedSeats.length === 0 || !admitted}
                 className={`px-8 py-3 rounded-full text-white font-medium ${
-                  state.selectedSeats.length > 0
+                  state.selectedSeats.length > 0 && admitted
                     ? "bg-brand-pink hover:bg-opacity-90 hover:shadow-lg active:scale-95"
                     : "bg-gray-400 cursor-not-allowed"
                 } transition-all`}
@@ -7,6 +7,11 @@ import QRCode from 'react-qr-code';
 import html2canvas from 'html2canvas';
 import { Ticket as TicketType } from '@/types';
 
+type TicketConnection = {
+  edges: { node: TicketType }[];
+  pageInfo: { hasNextPage: boolean; endCursor: string | null };
+};
+
 const Ticket: React.FC = () => {
   const { state } = useApp();
   const userId = state.auth.user?.id;
@@ -14,11 +19,18 @@ const Ticket: React.FC = () => {
   const { data: tickets = [] } = useQuery({
     queryKey: ['tickets', userId],
     queryFn: async () => {
-      const res = await client.request<{ getTicketsByUser: TicketType[] }>(
-        GET_TICKETS_BY_USER,
-        { userId }
-      );
-      return res.getTicketsByUser;
+      // getTicketsByUser is paginated — follow endCursor until the last page
+      const all: TicketType[] = [];
+      let after: string | null = null;
+      do {
+        const res: { getTicketsByUser: TicketConnection } = await client.request(
+          GET_TICKETS_BY_USER,
+          { userId, first: 100, after }
+        );
+        all.push(...res.getTicketsByUser.edges.map((edge) => edge.node));
+        after = res.getTicketsByUser.pageInfo.hasNextPage ? res.getTicketsByUser.pageInfo.endCursor : null;
+      } while (after);
+      return all;
     },
     enabled: !!userId,
   });
@@ -17,7 +17,7 @@ export interface Concert {
 export interface Seat {
   seatId: number;
   seatNumber: string;
-  seatStatus: 'SeatStatus.available' | 'SeatStatus.booked';
+  seatStatus: 'SeatStatus.available' | 'SeatStatus.held' | 'SeatStatus.booked';
   concertId: number;
   zoneName: string;
   price?: number;